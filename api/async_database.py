@@ -0,0 +1,185 @@
+"""
+Acesso Assíncrono aos Dados
+
+Fachada `async` sobre o backend de dados (`api.database.db`). As consultas
+rodam em um pool limitado de threads, então uma varredura lenta (ou I/O do
+SQLite) não trava o event loop para as demais requisições. Metadados já
+prontos em memória (total, categorias) continuam síncronos.
+
+Consultas idênticas concorrentes são coalescidas (single-flight): enquanto
+uma execução está em andamento, chamadas com os mesmos argumentos (sobre a
+mesma versão dos dados) aguardam o mesmo resultado em vez de recalculá-lo.
+Os resultados compartilhados são tratados como somente leitura pelos
+routers. Contadores em `api/monitoring/coalescing.py`.
+
+Uso nos routers:
+    from api.async_database import db
+
+    books = await db.search_books(title="shadow", limit=20)
+"""
+
+import asyncio
+import contextvars
+import copy
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from api.config import COALESCE_QUERIES, DB_EXECUTOR_WORKERS
+from api.database import db as backend_db
+from api.monitoring.coalescing import coalescing
+from api.monitoring.profiler import run_profiled
+from api.storage.base import StorageBackend
+
+
+class AsyncDatabase:
+    """Executa as consultas do backend fora do event loop"""
+
+    def __init__(self, backend: StorageBackend, max_workers: int = DB_EXECUTOR_WORKERS, coalesce: bool = COALESCE_QUERIES):
+        """
+        Args:
+            backend: Backend de dados (memória ou SQLite)
+            max_workers: Threads dedicadas às consultas
+            coalesce: Compartilha execuções de consultas idênticas concorrentes
+        """
+        self.backend = backend
+        self.coalesce = coalesce
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="books-db")
+        self._in_flight = {}  # type: Dict[Tuple, asyncio.Future]
+
+    async def _run(self, func, *args, **kwargs):
+        """Executa `func` no pool, preservando o contexto (fases e cProfile do profiler)"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, run_profiled, func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    async def _query(self, name: str, *args, **kwargs):
+        """
+        Executa a consulta `name` do backend no pool, coalescendo chamadas
+        idênticas concorrentes.
+
+        A primeira chamada inicia a execução; as demais com a mesma chave
+        aguardam o mesmo future. O `shield` impede que o cancelamento de um
+        cliente (ex: desconexão) cancele a execução dos outros.
+        """
+        func = getattr(self.backend, name)
+        if not self.coalesce:
+            return await self._run(func, *args, **kwargs)
+        key = (self.backend.data_version, name, _freeze(args), _freeze(sorted(kwargs.items())))
+        future = self._in_flight.get(key)
+        if future is not None:
+            coalescing.record(name, coalesced=True)
+            return await asyncio.shield(future)
+        coalescing.record(name, coalesced=False)
+        future = asyncio.ensure_future(self._run(func, *args, **kwargs))
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def snapshot(self) -> "AsyncDatabase":
+        """
+        Fachada sobre uma visão fixa dos dados atuais (ver
+        `StorageBackend.snapshot`), com o mesmo pool de threads e a mesma
+        coalescência (as chaves incluem a versão dos dados).
+        """
+        view = copy.copy(self)
+        view.backend = self.backend.snapshot()
+        return view
+
+    def shutdown(self) -> None:
+        """Encerra o pool de threads (chamado no fim do lifespan)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def load(self) -> bool:
+        """Faz a carga adiada (LAZY_INIT) fora do event loop; usado no lifespan"""
+        return await self._run(self.backend.ensure_loaded)
+
+    async def warm_up(self) -> Dict[str, float]:
+        """Constrói os índices e agregados do backend; segundos por etapa"""
+        return await self._run(self.backend.warm_up)
+
+    # Metadados: O(1), respondidos direto no event loop
+
+    def is_loaded(self) -> bool:
+        # Sem lifespan (ex: alguns runtimes serverless), a carga adiada
+        # acontece aqui, na primeira consulta
+        return self.backend.ensure_loaded()
+
+    def get_total_count(self) -> int:
+        return self.backend.get_total_count()
+
+    def data_version(self) -> int:
+        return self.backend.data_version
+
+    def ingest_stats(self) -> Optional[Dict]:
+        return self.backend.ingest_stats
+
+    def get_all_categories(self) -> List[str]:
+        return self.backend.get_all_categories()
+
+    def get_index_sizes(self) -> Dict[str, int]:
+        return self.backend.get_index_sizes()
+
+    # Consultas: executadas no pool de threads
+
+    async def suggest(self, query: str, limit: int = 10) -> Dict:
+        # No SQLite, buscar os títulos é I/O (e pode esperar por uma conexão do pool)
+        return await self._query("suggest", query, limit)
+
+    async def get_all_books(self, skip: int = 0, limit: int = 20, fields: Optional[Sequence[str]] = None) -> List[Dict]:
+        return await self._query("get_all_books", skip, limit, fields)
+
+    async def get_book_by_id(self, book_id: int) -> Optional[Dict]:
+        return await self._query("get_book_by_id", book_id)
+
+    async def search_books(
+        self,
+        title: Optional[str] = None,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Dict]:
+        return await self._query("search_books", title, category, skip, limit)
+
+    async def query_books(self, **criteria) -> Dict:
+        """Consulta composta; aceita os mesmos argumentos de `query_books` do backend"""
+        return await self._query("query_books", **criteria)
+
+    async def fuzzy_search_books(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Dict:
+        return await self._query("fuzzy_search_books", query, category, skip, limit)
+
+    async def get_stats_overview(self) -> Dict:
+        return await self._query("get_stats_overview")
+
+    async def get_stats_by_category(self) -> List[Dict]:
+        return await self._query("get_stats_by_category")
+
+    async def get_top_rated_books(self, limit: int = 10, fields: Optional[Sequence[str]] = None) -> List[Dict]:
+        return await self._query("get_top_rated_books", limit, fields)
+
+    async def get_books_by_price_range(
+        self,
+        min_price: float,
+        max_price: float,
+        skip: int = 0,
+        limit: int = 20,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Dict]:
+        return await self._query("get_books_by_price_range", min_price, max_price, skip, limit, fields)
+
+
+def _freeze(value):
+    """Converte listas (ex: facetas) em tuplas para compor a chave de coalescência"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# Instância global assíncrona (mesmo backend do singleton `api.database.db`)
+db = AsyncDatabase(backend_db)
@@ -2,10 +2,13 @@
 Módulo de Autenticação JWT
 """
 
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import hashlib
+import threading
+import time
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
@@ -14,6 +17,10 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# Cache de tokens já verificados (evita refazer decode + HMAC a cada requisição)
+TOKEN_CACHE_MAX_SIZE = 4096
+TOKEN_CACHE_TTL_SECONDS = 300
+
 security = HTTPBearer()
 
 
@@ -54,15 +61,86 @@ def decode_token(token: str) -> dict:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+class TokenCache:
+    """
+    Cache LRU de tokens já verificados.
+
+    A chave é o SHA-256 do token (o token em si não fica em memória) e cada
+    entrada expira no que vier primeiro: o `exp` do token ou o TTL do cache.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_MAX_SIZE, ttl: float = TOKEN_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Retorna o payload de um token verificado, ou None se ausente/expirado"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, payload = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        """Guarda o payload de um token recém-verificado"""
+        expires_at = time.time() + self.ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Retorna tamanho e contadores do cache (para métricas)"""
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache()
+
+
+def verify_token(token: str) -> dict:
+    """Decodifica e valida um token JWT, reaproveitando verificações anteriores"""
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_token(token)
+        token_cache.put(token, payload)
+    return payload
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Dependency para obter o usuário atual a partir do token"""
-    payload = decode_token(credentials.credentials)
+    payload = verify_token(credentials.credentials)
     if payload.get("type") != "access":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
     username = payload.get("sub")
     if username is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
-    return {"username": username}
+    return {"username": username, "role": payload.get("role")}
 
 
 # Usuários fake para demonstração (senhas em hash SHA256)
@@ -87,3 +165,29 @@ def authenticate_user(username: str, password: str) -> Optional[dict]:
         return None
     return user
 
+
+def get_role(payload: dict) -> Optional[str]:
+    """Retorna o papel do usuário a partir das claims do token"""
+    role = payload.get("role")
+    if role is None:
+        # Tokens emitidos antes do papel ir para as claims
+        user = FAKE_USERS_DB.get(payload.get("sub") or payload.get("username"))
+        role = user.get("role") if user else None
+    return role
+
+
+async def admin_required(user: dict = Depends(get_current_user)) -> dict:
+    """Dependency que restringe o acesso a usuários admin"""
+    if get_role(user) != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso permitido apenas para admin.")
+    return user
+
+
+def is_admin_token(token: str) -> bool:
+    """Verifica, sem lançar exceção, se um token de acesso pertence a um admin"""
+    try:
+        payload = verify_token(token)
+    except HTTPException:
+        return False
+    return payload.get("type") == "access" and get_role(payload) == "admin"
+
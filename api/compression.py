@@ -0,0 +1,268 @@
+"""
+Compressão de Respostas
+
+Middleware ASGI que negocia `Accept-Encoding` (brotli, zstd ou gzip) e
+comprime respostas acima de `COMPRESSION_MIN_SIZE`. brotli e zstd são
+opcionais: sem os pacotes `brotli`/`zstandard`, só gzip é oferecido.
+
+Listagens repetem URLs e nomes de categoria, então comprimem muito, mas
+recomprimir o mesmo corpo a cada acesso custa CPU. Respostas GET 200 ficam
+em um cache (LRU, limitado em bytes) indexado por (versão dos dados,
+método, URL, encoding). A aplicação continua rodando em todo acesso (auth,
+rate limiting e métricas valem sempre); o cache só evita a recompressão,
+e um digest do corpo garante que uma resposta diferente nunca receba o
+corpo comprimido de outra. Quando os dados são recarregados, a versão
+muda e o cache é descartado.
+
+Corpos grandes (`COMPRESSION_THREAD_MIN_SIZE`) são comprimidos em uma
+thread, para não travar o event loop. Respostas a HEAD passam intactas:
+não têm corpo, e o content-length delas é o da resposta GET.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import anyio
+
+from api.config import (
+    COMPRESSION_CACHE_EXCLUDE,
+    COMPRESSION_CACHE_MAX_BYTES,
+    COMPRESSION_ENCODINGS,
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_THREAD_MIN_SIZE,
+)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+# Níveis pensados para conteúdo dinâmico (bom ganho sem muita CPU)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+# Tipos de conteúdo que valem a pena comprimir
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+# Exceções aos tipos acima: streaming, que não pode ser bufferizado
+STREAMING_TYPES = ("text/event-stream",)
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    """Encodings disponíveis neste ambiente"""
+    available = {"gzip": lambda data: gzip.compress(data, GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        available["br"] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        lock = threading.Lock()  # ZstdCompressor não é thread-safe
+
+        def zstd(data: bytes) -> bytes:
+            with lock:
+                return compressor.compress(data)
+        available["zstd"] = zstd
+    return available
+
+
+COMPRESSORS = _compressors()
+
+
+def negotiate(accept_encoding: str, preference=COMPRESSION_ENCODINGS) -> Optional[str]:
+    """
+    Escolhe o encoding da resposta.
+
+    Args:
+        accept_encoding: Valor do header Accept-Encoding
+        preference: Encodings do servidor, do preferido para o menos preferido
+
+    Returns:
+        O encoding com maior q-value aceito pelo cliente (empate: preferência
+        do servidor), ou None para enviar sem compressão
+    """
+    accepted = {}  # type: Dict[str, float]
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in preference:
+        if encoding not in COMPRESSORS:
+            continue
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressedCache:
+    """Corpos já comprimidos, LRU limitado em bytes e atrelado à versão dos dados"""
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.version = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    def _sync(self, version) -> None:
+        if version != self.version:
+            self._entries.clear()
+            self.bytes = 0
+            self.version = version
+
+    def get(self, version, key: Tuple, digest: bytes) -> Optional[bytes]:
+        with self._lock:
+            self._sync(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == digest:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, version, key: Tuple, digest: bytes, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._sync(version)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old[1])
+            self._entries[key] = (digest, body)
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
+
+
+class CompressionMiddleware:
+    """Comprime respostas conforme Accept-Encoding (ASGI puro, sem BaseHTTPMiddleware)"""
+
+    def __init__(
+        self,
+        app,
+        version: Callable[[], object],
+        cache: CompressedCache,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        thread_min_size: int = COMPRESSION_THREAD_MIN_SIZE
+    ):
+        """
+        Args:
+            app: Aplicação ASGI
+            version: Função que devolve a versão atual dos dados
+            cache: Cache de corpos comprimidos
+            minimum_size: Corpos menores seguem sem compressão
+            thread_min_size: Corpos a partir deste tamanho são comprimidos em uma thread
+        """
+        self.app = app
+        self.version = version
+        self.cache = cache
+        self.minimum_size = minimum_size
+        self.thread_min_size = thread_min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        encoding = negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        chunks = []
+        passthrough = False
+
+        async def buffered_send(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                response_headers = dict(message.get("headers", ()))
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                if (b"content-encoding" in response_headers
+                        or content_type.startswith(STREAMING_TYPES)
+                        or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                    passthrough = True  # já comprimida, binária ou streaming (SSE)
+                    await send(message)
+                else:
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                await self._finish(scope, encoding, start, b"".join(chunks), send)
+
+        await self.app(scope, receive, buffered_send)
+
+    async def _finish(self, scope, encoding: str, start, body: bytes, send) -> None:
+        """Envia a resposta bufferizada, comprimida se valer a pena"""
+        headers = [(k, v) for k, v in start.get("headers", ()) if k != b"content-length"]
+        _add_vary(headers)  # Comprimida ou não, a resposta depende do Accept-Encoding
+        if len(body) < self.minimum_size:
+            headers.append((b"content-length", str(len(body)).encode()))
+            await send(dict(start, headers=headers))
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        cacheable = (scope["method"] == "GET" and start["status"] == 200
+                     and not scope["path"].startswith(COMPRESSION_CACHE_EXCLUDE))
+        compressed = None
+        if cacheable:
+            version = self.version()
+            key = (scope["method"], scope["path"], scope.get("query_string", b""), encoding)
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            compressed = self.cache.get(version, key, digest)
+        if compressed is None:
+            compress = COMPRESSORS[encoding]
+            if len(body) >= self.thread_min_size:
+                compressed = await anyio.to_thread.run_sync(compress, body)
+            else:
+                compressed = compress(body)
+            if cacheable:
+                self.cache.put(version, key, digest, compressed)
+
+        headers.append((b"content-encoding", encoding.encode()))
+        headers.append((b"content-length", str(len(compressed)).encode()))
+        await send(dict(start, headers=headers))
+        await send({"type": "http.response.body", "body": compressed})
+
+
+def _add_vary(headers) -> None:
+    """Acrescenta `Vary: Accept-Encoding`, se ainda não estiver presente"""
+    vary = [v for k, v in headers if k == b"vary"]
+    if not any(b"accept-encoding" in v.lower() for v in vary):
+        headers.append((b"vary", b"Accept-Encoding"))
+
+
+# Instância global do cache de corpos comprimidos (singleton)
+compressed_cache = CompressedCache()
@@ -4,13 +4,46 @@ Configurações da API
 Contém todas as configurações e constantes da aplicação.
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Diretório base do projeto
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Caminho para o arquivo CSV com os dados
-DATA_PATH = BASE_DIR / "data" / "books.csv"
+# Caminho para os dados: um CSV (carregado em memória) ou um banco SQLite
+# gerado com `python -m api.storage.sqlite` (extensão .db/.sqlite/.sqlite3)
+DATA_PATH = Path(os.getenv("DATA_PATH", str(BASE_DIR / "data" / "books.csv")))
+
+# Log versionado de alterações entre scrapings (feed /books/changes)
+CHANGES_DB_PATH = Path(os.getenv("CHANGES_DB_PATH", str(BASE_DIR / "data" / "changes.db")))
+
+# Histórico de preços entre scrapings (pontos brutos + rollups diários/semanais)
+PRICE_HISTORY_DIR = Path(os.getenv("PRICE_HISTORY_DIR", str(BASE_DIR / "data" / "history")))
+
+# Carga do CSV em blocos paralelos (pool de processos; 0 = número de CPUs)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0"))
+INGEST_CHUNK_BYTES = int(os.getenv("INGEST_CHUNK_BYTES", str(8 * 1024 * 1024)))
+# Arquivos menores são lidos no próprio processo (subir o pool custaria mais)
+INGEST_PARALLEL_MIN_BYTES = int(os.getenv("INGEST_PARALLEL_MIN_BYTES", str(16 * 1024 * 1024)))
+
+# Inicialização preguiçosa (serverless): o import não lê os dados; a carga
+# acontece no lifespan ou na primeira consulta, o que vier antes
+LAZY_INIT = os.getenv("LAZY_INIT", "0") == "1"
+
+# Aquecimento em segundo plano após o startup (índices, caches de resposta);
+# /api/v1/health/ready só responde 200 quando ele termina
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+# Rotas requisitadas no aquecimento (as mais acessadas), uma vez por encoding
+WARMUP_PATHS = tuple(p.strip() for p in os.getenv(
+    "WARMUP_PATHS",
+    "/api/v1/books?page=1&page_size=20,/api/v1/categories,/api/v1/stats/overview,"
+    "/api/v1/stats/categories,/api/v1/books/top-rated?limit=10,/api/v1/books/search?title=the"
+).split(",") if p.strip())
+WARMUP_ENCODINGS = tuple(e.strip() for e in os.getenv("WARMUP_ENCODINGS", "br,gzip").split(",") if e.strip())
+
+# Arquivo de log (vazio = só console, ex: sistemas de arquivos somente leitura)
+LOG_FILE = os.getenv("LOG_FILE", "logs/api.log")
 
 # Configurações da API
 API_TITLE = "Books API - Tech Challenge"
@@ -36,3 +69,65 @@ Projeto completo com web scraping, API REST e boas práticas de desenvolvimento.
 # Configurações de paginação
 DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
+
+# Configurações de profiling sob demanda
+# PROFILE_SAMPLE_RATE=N perfila 1 a cada N requisições (0 desativa a amostragem;
+# admins ainda podem pedir um perfil com o header X-Profile: 1 ou ?profile=1)
+PROFILE_SAMPLE_RATE = int(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "100"))
+PROFILE_TOP_FUNCTIONS = 25
+
+# Rate limiting por cliente (token bucket) e load shedding
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "20"))  # tokens repostos por segundo
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "60"))  # capacidade do balde
+# "memory" (por worker) ou "sqlite" (compartilhado entre workers da mesma máquina)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SQLITE_PATH = os.getenv(
+    "RATE_LIMIT_SQLITE_PATH", str(Path(tempfile.gettempdir()) / "books_api_rate_limit.db")
+)
+# Custo (em tokens) das rotas mais pesadas; as demais custam 1
+RATE_LIMIT_ROUTE_COSTS = {
+    "/api/v1/books/search": 5,
+    "/api/v1/books/query": 5,
+    "/api/v1/books/search/fuzzy": 5,
+    "/api/v1/books/price-range": 3,
+    "/api/v1/stats/overview": 3,
+    "/api/v1/stats/categories": 3,
+    "/api/v1/ml/features": 5,
+    "/api/v1/ml/training-data": 10,
+    "/api/v1/scraping/trigger": 20,
+}  # /api/v1/batch custa a soma das rotas equivalentes às sub-consultas
+RATE_LIMIT_EXEMPT_PATHS = ("/metrics", "/api/v1/health", "/api/v1/health/live", "/api/v1/health/ready")
+# Rejeita com 503 quando há requisições demais em andamento ou o event loop está atrasado
+SHED_MAX_IN_FLIGHT = int(os.getenv("SHED_MAX_IN_FLIGHT", "512"))
+SHED_MAX_LOOP_LAG_MS = float(os.getenv("SHED_MAX_LOOP_LAG_MS", "250"))
+
+# Compressão de respostas (brotli/zstd exigem os pacotes opcionais brotli/zstandard)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes; menores seguem sem compressão
+# Encodings oferecidos, do preferido para o menos preferido
+COMPRESSION_ENCODINGS = tuple(e.strip() for e in os.getenv("COMPRESSION_ENCODINGS", "br,zstd,gzip").split(",") if e.strip())
+# Cache de corpos já comprimidos (GET 200), descartado quando os dados mudam
+COMPRESSION_CACHE_MAX_BYTES = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Corpos a partir deste tamanho são comprimidos em uma thread (não travam o event loop)
+COMPRESSION_THREAD_MIN_SIZE = int(os.getenv("COMPRESSION_THREAD_MIN_SIZE", str(64 * 1024)))
+# Rotas cujo corpo não depende só dos dados (não entram no cache)
+COMPRESSION_CACHE_EXCLUDE = ("/metrics", "/api/v1/health", "/api/v1/monitoring", "/api/v1/scraping")
+
+# Acesso assíncrono aos dados: threads dedicadas às consultas (tira o
+# trabalho do event loop) e conexões do pool do backend SQLite
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "8"))
+# Consultas idênticas concorrentes compartilham uma única execução (single-flight)
+COALESCE_QUERIES = os.getenv("COALESCE_QUERIES", "1") == "1"
+
+# Máximo de sub-consultas por requisição em /api/v1/batch
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "20"))
+
+# Busca aproximada por título (índice de trigramas + distância de edição)
+FUZZY_MIN_SCORE = float(os.getenv("FUZZY_MIN_SCORE", "0.6"))  # similaridade mínima (0 a 1)
+# Constrói o índice de trigramas junto com a carga dos dados (senão, na primeira busca);
+# só vale para o backend colunar, o SQLite lê o índice gravado no banco
+FUZZY_INDEX_AT_LOAD = os.getenv("FUZZY_INDEX_AT_LOAD", "1") == "1"
+
+# Autocomplete: completions pré-calculadas por prefixo (e máximo por resposta)
+SUGGEST_TOP_N = int(os.getenv("SUGGEST_TOP_N", "10"))
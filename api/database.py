@@ -3,31 +3,79 @@ Módulo de Acesso aos Dados
 
 Gerencia o carregamento e consulta dos dados dos livros.
 Refatorado para não depender de pandas (reduz bundle no Vercel).
+
+O backend padrão mantém o CSV em memória, em colunas tipadas (ver
+`api/storage/columnar.py`); um arquivo `.db`/`.sqlite` em `DATA_PATH`
+seleciona o backend SQLite (ver `api/storage/sqlite.py`). Sob o launcher
+multi-processo (`api/server.py`), os workers usam o snapshot colunar
+publicado em memória compartilhada em vez de ler o CSV.
 """
 
-import csv
-from typing import List, Dict, Optional
+import copy
+import os
+
+from typing import List, Dict, Optional, Sequence
 from pathlib import Path
-from api.config import DATA_PATH
+from api.config import DATA_PATH, LAZY_INIT, FUZZY_INDEX_AT_LOAD, FUZZY_MIN_SCORE, SUGGEST_TOP_N
+from api.monitoring.profiler import phase
+from api.storage.base import StorageBackend, timed_steps
+from api.storage.columnar import BookColumns
+from api.storage.fuzzy import normalize, rank
+from api.storage.ingest import load_columns
+from api.storage.query import FACET_FIELDS, BookQuery, category_rows, execute, facet_counts
+
+# Extensões de DATA_PATH que selecionam o backend SQLite
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# Variável de ambiente com o nome do bloco de controle do snapshot compartilhado
+SNAPSHOT_ENV = "BOOKS_API_SNAPSHOT"
 
 
-class BooksDatabase:
-    """Classe para gerenciar o acesso aos dados dos livros"""
+class BooksDatabase(StorageBackend):
+    """Classe para gerenciar o acesso aos dados dos livros (CSV em memória)"""
     
-    def __init__(self, csv_path: Path = DATA_PATH):
+    def __init__(self, csv_path: Path = DATA_PATH, columns: Optional[BookColumns] = None, lazy: bool = False):
         """
         Inicializa o banco de dados.
         
         Args:
             csv_path: Caminho para o arquivo CSV
+            columns: Colunas já prontas (ex: snapshot compartilhado); se
+                     informado, o CSV não é lido
+            lazy: Adia a leitura do CSV para `ensure_loaded`
         """
         self.csv_path = csv_path
-        self.records = []  # type: List[Dict]
-        self.load_data()
+        self.columns = BookColumns.from_rows([])
+        self.categories = []  # type: List[str]
+        if columns is not None:
+            self.use_columns(columns)
+        elif lazy:
+            self.defer_load()
+        else:
+            self.load_data()
+    
+    def use_columns(self, columns: BookColumns) -> None:
+        """
+        Troca atomicamente o conjunto de dados em uso.
+        
+        Cada consulta lê `self.columns` uma única vez, então consultas em
+        andamento terminam sobre o snapshot antigo.
+        """
+        if columns.count:
+            columns.suggest_index(SUGGEST_TOP_N)
+            if FUZZY_INDEX_AT_LOAD:
+                columns.trigram_index()
+        self.categories = sorted(c for c in columns.categories if c)
+        self.columns = columns
+        self.data_version += 1
+    
+    def snapshot(self) -> "BooksDatabase":
+        """Cópia rasa presa às colunas atuais (`use_columns` no original não a afeta)"""
+        return copy.copy(self)
     
     def load_data(self) -> bool:
         """
-        Carrega os dados do CSV.
+        Carrega os dados do CSV (em blocos paralelos, ver `api/storage/ingest.py`).
         
         Returns:
             True se carregou com sucesso, False caso contrário
@@ -37,30 +85,13 @@ class BooksDatabase:
                 print(f"⚠ Arquivo CSV não encontrado: {self.csv_path}")
                 return False
             
-            # Lê o CSV usando csv.DictReader
-            with self.csv_path.open(newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                data = []
-                for row in reader:
-                    try:
-                        # Conversões de tipos
-                        row['id'] = int(row.get('id', 0))
-                        price_val = row.get('price', '0')
-                        if isinstance(price_val, str):
-                            price_val = price_val.replace('£', '').strip()
-                        row['price'] = float(price_val) if price_val else 0.0
-                        row['rating'] = int(row.get('rating', 0))
-                        # Padronizar availability
-                        avail = row.get('availability', '')
-                        row['availability'] = 'In Stock' if 'in stock' in avail.lower() else 'Out of Stock'
-                        row['title'] = row.get('title', '')
-                        row['category'] = row.get('category', '')
-                        data.append(row)
-                    except Exception:
-                        continue  # Ignora linhas malformadas
-            
-            self.records = data
-            print(f"✓ Dados carregados: {len(self.records)} livros")
+            columns, stats = load_columns(self.csv_path)
+            self.use_columns(columns)
+            self.ingest_stats = stats
+            print(f"✓ Dados carregados: {columns.count} livros")
+            if stats["rows_rejected"]:
+                reasons = ", ".join(f"{reason}: {n}" for reason, n in stats["rejected_by_reason"].items())
+                print(f"⚠ {stats['rows_rejected']} linhas rejeitadas ({reasons})")
             return True
             
         except Exception as e:
@@ -69,15 +100,16 @@ class BooksDatabase:
     
     def is_loaded(self) -> bool:
         """Verifica se os dados estão carregados"""
-        return bool(self.records)
+        return self.columns.count > 0
     
-    def get_all_books(self, skip: int = 0, limit: int = 20) -> List[Dict]:
+    def get_all_books(self, skip: int = 0, limit: int = 20, fields: Optional[Sequence[str]] = None) -> List[Dict]:
         """
         Retorna todos os livros com paginação.
         
         Args:
             skip: Número de registros para pular
             limit: Número máximo de registros a retornar
+            fields: Campos a incluir em cada livro (None = todos)
             
         Returns:
             Lista de livros
@@ -85,7 +117,9 @@ class BooksDatabase:
         if not self.is_loaded():
             return []
         
-        return self.records[skip:skip + limit]
+        with phase("lookup"):
+            cols = self.columns
+            return cols.rows(range(skip, min(skip + limit, cols.count)), fields)
     
     def get_book_by_id(self, book_id: int) -> Optional[Dict]:
         """
@@ -100,10 +134,10 @@ class BooksDatabase:
         if not self.is_loaded():
             return None
         
-        for book in self.records:
-            if book.get('id') == book_id:
-                return book
-        return None
+        with phase("lookup"):
+            cols = self.columns
+            pos = cols.find_id(book_id)
+            return cols.row(pos) if pos is not None else None
     
     def search_books(
         self, 
@@ -127,110 +161,287 @@ class BooksDatabase:
         if not self.is_loaded():
             return []
         
-        filtered = self.records
+        with phase("filter"):
+            cols = self.columns
+            positions = range(cols.count)  # type: Sequence[int]
+            
+            if title:
+                positions = cols.title_folded.find_rows(title.lower().encode('utf-8'))
+            
+            if category:
+                # Resolve o substring contra o dicionário de categorias e filtra por código
+                needle = category.lower()
+                codes = {code for code, name in enumerate(cols.categories) if needle in name.lower()}
+                category_codes = cols.category_codes
+                positions = [i for i in positions if category_codes[i] in codes]
+            
+            return [cols.row(i) for i in positions[skip:skip + limit]]
+    
+    def query_books(
+        self,
+        title: Optional[str] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        in_stock: Optional[bool] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        skip: int = 0,
+        limit: int = 20,
+        facets: Sequence[str] = (),
+        fields: Optional[Sequence[str]] = None
+    ) -> Dict:
+        """
+        Consulta composta: qualquer combinação de filtros, com ordenação.
         
-        if title:
-            filtered = [b for b in filtered if title.lower() in b.get('title', '').lower()]
+        A execução parte do índice mais seletivo (ver `api/storage/query.py`).
         
-        if category:
-            filtered = [b for b in filtered if category.lower() in b.get('category', '').lower()]
+        Args:
+            title: Título (ou parte dele) para buscar
+            category: Categoria (ou parte dela) para filtrar
+            min_price: Preço mínimo (inclusive)
+            max_price: Preço máximo (inclusive)
+            min_rating: Rating mínimo (inclusive)
+            max_rating: Rating máximo (inclusive)
+            in_stock: True/False para filtrar por disponibilidade
+            sort: Campo de ordenação (id, title, price ou rating); None mantém a ordem do catálogo
+            descending: Ordena de forma decrescente
+            skip: Número de registros para pular
+            limit: Número máximo de registros a retornar
+            facets: Facetas a contar sobre o resultado (category, rating, price, availability)
+            fields: Campos a incluir em cada livro da página (None = todos)
+            
+        Returns:
+            Dicionário com `total` (exato), `books` (a página), `plan` e,
+            se pedidas, `facets`
+        """
+        q = BookQuery(title, category, min_price, max_price, min_rating, max_rating, in_stock, sort, descending)
+        if not self.is_loaded():
+            return {"total": 0, "books": [], "plan": []}
         
-        return filtered[skip:skip + limit]
+        with phase("filter"):
+            return execute(self.columns, q, skip, limit, facets, fields)
+    
+    def fuzzy_search_books(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Dict:
+        """
+        Busca aproximada por título, tolerante a erros de digitação.
+        
+        Os candidatos saem do índice de trigramas, já restritos à categoria,
+        e são repontuados por distância de edição (ver `api/storage/fuzzy.py`).
+        
+        Args:
+            query: Texto digitado
+            category: Categoria (ou parte dela) para filtrar
+            skip: Número de registros para pular
+            limit: Número máximo de registros a retornar
+            
+        Returns:
+            Dicionário com `total` (todos os que passam de FUZZY_MIN_SCORE)
+            e `books` (cada um com `score`, de 0 a 1)
+        """
+        if not self.is_loaded():
+            return {"total": 0, "books": []}
+        
+        with phase("filter"):
+            cols = self.columns
+            normalized = normalize(query)
+            allowed = category_rows(cols, category) if category else None
+            candidates = cols.trigram_index().candidates(normalized, allowed)
+            ranked = rank(normalized, candidates, cols.title.__getitem__, FUZZY_MIN_SCORE)
+            books = [dict(cols.row(i), score=score) for i, score in ranked[skip:skip + limit]]
+            return {"total": len(ranked), "books": books}
+    
+    def suggest(self, query: str, limit: int = SUGGEST_TOP_N) -> Dict:
+        """
+        Autocomplete de títulos e categorias.
+        
+        Uma consulta de uma palavra é um acesso ao dicionário de prefixos,
+        com as completions já ranqueadas (ver `api/storage/suggest.py`).
+        
+        Args:
+            query: Texto digitado até agora
+            limit: Máximo de títulos e de categorias
+            
+        Returns:
+            Dicionário com `categories` (nomes) e `titles` (id, título e rating)
+        """
+        cols = self.columns
+        codes, positions = cols.suggest_index(SUGGEST_TOP_N).lookup(query, limit)
+        return {
+            "categories": [cols.categories[c] for c in codes],
+            "titles": [{"id": cols.ids[i], "title": cols.title[i], "rating": cols.ratings[i]} for i in positions],
+        }
     
     def get_all_categories(self) -> List[str]:
         """Retorna lista de todas as categorias únicas"""
         if not self.is_loaded():
             return []
         
-        categories = {b.get('category', '') for b in self.records if b.get('category')}
-        return sorted(categories)
+        return list(self.categories)
     
     def get_total_count(self) -> int:
         """Retorna o número total de livros"""
-        if not self.is_loaded():
-            return 0
-        return len(self.records)
+        return self.columns.count
+    
+    def get_index_sizes(self) -> Dict[str, int]:
+        """Retorna o número de entradas de cada estrutura auxiliar (para métricas)"""
+        cols = self.columns
+        sizes = {"categories": len(self.categories), "id_order": len(cols.id_order)}
+        for name in ("trigrams", "suggest"):
+            if name in cols.derived:
+                sizes[name] = len(cols.derived[name])
+        return sizes
+    
+    def warm_up(self) -> Dict[str, float]:
+        """Constrói todos os índices derivados do snapshot em uso e os agregados"""
+        cols = self.columns
+        if not cols.count:
+            return {}
+        timings = timed_steps((
+            ("postings", lambda: [cols.postings(c) for c in ("category_codes", "ratings", "in_stock")]),
+            ("price_index", cols.price_index),
+            ("bitmaps", lambda: facet_counts(cols, range(cols.count), FACET_FIELDS)),
+            ("trigrams", cols.trigram_index),
+            ("suggest", lambda: cols.suggest_index(SUGGEST_TOP_N)),
+        ))
+        timings.update(super().warm_up())
+        return timings
     
     def get_stats_overview(self) -> Dict:
         """Retorna estatísticas gerais da coleção"""
         if not self.is_loaded():
             return {}
         
-        prices = [b['price'] for b in self.records if isinstance(b.get('price'), (int, float))]
-        ratings = [b['rating'] for b in self.records if isinstance(b.get('rating'), (int, float))]
-        categories = {b.get('category') for b in self.records if b.get('category')}
-        in_stock = sum(1 for b in self.records if b.get('availability') == 'In Stock')
-        out_stock = sum(1 for b in self.records if b.get('availability') == 'Out of Stock')
+        cols = self.columns
+        cached = cols.derived.get("stats_overview")
+        if cached is not None:
+            return dict(cached)
         
-        return {
-            "total_books": len(self.records),
-            "total_categories": len(categories),
-            "average_price": round(sum(prices) / len(prices), 2) if prices else 0.0,
-            "min_price": round(min(prices), 2) if prices else 0.0,
-            "max_price": round(max(prices), 2) if prices else 0.0,
-            "average_rating": round(sum(ratings) / len(ratings), 2) if ratings else 0.0,
+        # Os dados só mudam com um novo snapshot: calcula uma vez por snapshot
+        with phase("aggregate"):
+            prices = cols.prices
+            total = cols.count
+            in_stock = sum(cols.in_stock)
+        
+        stats = {
+            "total_books": total,
+            "total_categories": sum(1 for c in cols.categories if c),
+            "average_price": round(sum(prices) / total, 2),
+            "min_price": round(min(prices), 2),
+            "max_price": round(max(prices), 2),
+            "average_rating": round(sum(cols.ratings) / total, 2),
             "in_stock_count": in_stock,
-            "out_of_stock_count": out_stock
+            "out_of_stock_count": total - in_stock
         }
+        cols.derived["stats_overview"] = stats
+        return dict(stats)
     
     def get_stats_by_category(self) -> List[Dict]:
         """Retorna estatísticas por categoria"""
         if not self.is_loaded():
             return []
         
-        # Agrupa por categoria
-        grouped = {}
-        for b in self.records:
-            cat = b.get('category', '')
-            if cat not in grouped:
-                grouped[cat] = []
-            grouped[cat].append(b)
+        cols = self.columns
+        cached = cols.derived.get("stats_by_category")
+        if cached is not None:
+            return [dict(r) for r in cached]
+        
+        # Agrupa por código de categoria (códigos seguem a ordem de primeira aparição)
+        with phase("aggregate"):
+            n_codes = len(cols.categories)
+            counts = [0] * n_codes
+            price_sums = [0.0] * n_codes
+            rating_sums = [0] * n_codes
+            min_prices = [float('inf')] * n_codes
+            max_prices = [float('-inf')] * n_codes
+            for code, price, rating in zip(cols.category_codes, cols.prices, cols.ratings):
+                counts[code] += 1
+                price_sums[code] += price
+                rating_sums[code] += rating
+                if price < min_prices[code]:
+                    min_prices[code] = price
+                if price > max_prices[code]:
+                    max_prices[code] = price
         
         results = []
-        for cat, books in grouped.items():
-            prices = [b['price'] for b in books if isinstance(b.get('price'), (int, float))]
-            ratings = [b['rating'] for b in books if isinstance(b.get('rating'), (int, float))]
-            
+        for code, cat in enumerate(cols.categories):
             results.append({
                 'category': cat,
-                'count': len(books),
-                'avg_price': round(sum(prices) / len(prices), 2) if prices else 0.0,
-                'min_price': round(min(prices), 2) if prices else 0.0,
-                'max_price': round(max(prices), 2) if prices else 0.0,
-                'avg_rating': round(sum(ratings) / len(ratings), 2) if ratings else 0.0,
+                'count': counts[code],
+                'avg_price': round(price_sums[code] / counts[code], 2),
+                'min_price': round(min_prices[code], 2),
+                'max_price': round(max_prices[code], 2),
+                'avg_rating': round(rating_sums[code] / counts[code], 2),
             })
         
         # Ordena por count decrescente
         results.sort(key=lambda x: x['count'], reverse=True)
-        return results
+        cols.derived["stats_by_category"] = results
+        return [dict(r) for r in results]
     
-    def get_top_rated_books(self, limit: int = 10) -> List[Dict]:
+    def get_top_rated_books(self, limit: int = 10, fields: Optional[Sequence[str]] = None) -> List[Dict]:
         """Retorna os livros com melhor avaliação"""
         if not self.is_loaded():
             return []
         
-        top_books = [b for b in self.records if b.get('rating') == 5]
-        top_books.sort(key=lambda x: x.get('title', ''))
-        return top_books[:limit]
+        with phase("filter"):
+            cols = self.columns
+            top_positions = cols.derived.get("top_rated")
+            if top_positions is None:
+                title = cols.title
+                top_positions = [i for i, r in enumerate(cols.ratings) if r == 5]
+                top_positions.sort(key=lambda i: title[i])
+                cols.derived["top_rated"] = top_positions
+            return cols.rows(top_positions[:limit], fields)
     
     def get_books_by_price_range(
         self, 
         min_price: float, 
         max_price: float,
         skip: int = 0,
-        limit: int = 20
+        limit: int = 20,
+        fields: Optional[Sequence[str]] = None
     ) -> List[Dict]:
         """Retorna livros dentro de uma faixa de preço"""
         if not self.is_loaded():
             return []
         
-        filtered = [
-            b for b in self.records 
-            if isinstance(b.get('price'), (int, float)) and min_price <= b['price'] <= max_price
-        ]
-        return filtered[skip:skip + limit]
+        with phase("filter"):
+            cols = self.columns
+            filtered = [i for i, price in enumerate(cols.prices) if min_price <= price <= max_price]
+            return cols.rows(filtered[skip:skip + limit], fields)
+
+
+def create_database(path: Path = DATA_PATH, lazy: bool = LAZY_INIT) -> StorageBackend:
+    """
+    Cria o backend de dados adequado para o caminho configurado.
+    
+    Args:
+        path: CSV (backend em memória) ou arquivo SQLite (.db/.sqlite/.sqlite3)
+        lazy: Adia a carga para o lifespan ou a primeira consulta (`ensure_loaded`)
+        
+    Returns:
+        Instância do backend (já carregada, exceto com `lazy`)
+    """
+    snapshot = os.getenv(SNAPSHOT_ENV)
+    if snapshot:
+        # Worker do launcher multi-processo: usa o snapshot compartilhado
+        from api.storage.shared import attach_database
+        return attach_database(snapshot, Path(path))
+    if Path(path).suffix.lower() in SQLITE_SUFFIXES:
+        from api.storage.sqlite import SQLiteBackend
+        return SQLiteBackend(Path(path), lazy=lazy)
+    return BooksDatabase(Path(path), lazy=lazy)
 
 
 # Instância global do banco de dados (singleton)
-db = BooksDatabase()
+db = create_database()
 
@@ -5,24 +5,36 @@ API pública para consulta de livros extraídos via web scraping.
 Inclui autenticação JWT, endpoints ML-Ready e monitoramento.
 """
 
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from api.config import API_TITLE, API_VERSION, API_DESCRIPTION
-from api.routers import health, books, categories, stats, auth, scraping
+from api.routers import health, books, categories, stats, auth, scraping, metrics, profiling, changes, history, batch
 from api.ml import endpoints as ml_endpoints
-from api.database import db
-from api.monitoring.middleware import log_requests
+from api.async_database import db
+from api.compression import CompressionMiddleware, compressed_cache
+from api.monitoring.middleware import log_requests, limit_requests
+from api.monitoring.rate_limiter import rate_limiter
+from api.warmup import warmup
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia o ciclo de vida da aplicação"""
     print("API iniciando...")
+    await db.load()  # No-op, exceto com LAZY_INIT
     if db.is_loaded():
         print(f"Dados carregados: {db.get_total_count()} livros")
+    # Mede o atraso do event loop para o load shedding
+    lag_task = asyncio.create_task(rate_limiter.loop_monitor.run())
+    # Índices e caches aquecem em segundo plano; até lá, /health/ready responde 503
+    warmup.start(app)
     yield
+    warmup.cancel()
+    lag_task.cancel()
+    db.shutdown()
     print("API encerrando...")
 
 
@@ -42,6 +54,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão (br/zstd/gzip), por dentro do rate limiting e do monitoramento
+app.add_middleware(CompressionMiddleware, version=db.data_version, cache=compressed_cache)
+
+# Middleware de rate limiting / load shedding (registrado antes do de
+# monitoramento para ficar por dentro dele: rejeições também são logadas)
+app.middleware("http")(limit_requests)
+
 # Middleware de monitoramento
 app.middleware("http")(log_requests)
 
@@ -50,9 +69,14 @@ app.include_router(auth.router)  # Autenticação
 app.include_router(ml_endpoints.router)  # ML endpoints
 app.include_router(stats.router)  # Estatísticas
 app.include_router(categories.router)  # Categorias
+app.include_router(changes.router)  # Feed de alterações (antes de /books/{book_id})
+app.include_router(history.router)  # Histórico de preços
 app.include_router(books.router)  # Livros
+app.include_router(batch.router)  # Lote de consultas
 app.include_router(health.router)  # Health
 app.include_router(scraping.router)  # Scraping
+app.include_router(metrics.router)  # Métricas (Prometheus)
+app.include_router(profiling.router)  # Profiling (admin)
 
 
 @app.get("/")
@@ -66,7 +90,8 @@ async def root():
             "web_scraping": True,
             "jwt_auth": True,
             "ml_ready": True,
-            "monitoring": True
+            "monitoring": True,
+            "metrics": "/metrics"
         }
     }
 
@@ -2,27 +2,38 @@
 Endpoints ML-Ready
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends
 from typing import List, Dict
-from api.database import db
+from api.async_database import db
 from api.auth.jwt_handler import get_current_user
+from api.monitoring.profiler import ProfiledRoute
+
+router = APIRouter(prefix="/api/v1/ml", tags=["Machine Learning"], route_class=ProfiledRoute)
 
-router = APIRouter(prefix="/api/v1/ml", tags=["Machine Learning"])
+# Colunas expostas como dados de treinamento
+TRAINING_FIELDS = ["title", "price", "rating", "category", "availability"]
 
 @router.get("/features", dependencies=[Depends(get_current_user)])
 async def get_ml_features():
     """Retorna features prontas para ML"""
     if not db.is_loaded():
         return {"error": "Dados não carregados"}
-    
+
+    # Faixa de ratings pela faceta (contagem por valor), sem percorrer os livros
+    overview, ratings = await asyncio.gather(
+        db.get_stats_overview(), db.query_books(limit=1, facets=["rating"])
+    )
+    rating_values = [int(f["value"]) for f in ratings["facets"]["rating"] if f["count"]]
     features = {
         "numeric_features": ["price", "rating"],
         "categorical_features": ["category", "availability"],
         "text_features": ["title"],
-        "total_samples": db.get_total_count(),
+        "total_samples": overview["total_books"],
         "feature_statistics": {
-            "price": {"min": float(db.df["price"].min()), "max": float(db.df["price"].max()), "mean": float(db.df["price"].mean())},
-            "rating": {"min": int(db.df["rating"].min()), "max": int(db.df["rating"].max()), "mean": float(db.df["rating"].mean())}
+            "price": {"min": overview["min_price"], "max": overview["max_price"], "mean": overview["average_price"]},
+            "rating": {"min": min(rating_values, default=0), "max": max(rating_values, default=0), "mean": overview["average_rating"]}
         }
     }
     return features
@@ -32,8 +43,8 @@ async def get_training_data(limit: int = 100):
     """Retorna dados de treinamento"""
     if not db.is_loaded():
         return {"error": "Dados não carregados"}
-    
-    data = db.df.head(limit)[["title", "price", "rating", "category", "availability"]].to_dict("records")
+
+    data = await db.get_all_books(0, limit, TRAINING_FIELDS)
     return {"total": len(data), "data": data}
 
 @router.post("/predictions", dependencies=[Depends(get_current_user)])
@@ -5,7 +5,7 @@ Define os schemas para validação de entrada e saída da API.
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 
 class Book(BaseModel):
@@ -42,6 +42,108 @@ class BooksListResponse(BaseModel):
     books: List[Book] = Field(..., description="Lista de livros")
 
 
+class ScoredBook(Book):
+    """Livro com a similaridade da busca aproximada"""
+    score: float = Field(..., ge=0, le=1, description="Similaridade com a consulta (0 a 1)")
+
+
+class FuzzySearchResponse(BooksListResponse):
+    """Resposta da busca aproximada, ordenada por similaridade"""
+    books: List[ScoredBook] = Field(..., description="Livros, do mais para o menos similar")
+
+
+class TitleSuggestion(BaseModel):
+    """Título sugerido pelo autocomplete"""
+    id: int = Field(..., description="ID do livro")
+    title: str = Field(..., description="Título do livro")
+    rating: int = Field(..., description="Avaliação do livro (0-5 estrelas)")
+
+
+class SuggestResponse(BaseModel):
+    """Completions para o texto digitado"""
+    query: str = Field(..., description="Texto digitado")
+    categories: List[str] = Field(..., description="Categorias com alguma palavra iniciada pelo texto")
+    titles: List[TitleSuggestion] = Field(..., description="Títulos, do melhor para o pior rating")
+
+
+class BookChange(BaseModel):
+    """Uma alteração do catálogo entre dois scrapings"""
+    version: int = Field(..., description="Versão do feed em que a alteração entrou")
+    kind: str = Field(..., description="added, removed, price_changed ou availability_changed")
+    book_url: str = Field(..., description="URL do livro (chave estável entre scrapings)")
+    title: str = Field(..., description="Título do livro")
+    old_price: Optional[float] = Field(None, description="Preço anterior")
+    new_price: Optional[float] = Field(None, description="Preço novo")
+    old_availability: Optional[str] = Field(None, description="Disponibilidade anterior")
+    new_availability: Optional[str] = Field(None, description="Disponibilidade nova")
+
+
+class ChangeVersion(BaseModel):
+    """Uma versão do feed de alterações"""
+    version: int = Field(..., description="Número da versão")
+    created_at: str = Field(..., description="Momento da gravação (UTC, ISO 8601)")
+    change_count: int = Field(..., description="Alterações na versão")
+
+
+class ChangesResponse(BaseModel):
+    """Alterações posteriores a uma versão"""
+    since: int = Field(..., description="Versão informada pelo cliente")
+    latest_version: int = Field(..., description="Versão mais recente do feed")
+    next_since: int = Field(..., description="Valor de `since` para a próxima chamada")
+    has_more: bool = Field(..., description="Há versões além das incluídas nesta resposta")
+    versions: List[ChangeVersion] = Field(..., description="Versões incluídas")
+    changes: List[BookChange] = Field(..., description="Alterações, em ordem de gravação")
+
+
+class PricePoint(BaseModel):
+    """Preço de um livro em um scraping"""
+    timestamp: str = Field(..., description="Momento do scraping (UTC, ISO 8601)")
+    price: float = Field(..., description="Preço")
+    availability: str = Field(..., description="Disponibilidade")
+
+
+class PriceRollup(BaseModel):
+    """Preços agregados em um dia ou semana"""
+    bucket: str = Field(..., description="Início do período (data UTC; semanas começam na segunda-feira)")
+    samples: int = Field(..., description="Preços agregados no período")
+    min_price: float = Field(..., description="Menor preço")
+    max_price: float = Field(..., description="Maior preço")
+    avg_price: float = Field(..., description="Preço médio")
+    last_price: Optional[float] = Field(None, description="Último preço do período (só por livro)")
+    in_stock_ratio: float = Field(..., description="Fração dos preços com o livro em estoque")
+
+
+class BookPriceHistoryResponse(BaseModel):
+    """Histórico de preço de um livro"""
+    book_id: int = Field(..., description="ID do livro no catálogo atual")
+    title: str = Field(..., description="Título do livro")
+    resolution: str = Field(..., description="raw, daily ou weekly")
+    points: List[Union[PricePoint, PriceRollup]] = Field(..., description="Pontos em ordem cronológica")
+
+
+class CategoryPriceTrendResponse(BaseModel):
+    """Tendência de preço de uma categoria"""
+    category: str = Field(..., description="Nome da categoria")
+    resolution: str = Field(..., description="daily ou weekly")
+    points: List[PriceRollup] = Field(..., description="Períodos em ordem cronológica")
+
+
+class FacetValue(BaseModel):
+    """Contagem de um valor de faceta"""
+    value: str = Field(..., description="Valor (categoria, rating, faixa de preço ou disponibilidade)")
+    count: int = Field(..., description="Livros do resultado com este valor")
+
+
+class BookSearchResponse(BooksListResponse):
+    """Resposta de busca, com facetas opcionais"""
+    facets: Optional[Dict[str, List[FacetValue]]] = Field(None, description="Contagens por faceta (com facets=...)")
+
+
+class BookQueryResponse(BookSearchResponse):
+    """Resposta da consulta composta"""
+    plan: Optional[List[str]] = Field(None, description="Passos executados pelo planejador (com explain=true)")
+
+
 class CategoryResponse(BaseModel):
     """Resposta para lista de categorias"""
     total: int = Field(..., description="Número total de categorias")
@@ -70,6 +172,27 @@ class CategoryStats(BaseModel):
     avg_rating: float = Field(..., description="Avaliação média")
 
 
+class RejectedRow(BaseModel):
+    """Exemplo de linha rejeitada na carga"""
+    line: int = Field(..., description="Número (aproximado) do registro no CSV")
+    reason: str = Field(..., description="Motivo da rejeição")
+
+
+class IngestStats(BaseModel):
+    """Estatísticas da última carga do CSV"""
+    source: str = Field(..., description="Arquivo carregado")
+    bytes: int = Field(..., description="Tamanho do arquivo")
+    rows_loaded: int = Field(..., description="Linhas carregadas")
+    rows_rejected: int = Field(..., description="Linhas rejeitadas")
+    rejected_by_reason: Dict[str, int] = Field(..., description="Rejeições por motivo")
+    rejected_samples: List[RejectedRow] = Field(..., description="Algumas linhas rejeitadas")
+    chunks: int = Field(..., description="Blocos em que o arquivo foi dividido")
+    workers: int = Field(..., description="Processos usados na conversão")
+    parse_seconds: float = Field(..., description="Tempo de leitura e conversão dos blocos")
+    seconds: float = Field(..., description="Tempo total da carga")
+    rows_per_second: Optional[float] = Field(None, description="Linhas carregadas por segundo")
+
+
 class HealthResponse(BaseModel):
     """Resposta do health check"""
     model_config = {"protected_namespaces": ()}
@@ -79,4 +202,65 @@ class HealthResponse(BaseModel):
     data_loaded: bool = Field(..., description="Indica se os dados estão carregados")
     total_books: int = Field(..., description="Total de livros disponíveis")
     message: str = Field(..., description="Mensagem informativa")
+    ingest: Optional[IngestStats] = Field(None, description="Estatísticas da última carga do CSV")
+
+
+class LivenessResponse(BaseModel):
+    """Resposta do liveness check"""
+    status: str = Field(..., description="Sempre 'alive' enquanto o processo responde")
+    uptime_seconds: float = Field(..., description="Segundos desde o import da aplicação")
+
+
+class WarmupStep(BaseModel):
+    """Uma etapa do aquecimento"""
+    name: str = Field(..., description="Etapa (indexes ou responses)")
+    status: str = Field(..., description="running, done ou failed")
+    seconds: Optional[float] = Field(None, description="Duração da etapa")
+    detail: Optional[Dict[str, float]] = Field(None, description="Segundos por índice ou por rota")
+    error: Optional[str] = Field(None, description="Erro, se a etapa falhou")
+
+
+class WarmupStatus(BaseModel):
+    """Progresso do aquecimento do worker"""
+    state: str = Field(..., description="pending, running, done ou disabled")
+    failed: List[str] = Field(default_factory=list, description="Etapas que falharam")
+    progress: float = Field(..., description="Fração das etapas concluídas (0 a 1)")
+    started_at: Optional[str] = Field(None, description="Início do aquecimento (ISO 8601)")
+    seconds: Optional[float] = Field(None, description="Duração total do aquecimento")
+    steps: List[WarmupStep] = Field(..., description="Etapas já iniciadas, em ordem")
+
+
+class ReadinessResponse(BaseModel):
+    """Resposta do readiness check"""
+    ready: bool = Field(..., description="Dados carregados e aquecimento concluído sem falhas")
+    status: str = Field(..., description="not_loaded, warming_up, degraded ou ready")
+    data_loaded: bool = Field(..., description="Indica se os dados estão carregados")
+    total_books: int = Field(..., description="Total de livros disponíveis")
+    warmup: WarmupStatus = Field(..., description="Progresso e tempos do aquecimento")
+
+
+class BatchQuery(BaseModel):
+    """Uma sub-consulta do lote"""
+    id: Optional[str] = Field(None, description="Identificador livre, repetido no resultado")
+    op: str = Field(..., description="Operação (books, book, search, query, fuzzy, suggest, categories, stats_overview, stats_categories, top_rated, price_range)")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Parâmetros, com os mesmos nomes da rota equivalente")
+
+
+class BatchRequest(BaseModel):
+    """Lote de sub-consultas executadas sobre o mesmo conjunto de dados"""
+    queries: List[BatchQuery] = Field(..., min_length=1, description="Sub-consultas, respondidas na mesma ordem")
+
+
+class BatchResult(BaseModel):
+    """Resultado de uma sub-consulta"""
+    id: Optional[str] = Field(None, description="Identificador informado na sub-consulta")
+    op: str = Field(..., description="Operação executada")
+    status: int = Field(..., description="Status HTTP que a rota equivalente devolveria")
+    data: Any = Field(None, description="Corpo que a rota equivalente devolveria")
+    error: Optional[str] = Field(None, description="Mensagem de erro, se status >= 400")
+
 
+class BatchResponse(BaseModel):
+    """Resultados do lote"""
+    data_version: int = Field(..., description="Versão dos dados usada por todas as sub-consultas")
+    results: List[BatchResult] = Field(..., description="Resultados, na ordem das sub-consultas")
@@ -0,0 +1,33 @@
+"""
+Contadores de Coalescência (single-flight)
+
+Quantas consultas de cada operação foram de fato executadas no backend e
+quantas aproveitaram uma execução idêntica já em andamento (ver
+`AsyncDatabase` em `api/async_database.py`). Expostos em `/metrics`.
+
+Como as métricas de requisição, são atualizados só no event loop: não há
+necessidade de locks.
+"""
+
+from typing import Dict
+
+
+class CoalescingCounters:
+    """Execuções e acertos compartilhados por operação do backend"""
+
+    def __init__(self):
+        self.executions = {}  # type: Dict[str, int]
+        self.coalesced = {}  # type: Dict[str, int]
+
+    def record(self, operation: str, coalesced: bool) -> None:
+        """Registra uma chamada: nova execução ou carona em uma em andamento"""
+        counters = self.coalesced if coalesced else self.executions
+        counters[operation] = counters.get(operation, 0) + 1
+
+    def reset(self) -> None:
+        self.executions.clear()
+        self.coalesced.clear()
+
+
+# Instância global (singleton)
+coalescing = CoalescingCounters()
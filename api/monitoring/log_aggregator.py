@@ -0,0 +1,301 @@
+"""
+Agregador Incremental de Logs
+
+Lê `logs/api.log` a partir do último offset processado e mantém agregados
+(requisições por endpoint, status codes e histogramas de latência) em um
+pequeno banco SQLite. Cada atualização processa apenas as linhas novas, então
+o custo não cresce com o tamanho do log.
+
+Os endpoints são identificados pelo template da rota (campo `route` do log,
+ex: `/api/v1/books/{book_id}`), não pelo caminho da requisição: o número de
+linhas do banco fica limitado ao número de rotas. Linhas de logs antigos,
+sem `route`, caem no caminho. O `process_time` é gravado em µs; em logs
+antigos, arredondado a 1 ms, os percentis de rotas rápidas não são confiáveis.
+
+Trata rotação (arquivo renomeado para `api.log.1`) e truncamento do arquivo,
+e ignora linhas que não são JSON válido.
+
+Uso:
+    python -m api.monitoring.log_aggregator
+"""
+
+import json
+import sqlite3
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from api.config import LOG_FILE
+from api.monitoring.metrics import Histogram, LATENCY_BUCKETS, QUANTILES
+
+DEFAULT_LOG_PATH = Path(LOG_FILE or "logs/api.log")
+DEFAULT_STATE_PATH = Path("logs") / "analytics.db"
+
+# Quantidade de bytes lida por vez do arquivo de log
+READ_CHUNK_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+-- `path` guarda o template da rota
+CREATE TABLE IF NOT EXISTS endpoint_stats (
+    path TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    total_time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS status_stats (
+    status_code INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS latency_buckets (
+    path TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (path, bucket)
+);
+"""
+
+
+class LogAggregator:
+    """Mantém agregados do log de requisições de forma incremental"""
+
+    def __init__(self, log_path: Path = DEFAULT_LOG_PATH, state_path: Path = DEFAULT_STATE_PATH):
+        """
+        Args:
+            log_path: Caminho do log JSON gerado pela API
+            state_path: Caminho do banco SQLite com offset e agregados
+        """
+        self.log_path = Path(log_path)
+        self.state_path = Path(state_path)
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.state_path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Ingestão
+    # ------------------------------------------------------------------
+
+    def update(self) -> int:
+        """
+        Processa as linhas novas do log desde a última execução.
+
+        Agregados e offset são gravados na mesma transação, então uma
+        interrupção no meio nunca conta a mesma linha duas vezes.
+
+        Returns:
+            Número de requisições agregadas nesta chamada
+        """
+        if not self.log_path.exists():
+            return 0
+
+        stat = self.log_path.stat()
+        inode = self._get_state("inode")
+        offset = self._get_state("offset") or 0
+        batch = _Batch()
+
+        if inode is not None and inode != stat.st_ino:
+            # O arquivo foi rotacionado: termina de ler o arquivo antigo
+            # (se ainda existir) antes de começar o novo do início
+            rotated = self._find_rotated(inode)
+            if rotated is not None:
+                self._consume(rotated, offset, batch)
+            offset = 0
+        elif offset > stat.st_size:
+            offset = 0  # Arquivo truncado
+
+        offset = self._consume(self.log_path, offset, batch)
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO endpoint_stats (path, count, total_time) VALUES (?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET count = count + excluded.count, "
+                "total_time = total_time + excluded.total_time",
+                [(p, c, t) for p, (c, t) in batch.endpoints.items()]
+            )
+            self.conn.executemany(
+                "INSERT INTO status_stats (status_code, count) VALUES (?, ?) "
+                "ON CONFLICT(status_code) DO UPDATE SET count = count + excluded.count",
+                list(batch.statuses.items())
+            )
+            self.conn.executemany(
+                "INSERT INTO latency_buckets (path, bucket, count) VALUES (?, ?, ?) "
+                "ON CONFLICT(path, bucket) DO UPDATE SET count = count + excluded.count",
+                [(p, b, c) for (p, b), c in batch.buckets.items()]
+            )
+            self._set_state("invalid_lines", (self._get_state("invalid_lines") or 0) + batch.invalid)
+            self._set_state("inode", stat.st_ino)
+            self._set_state("offset", offset)
+        return batch.processed
+
+    def _find_rotated(self, inode: int) -> Optional[Path]:
+        """Procura o arquivo rotacionado que ainda tem o inode antigo"""
+        for candidate in sorted(self.log_path.parent.glob(self.log_path.name + ".*")):
+            try:
+                if candidate.stat().st_ino == inode:
+                    return candidate
+            except OSError:
+                continue
+        return None
+
+    def _consume(self, path: Path, offset: int, batch: "_Batch") -> int:
+        """
+        Lê as linhas completas de `path` a partir de `offset` e agrega em `batch`.
+
+        Uma linha final sem quebra de linha (ainda sendo escrita) é deixada
+        para a próxima chamada.
+
+        Returns:
+            Offset logo após a última linha completa lida
+        """
+        with path.open("rb") as f:
+            f.seek(offset)
+            pending = b""
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                data = pending + chunk
+                last_newline = data.rfind(b"\n")
+                if last_newline < 0:
+                    pending = data
+                    continue
+                pending = data[last_newline + 1:]
+                offset += last_newline + 1  # `data` começa sempre em `offset`
+
+                for raw in data[:last_newline].split(b"\n"):
+                    if raw.strip():
+                        batch.add(raw)
+        return offset
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict:
+        """
+        Retorna os agregados acumulados.
+
+        Returns:
+            Dicionário com totais, estatísticas por endpoint (contagem, média
+            e percentis de latência) e contagem por status code
+        """
+        histograms = {}  # type: Dict[str, Histogram]
+        for path_value, bucket, bucket_count in self.conn.execute(
+            "SELECT path, bucket, count FROM latency_buckets"
+        ):
+            hist = histograms.get(path_value)
+            if hist is None:
+                hist = histograms[path_value] = Histogram()
+            hist.counts[bucket] += bucket_count
+            hist.count += bucket_count
+
+        endpoints = []
+        total_requests = 0
+        total_time = 0.0
+        for path_value, path_count, path_time in self.conn.execute(
+            "SELECT path, count, total_time FROM endpoint_stats ORDER BY count DESC"
+        ):
+            hist = histograms.get(path_value, Histogram())
+            row = {
+                "path": path_value,
+                "count": path_count,
+                "avg_time": round(path_time / path_count, 6) if path_count else 0.0,
+            }
+            for q in QUANTILES:
+                row[f"p{int(q * 100)}"] = round(hist.quantile(q), 6)
+            endpoints.append(row)
+            total_requests += path_count
+            total_time += path_time
+
+        status_codes = {
+            code: code_count
+            for code, code_count in self.conn.execute(
+                "SELECT status_code, count FROM status_stats ORDER BY status_code"
+            )
+        }
+
+        return {
+            "total_requests": total_requests,
+            "avg_time": round(total_time / total_requests, 6) if total_requests else 0.0,
+            "invalid_lines": self._get_state("invalid_lines") or 0,
+            "endpoints": endpoints,
+            "status_codes": status_codes,
+        }
+
+    def reset(self) -> None:
+        """Descarta agregados e offset (o log será relido do início)"""
+        with self.conn:
+            for table in ("state", "endpoint_stats", "status_stats", "latency_buckets"):
+                self.conn.execute(f"DELETE FROM {table}")
+
+    # ------------------------------------------------------------------
+    # Estado
+    # ------------------------------------------------------------------
+
+    def _get_state(self, key: str) -> Optional[int]:
+        row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: int) -> None:
+        self.conn.execute(
+            "INSERT INTO state (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+
+class _Batch:
+    """Agregados parciais de uma chamada de `update()`"""
+
+    __slots__ = ("endpoints", "statuses", "buckets", "invalid", "processed")
+
+    def __init__(self):
+        self.endpoints = {}  # type: Dict[str, List[float]]
+        self.statuses = {}  # type: Dict[int, int]
+        self.buckets = {}  # type: Dict[tuple, int]
+        self.invalid = 0
+        self.processed = 0
+
+    def add(self, raw: bytes) -> None:
+        """Agrega uma linha do log"""
+        try:
+            entry = json.loads(raw)
+            path = entry.get("route") or entry["path"]
+            status_code = int(entry["status_code"])
+            process_time = float(entry["process_time"])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.invalid += 1  # Linha não-JSON ou sem os campos de requisição
+            return
+
+        agg = self.endpoints.get(path)
+        if agg is None:
+            agg = self.endpoints[path] = [0, 0.0]
+        agg[0] += 1
+        agg[1] += process_time
+        self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+        key = (path, bisect_left(LATENCY_BUCKETS, process_time))
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        self.processed += 1
+
+
+def main():
+    """Atualiza os agregados e imprime um resumo"""
+    aggregator = LogAggregator()
+    processed = aggregator.update()
+    summary = aggregator.summary()
+    aggregator.close()
+
+    print(f"✓ {processed} novas requisições agregadas ({summary['total_requests']} no total)")
+    if summary["invalid_lines"]:
+        print(f"⚠ {summary['invalid_lines']} linhas ignoradas (não-JSON ou sem dados de requisição)")
+    for row in summary["endpoints"][:20]:
+        print(f"  {row['count']:>8}  p50={row['p50'] * 1000:.2f}ms  p99={row['p99'] * 1000:.2f}ms  {row['path']}")
+
+
+if __name__ == "__main__":
+    main()
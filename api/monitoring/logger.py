@@ -6,6 +6,7 @@ import logging
 import sys
 from pythonjsonlogger import jsonlogger
 from pathlib import Path
+from api.config import LOG_FILE
 
 def setup_logger(name: str = "books_api") -> logging.Logger:
     """Configura logger com formato JSON"""
@@ -21,12 +22,16 @@ def setup_logger(name: str = "books_api") -> logging.Logger:
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
     
-    # Handler para arquivo
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    file_handler = logging.FileHandler(log_dir / "api.log")
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    # Handler para arquivo (aberto só no primeiro registro; LOG_FILE vazio desativa)
+    if LOG_FILE:
+        try:
+            Path(LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.FileHandler(LOG_FILE, delay=True)
+            file_handler.setFormatter(formatter)
+            logger.addHandler(file_handler)
+        except OSError as e:
+            # Ex: sistema de arquivos somente leitura (serverless)
+            print(f"⚠ Log em arquivo desativado ({LOG_FILE}): {e}")
     
     return logger
 
@@ -0,0 +1,196 @@
+"""
+Métricas em Memória (formato Prometheus)
+
+Histogramas de latência por rota, contadores de requisições e gauges,
+coletados pelo middleware de monitoramento e expostos em `/metrics`.
+
+As atualizações acontecem sempre no event loop (dentro do middleware),
+então não há necessidade de locks: cada requisição custa apenas algumas
+buscas em dicionário e um `bisect` sobre os limites dos buckets.
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple, Union
+
+# Limites dos buckets de latência (segundos): progressão geométrica de
+# razão 1.25 entre 50µs e ~30s, o que limita o erro dos percentis a ~12%
+LATENCY_BUCKETS = tuple(0.00005 * 1.25 ** i for i in range(60))
+
+# Percentis publicados junto com cada histograma
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Rótulo usado quando a requisição não casa com nenhuma rota (evita
+# explosão de cardinalidade com paths arbitrários)
+UNMATCHED_ROUTE = "<unmatched>"
+
+GaugeValue = Union[int, float, Dict[str, Union[int, float]]]
+
+
+class Histogram:
+    """Histograma de buckets fixos com estimativa de percentis"""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # último bucket = +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Registra uma observação"""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estima o percentil `q` por interpolação linear dentro do bucket.
+
+        Args:
+            q: Percentil desejado (0-1)
+
+        Returns:
+            Valor estimado em segundos (0.0 se não houver observações)
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[idx - 1] if idx > 0 else 0.0
+                upper = self.bounds[idx] if idx < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+
+class MetricsRegistry:
+    """Registro central das métricas da API"""
+
+    def __init__(self, prefix: str = "books_api"):
+        self.prefix = prefix
+        self.requests_total = {}  # type: Dict[Tuple[str, str, int], int]
+        self.latency = {}  # type: Dict[Tuple[str, str], Histogram]
+        self.in_flight = 0
+        # (tipo, nome, descrição, label, callback) dos valores lidos na coleta
+        self._collected = []  # type: List[Tuple[str, str, str, str, Callable[[], GaugeValue]]]
+
+    def observe_request(self, method: str, route: str, status_code: int, duration: float) -> None:
+        """Registra uma requisição concluída"""
+        key = (method, route, status_code)
+        self.requests_total[key] = self.requests_total.get(key, 0) + 1
+
+        hist = self.latency.get((method, route))
+        if hist is None:
+            hist = self.latency[(method, route)] = Histogram()
+        hist.observe(duration)
+
+    def register_gauge(
+        self,
+        name: str,
+        description: str,
+        callback: Callable[[], GaugeValue],
+        label: str = "name"
+    ) -> None:
+        """
+        Registra um gauge calculado no momento da coleta.
+
+        Args:
+            name: Nome da métrica (sem o prefixo)
+            description: Texto do HELP
+            callback: Função que retorna um número ou um dicionário
+                      {valor_do_label: número}
+            label: Nome do label usado quando o callback retorna dicionário
+        """
+        self._collected.append(("gauge", name, description, label, callback))
+
+    def register_counter(
+        self,
+        name: str,
+        description: str,
+        callback: Callable[[], GaugeValue],
+        label: str = "name"
+    ) -> None:
+        """
+        Registra um contador mantido fora do registro e lido no momento da coleta.
+
+        O callback deve retornar valores monotônicos (só crescem até um
+        reinício do processo). A métrica é exposta como `<nome>_total`.
+
+        Args:
+            name: Nome da métrica (sem o prefixo nem o sufixo `_total`)
+            description: Texto do HELP
+            callback: Função que retorna um número ou um dicionário
+                      {valor_do_label: número}
+            label: Nome do label usado quando o callback retorna dicionário
+        """
+        self._collected.append(("counter", f"{name}_total", description, label, callback))
+
+    def reset(self) -> None:
+        """Zera contadores e histogramas de requisições (gauges e contadores registrados são mantidos)"""
+        self.requests_total.clear()
+        self.latency.clear()
+
+    def render(self) -> str:
+        """Gera o texto no formato de exposição do Prometheus"""
+        p = self.prefix
+        lines = []
+
+        lines.append(f"# HELP {p}_requests_total Total de requisições processadas")
+        lines.append(f"# TYPE {p}_requests_total counter")
+        for (method, route, status_code), value in sorted(self.requests_total.items()):
+            lines.append(
+                f'{p}_requests_total{{method="{method}",route="{_escape(route)}",status="{status_code}"}} {value}'
+            )
+
+        lines.append(f"# HELP {p}_requests_in_flight Requisições em andamento")
+        lines.append(f"# TYPE {p}_requests_in_flight gauge")
+        lines.append(f"{p}_requests_in_flight {self.in_flight}")
+
+        lines.append(f"# HELP {p}_request_duration_seconds Latência das requisições por rota")
+        lines.append(f"# TYPE {p}_request_duration_seconds histogram")
+        for (method, route), hist in sorted(self.latency.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(hist.bounds, hist.counts):
+                cumulative += bucket_count
+                lines.append(f'{p}_request_duration_seconds_bucket{{{labels},le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{p}_request_duration_seconds_bucket{{{labels},le="+Inf"}} {hist.count}')
+            lines.append(f"{p}_request_duration_seconds_sum{{{labels}}} {hist.sum:.6f}")
+            lines.append(f"{p}_request_duration_seconds_count{{{labels}}} {hist.count}")
+
+        lines.append(f"# HELP {p}_request_duration_quantile_seconds Percentis estimados de latência por rota")
+        lines.append(f"# TYPE {p}_request_duration_quantile_seconds gauge")
+        for (method, route), hist in sorted(self.latency.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            for q in QUANTILES:
+                lines.append(
+                    f'{p}_request_duration_quantile_seconds{{{labels},quantile="{q}"}} {hist.quantile(q):.6f}'
+                )
+
+        for kind, name, description, label, callback in self._collected:
+            lines.append(f"# HELP {p}_{name} {description}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            try:
+                value = callback()
+            except Exception:
+                continue  # Uma métrica com erro não deve derrubar a coleta
+            if isinstance(value, dict):
+                for label_value, v in sorted(value.items()):
+                    lines.append(f'{p}_{name}{{{label}="{_escape(str(label_value))}"}} {v}')
+            else:
+                lines.append(f"{p}_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escapa valores de label conforme o formato do Prometheus"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Instância global de métricas (singleton)
+metrics = MetricsRegistry()
@@ -5,24 +5,77 @@ Middleware de Monitoramento
 import time
 from fastapi import Request
 from api.monitoring.logger import api_logger
+from api.monitoring.metrics import metrics, UNMATCHED_ROUTE
+from api.monitoring.profiler import profiler
+from api.monitoring.rate_limiter import rate_limiter
+from api.auth.jwt_handler import is_admin_token
+from api.warmup import is_warmup
+
+
+def _profile_reason(request: Request):
+    """Decide se a requisição deve ser perfilada e por quê"""
+    flag = request.headers.get("x-profile") or request.query_params.get("profile")
+    if flag in ("1", "true"):
+        auth = request.headers.get("authorization", "")
+        if auth[:7].lower() == "bearer " and is_admin_token(auth[7:]):
+            return "requested"
+    if profiler.should_sample():
+        return "sampled"
+    return None
+
 
 async def log_requests(request: Request, call_next):
-    """Middleware para logar todas as requisições"""
-    start_time = time.time()
-    
-    response = await call_next(request)
-    
-    process_time = time.time() - start_time
-    
+    """Middleware para logar todas as requisições e alimentar as métricas"""
+    if is_warmup(request.scope):
+        return await call_next(request)  # Tráfego interno: fora das métricas e do log
+
+    start_time = time.perf_counter()
+    metrics.in_flight += 1
+
+    try:
+        reason = _profile_reason(request)
+        if reason:
+            response = await profiler.run(request, call_next, reason)
+        else:
+            response = await call_next(request)
+        status_code = response.status_code
+    except Exception:
+        status_code = 500
+        raise
+    finally:
+        metrics.in_flight -= 1
+        process_time = time.perf_counter() - start_time
+        # Usa o template da rota (ex: /api/v1/books/{book_id}) como label
+        route = getattr(request.scope.get("route"), "path", UNMATCHED_ROUTE)
+        metrics.observe_request(request.method, route, status_code, process_time)
+
     api_logger.info(
         "Request processed",
         extra={
             "method": request.method,
             "path": request.url.path,
+            "route": route,
             "status_code": response.status_code,
-            "process_time": round(process_time, 3)
+            # Em µs: rotas rápidas respondem abaixo de 1 ms
+            "process_time": round(process_time, 6)
         }
     )
-    
+
     response.headers["X-Process-Time"] = str(process_time)
     return response
+
+
+async def limit_requests(request: Request, call_next):
+    """Middleware de rate limiting por cliente e load shedding"""
+    if is_warmup(request.scope):
+        return await call_next(request)
+
+    rejection = await rate_limiter.check(request)
+    if rejection is not None:
+        return rejection
+
+    response = await call_next(request)
+    remaining = getattr(request.state, "rate_limit_remaining", None)
+    if remaining is not None:
+        response.headers["X-RateLimit-Remaining"] = str(remaining)
+    return response
@@ -0,0 +1,248 @@
+"""
+Profiling sob Demanda
+
+Permite capturar, para requisições selecionadas, um perfil do cProfile e
+tempos por fase (lookup, filter, model_build, serialize). A seleção é feita
+pelo middleware: header/query de admin ou amostragem de 1 a cada N
+requisições. Os perfis ficam em um buffer circular limitado.
+
+Fora de uma requisição perfilada, `phase()` custa apenas uma leitura de
+ContextVar, então pode ficar nos métodos quentes sem impacto perceptível.
+
+As consultas rodam no pool de threads (`AsyncDatabase`), fora do thread do
+event loop, onde o cProfile da requisição não as vê: `run_profiled` perfila
+cada chamada no próprio thread do pool e o resumo junta esses perfis ao do
+event loop. A fase "serialize" é medida pelo `ProfiledRoute` (validação do
+response_model e renderização do JSON), sem incluir middlewares.
+"""
+
+import cProfile
+import pstats
+import time
+from collections import deque
+from contextvars import ContextVar
+from itertools import count
+from typing import Dict, List, Optional
+
+from fastapi.routing import APIRoute
+
+from api.config import BASE_DIR, PROFILE_BUFFER_SIZE, PROFILE_SAMPLE_RATE, PROFILE_TOP_FUNCTIONS
+
+
+class RequestTrace:
+    """Acumula os tempos por fase de uma requisição perfilada"""
+
+    __slots__ = ("phases", "last_mark", "profile_threads", "thread_profiles")
+
+    def __init__(self, profile_threads: bool = False):
+        self.phases = {}  # type: Dict[str, float]
+        self.last_mark = time.perf_counter()
+        self.profile_threads = profile_threads
+        self.thread_profiles = []  # type: List[cProfile.Profile]
+
+    def add(self, name: str, elapsed: float) -> None:
+        """Soma `elapsed` segundos à fase `name`"""
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+
+_current_trace = ContextVar("profile_trace", default=None)  # type: ContextVar[Optional[RequestTrace]]
+
+
+class phase:
+    """
+    Context manager que mede uma fase do processamento.
+
+    Só registra algo quando a requisição atual está sendo perfilada.
+
+    Exemplo:
+        with phase("filter"):
+            filtered = [b for b in records if ...]
+    """
+
+    __slots__ = ("name", "trace", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.trace = _current_trace.get()
+        if self.trace is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.trace is not None:
+            end = time.perf_counter()
+            self.trace.add(self.name, end - self.start)
+            self.trace.last_mark = end
+        return False
+
+
+def run_profiled(func, *args, **kwargs):
+    """
+    Executa `func` (em um thread do pool) sob um cProfile próprio quando a
+    requisição atual está sendo perfilada; o perfil é anexado ao trace.
+    """
+    trace = _current_trace.get()
+    if trace is None or not trace.profile_threads:
+        return func(*args, **kwargs)
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        return func(*args, **kwargs)  # Outro profiler já está ativo neste thread
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.disable()
+        trace.thread_profiles.append(profile)
+
+
+class ProfiledRoute(APIRoute):
+    """Rota que mede a fase "serialize" (do fim do endpoint até a resposta pronta)"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            response = await handler(request)
+            trace = _current_trace.get()
+            # A última fase medida fecha o endpoint (ex: model_build); o que
+            # vem depois, dentro do handler, é response_model + JSON
+            if trace is not None and trace.phases:
+                end = time.perf_counter()
+                trace.add("serialize", end - trace.last_mark)
+                trace.last_mark = end
+            return response
+
+        return profiled_handler
+
+
+class RequestProfiler:
+    """Seleciona requisições para perfilar e guarda os resultados"""
+
+    def __init__(
+        self,
+        sample_rate: int = PROFILE_SAMPLE_RATE,
+        buffer_size: int = PROFILE_BUFFER_SIZE,
+        top_functions: int = PROFILE_TOP_FUNCTIONS
+    ):
+        """
+        Args:
+            sample_rate: Perfila 1 a cada N requisições (0 desativa a amostragem)
+            buffer_size: Número máximo de perfis mantidos em memória
+            top_functions: Quantidade de funções mantidas no resumo do cProfile
+        """
+        self.sample_rate = sample_rate
+        self.top_functions = top_functions
+        self.profiles = deque(maxlen=buffer_size)  # type: deque
+        self._ids = count(1)
+        self._seen = 0
+        self._cprofile_active = False
+
+    def should_sample(self) -> bool:
+        """Indica se a requisição atual foi sorteada pela amostragem 1/N"""
+        if self.sample_rate <= 0:
+            return False
+        self._seen += 1
+        return self._seen % self.sample_rate == 0
+
+    async def run(self, request, call_next, reason: str):
+        """
+        Executa a requisição sob perfil e guarda o resultado no buffer.
+
+        Args:
+            request: Requisição atual
+            call_next: Próximo handler da cadeia de middlewares
+            reason: Motivo do perfil ("requested" ou "sampled")
+
+        Returns:
+            A resposta da requisição, com o header X-Profile-Id
+        """
+        # O cProfile é global ao thread (o event loop): só um perfil por vez
+        profiler = None
+        if not self._cprofile_active:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                self._cprofile_active = True
+            except ValueError:
+                profiler = None  # Outro profiler já está ativo no processo
+
+        trace = RequestTrace(profile_threads=profiler is not None)
+        token = _current_trace.set(trace)
+
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            end = time.perf_counter()
+            if profiler is not None:
+                profiler.disable()
+                self._cprofile_active = False
+            _current_trace.reset(token)
+
+        profile_id = next(self._ids)
+        route = request.scope.get("route")
+        self.profiles.append({
+            "id": profile_id,
+            "timestamp": time.time(),
+            "reason": reason,
+            "method": request.method,
+            "path": request.url.path,
+            "route": getattr(route, "path", None),
+            "status_code": response.status_code,
+            "total_ms": round((end - start) * 1000, 3),
+            "phases_ms": {name: round(value * 1000, 3) for name, value in trace.phases.items()},
+            "functions": self._summarize(profiler, trace.thread_profiles) if profiler is not None else [],
+        })
+
+        response.headers["X-Profile-Id"] = str(profile_id)
+        return response
+
+    def _summarize(self, profiler: cProfile.Profile, thread_profiles: List[cProfile.Profile]) -> List[Dict]:
+        """Junta os perfis (event loop + threads do pool) e lista as funções com maior tempo acumulado"""
+        stats = pstats.Stats(profiler)
+        for profile in thread_profiles:
+            stats.add(profile)
+        rows = []
+        for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({
+                "function": f"{_short_path(filename)}:{line}({func})",
+                "ncalls": ncalls,
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            })
+        rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+        return rows[:self.top_functions]
+
+    def list_profiles(self, limit: int = 20) -> List[Dict]:
+        """Retorna os perfis mais recentes, sem o detalhamento de funções"""
+        recent = list(self.profiles)[-limit:]
+        recent.reverse()
+        return [{k: v for k, v in p.items() if k != "functions"} for p in recent]
+
+    def get_profile(self, profile_id: int) -> Optional[Dict]:
+        """Retorna um perfil completo pelo ID"""
+        for p in self.profiles:
+            if p["id"] == profile_id:
+                return p
+        return None
+
+    def clear(self) -> None:
+        """Descarta todos os perfis armazenados"""
+        self.profiles.clear()
+
+
+def _short_path(filename: str) -> str:
+    """Encurta caminhos de arquivo para o projeto ou site-packages"""
+    base = str(BASE_DIR) + "/"
+    if filename.startswith(base):
+        return filename[len(base):]
+    marker = "site-packages/"
+    idx = filename.find(marker)
+    return filename[idx + len(marker):] if idx >= 0 else filename
+
+
+# Instância global do profiler (singleton)
+profiler = RequestProfiler()
@@ -0,0 +1,269 @@
+"""
+Rate Limiting e Load Shedding
+
+Token bucket por cliente (identificado pelo `sub` do JWT ou pelo IP), com
+custo diferente por rota, e descarte de carga quando há requisições demais
+em andamento ou quando o event loop está atrasado.
+
+O estado dos baldes fica em memória (por worker) ou, opcionalmente, em um
+arquivo SQLite compartilhado pelos workers da mesma máquina. O acesso ao
+SQLite roda no pool de threads (nunca no event loop) e, se o banco estiver
+ocupado ou com erro, a requisição segue sem limite (fail open): o rate
+limiting protege a API, não deve derrubá-la.
+"""
+
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from api.auth.jwt_handler import verify_token
+from api.config import (
+    RATE_LIMIT_BACKEND, RATE_LIMIT_BURST, RATE_LIMIT_ENABLED, RATE_LIMIT_EXEMPT_PATHS,
+    RATE_LIMIT_RATE, RATE_LIMIT_ROUTE_COSTS, RATE_LIMIT_SQLITE_PATH,
+    SHED_MAX_IN_FLIGHT, SHED_MAX_LOOP_LAG_MS,
+)
+from api.monitoring.logger import api_logger
+from api.monitoring.metrics import metrics
+
+# Resultado de um consumo: (permitido, tokens restantes, segundos até haver tokens suficientes)
+ConsumeResult = Tuple[bool, float, float]
+
+
+def _refill(tokens: float, updated: float, now: float, cost: float, rate: float, burst: float) -> Tuple[bool, float, float]:
+    """Aplica a reposição do balde e tenta consumir `cost` tokens"""
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / rate
+
+
+class MemoryBucketStore:
+    """
+    Baldes em um dicionário local ao worker, na ordem do último acesso.
+
+    Um balde que já teria se enchido de novo equivale a um balde novo e
+    pode ser descartado. Como os mais antigos ficam no início, a limpeza só
+    olha o começo da fila: custo O(1) amortizado por requisição.
+    """
+
+    # Consumo em memória é O(1): roda direto no event loop
+    blocking = False
+
+    def __init__(self):
+        self._buckets = OrderedDict()  # type: OrderedDict[str, List[float]]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def consume(self, key: str, cost: float, rate: float, burst: float) -> ConsumeResult:
+        now = time.monotonic()
+        self._evict_idle(now, burst / rate)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [burst, now]
+        else:
+            self._buckets.move_to_end(key)
+        allowed, tokens, retry_after = _refill(bucket[0], bucket[1], now, cost, rate, burst)
+        bucket[0] = tokens
+        bucket[1] = now
+        return allowed, tokens, retry_after
+
+    def _evict_idle(self, now: float, full_after: float) -> None:
+        """Remove, do início da fila, os baldes ociosos há mais de `full_after` segundos"""
+        buckets = self._buckets
+        while buckets:
+            key, (_, updated) = next(iter(buckets.items()))
+            if now - updated < full_after:
+                break
+            del buckets[key]
+
+
+class SQLiteBucketStore:
+    """
+    Baldes em um arquivo SQLite (modo WAL), compartilhados entre processos.
+
+    Cada consumo é uma transação curta `BEGIN IMMEDIATE`, o que serializa
+    os workers no mesmo cliente sem perder atualizações. Roda no pool de
+    threads; com o banco ocupado por mais de `BUSY_TIMEOUT` (ou qualquer
+    erro do SQLite), `consume` devolve None e a requisição não é limitada.
+    A cada `SWEEP_EVERY` consumos, baldes ociosos (já cheios) são apagados.
+    """
+
+    # Consumo faz I/O e pode esperar lock: roda fora do event loop
+    blocking = True
+    BUSY_TIMEOUT = 0.2
+    SWEEP_EVERY = 1000
+
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH):
+        self.path = path
+        self.errors = 0
+        self._consumes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=self.BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def consume(self, key: str, cost: float, rate: float, burst: float) -> Optional[ConsumeResult]:
+        # Relógio de parede: precisa ser comparável entre processos
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.Error as e:
+                return self._failed(e)
+            try:
+                row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row else (burst, now)
+                allowed, tokens, retry_after = _refill(tokens, updated, now, cost, rate, burst)
+                self._conn.execute(
+                    "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    (key, tokens, now)
+                )
+                self._consumes += 1
+                if self._consumes % self.SWEEP_EVERY == 0:
+                    self._conn.execute("DELETE FROM buckets WHERE updated <= ?", (now - burst / rate,))
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                try:
+                    self._conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass  # transação já desfeita pelo próprio SQLite
+                return self._failed(e)
+        return allowed, tokens, retry_after
+
+    def _failed(self, error: sqlite3.Error) -> None:
+        """Conta o erro e deixa a requisição passar (fail open)"""
+        self.errors += 1
+        api_logger.warning("Rate limit store indisponível; requisição não limitada",
+                           extra={"error": str(error), "errors": self.errors})
+        return None
+
+
+class LoopLagMonitor:
+    """Mede o atraso do event loop (quanto um sleep curto passa do previsto)"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.lag = 0.0  # segundos, média móvel exponencial
+
+    async def run(self) -> None:
+        """Laço de medição; deve ser iniciado como task no lifespan"""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            delay = max(0.0, loop.time() - start - self.interval)
+            self.lag = 0.7 * self.lag + 0.3 * delay
+
+
+class RateLimiter:
+    """Decide se uma requisição é aceita, limitada (429) ou descartada (503)"""
+
+    def __init__(
+        self,
+        store=None,
+        rate: float = RATE_LIMIT_RATE,
+        burst: float = RATE_LIMIT_BURST,
+        route_costs: Optional[Dict[str, float]] = None,
+        max_in_flight: int = SHED_MAX_IN_FLIGHT,
+        max_loop_lag_ms: float = SHED_MAX_LOOP_LAG_MS,
+        enabled: bool = RATE_LIMIT_ENABLED
+    ):
+        self.store = store if store is not None else MemoryBucketStore()
+        self.rate = rate
+        self.burst = burst
+        self.route_costs = route_costs if route_costs is not None else RATE_LIMIT_ROUTE_COSTS
+        self.max_in_flight = max_in_flight
+        self.max_loop_lag = max_loop_lag_ms / 1000
+        self.enabled = enabled
+        self.loop_monitor = LoopLagMonitor()
+
+    @staticmethod
+    def client_key(request: Request) -> str:
+        """Identifica o cliente pelo `sub` de um JWT válido ou pelo IP"""
+        auth = request.headers.get("authorization", "")
+        if auth[:7].lower() == "bearer ":
+            try:
+                sub = verify_token(auth[7:]).get("sub")
+                if sub:
+                    return f"user:{sub}"
+            except Exception:
+                pass  # Token inválido: cai no IP (a rota responde 401 depois)
+        client = request.client
+        return f"ip:{client.host if client else 'unknown'}"
+
+    async def check(self, request: Request) -> Optional[JSONResponse]:
+        """
+        Aplica load shedding e rate limiting.
+
+        Returns:
+            Uma resposta de rejeição, ou None se a requisição pode seguir
+        """
+        path = request.url.path
+        if not self.enabled or path in RATE_LIMIT_EXEMPT_PATHS:
+            return None
+
+        # O próprio request já está contado em metrics.in_flight
+        if metrics.in_flight > self.max_in_flight or self.loop_monitor.lag > self.max_loop_lag:
+            return JSONResponse(
+                status_code=503,
+                content={"detail": "Servidor sobrecarregado. Tente novamente em instantes."},
+                headers={"Retry-After": "1"}
+            )
+
+        return await self._consume(request, self.route_costs.get(path, 1))
+
+    async def charge(self, request: Request, cost: float) -> Optional[JSONResponse]:
+        """
+        Cobra tokens adicionais de uma requisição já aceita pelo middleware,
+        quando o custo só é conhecido na rota (ex: sub-consultas de /batch).
+
+        Returns:
+            Uma resposta 429, ou None se a requisição pode seguir
+        """
+        if not self.enabled or cost <= 0:
+            return None
+        return await self._consume(request, cost)
+
+    async def _consume(self, request: Request, cost: float) -> Optional[JSONResponse]:
+        """Consome `cost` tokens do balde do cliente (429 se não houver saldo)"""
+        args = (self.client_key(request), cost, self.rate, self.burst)
+        if self.store.blocking:
+            result = await run_in_threadpool(self.store.consume, *args)
+        else:
+            result = self.store.consume(*args)
+        if result is None:
+            return None  # armazenamento indisponível: fail open
+        allowed, remaining, retry_after = result
+        if not allowed:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Limite de requisições excedido."},
+                headers={"Retry-After": str(max(1, math.ceil(retry_after))), "X-RateLimit-Remaining": "0"}
+            )
+
+        request.state.rate_limit_remaining = int(remaining)
+        return None
+
+
+def _create_store():
+    """Cria o armazenamento de baldes conforme RATE_LIMIT_BACKEND"""
+    if RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBucketStore(RATE_LIMIT_SQLITE_PATH)
+    return MemoryBucketStore()
+
+
+# Instância global do rate limiter (singleton)
+rate_limiter = RateLimiter(store=_create_store())
@@ -4,9 +4,10 @@ Router de Autenticação
 
 from fastapi import APIRouter, HTTPException, status
 from api.auth.models import LoginRequest, TokenResponse, RefreshRequest
-from api.auth.jwt_handler import authenticate_user, create_access_token, create_refresh_token, decode_token
+from api.auth.jwt_handler import authenticate_user, create_access_token, create_refresh_token, decode_token, FAKE_USERS_DB
+from api.monitoring.profiler import ProfiledRoute
 
-router = APIRouter(prefix="/api/v1/auth", tags=["Autenticação"])
+router = APIRouter(prefix="/api/v1/auth", tags=["Autenticação"], route_class=ProfiledRoute)
 
 @router.post("/login", response_model=TokenResponse)
 async def login(credentials: LoginRequest):
@@ -15,8 +16,10 @@ async def login(credentials: LoginRequest):
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciais inválidas")
     
-    access_token = create_access_token(data={"sub": user["username"]})
-    refresh_token = create_refresh_token(data={"sub": user["username"]})
+    # O papel vai nas claims para que as checagens de admin não precisem de lookup
+    claims = {"sub": user["username"], "role": user["role"]}
+    access_token = create_access_token(data=claims)
+    refresh_token = create_refresh_token(data=claims)
     
     return TokenResponse(access_token=access_token, refresh_token=refresh_token)
 
@@ -29,8 +32,13 @@ async def refresh(request: RefreshRequest):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
         
         username = payload.get("sub")
-        access_token = create_access_token(data={"sub": username})
-        refresh_token = create_refresh_token(data={"sub": username})
+        # Relê o papel do cadastro na renovação, para refletir mudanças de permissão
+        user = FAKE_USERS_DB.get(username)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
+        claims = {"sub": username, "role": user["role"]}
+        access_token = create_access_token(data=claims)
+        refresh_token = create_refresh_token(data=claims)
         
         return TokenResponse(access_token=access_token, refresh_token=refresh_token)
     except:
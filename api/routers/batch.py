@@ -0,0 +1,226 @@
+"""
+Router de Lote (várias consultas em uma requisição)
+
+Uma página do frontend costuma precisar de categorias, estatísticas, mais
+bem avaliados e uma busca. Em `/batch`, essas consultas vão em uma única
+requisição (um só ciclo de middlewares e serialização):
+
+    POST /api/v1/batch
+    {"queries": [{"op": "categories"},
+                 {"op": "top_rated", "params": {"limit": 5}},
+                 {"id": "busca", "op": "search", "params": {"title": "love", "fields": "id,title"}}]}
+
+Todas as sub-consultas rodam sobre a mesma visão dos dados (uma recarga no
+meio do lote não mistura versões) e as que vão ao backend executam em
+paralelo no pool de threads. Os parâmetros e as respostas são os das rotas
+equivalentes; cada sub-consulta tem seu próprio status, então um erro em
+uma não derruba as outras.
+
+No rate limiting, o lote custa a soma dos custos das rotas equivalentes às
+sub-consultas (mínimo de 1): agrupar consultas economiza requisições, não
+tokens.
+"""
+
+import asyncio
+from typing import Annotated, Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import Field, ValidationError, validate_call
+
+from api.async_database import AsyncDatabase, db
+from api.config import BATCH_MAX_QUERIES, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SUGGEST_TOP_N
+from api.models.schemas import BatchQuery, BatchRequest, BatchResponse
+from api.routers.books import parse_facets
+from api.routers.projection import parse_fields
+from api.monitoring.profiler import ProfiledRoute
+from api.monitoring.rate_limiter import rate_limiter
+
+router = APIRouter(prefix="/api/v1", tags=["Lote"], route_class=ProfiledRoute)
+
+Page = Annotated[int, Field(ge=1)]
+PageSize = Annotated[int, Field(ge=1, le=MAX_PAGE_SIZE)]
+
+# Operação -> handler(visão dos dados, **params), registrado por `_operation`
+OPERATIONS = {}  # type: Dict[str, Any]
+# Operação -> rota equivalente (para o custo no rate limiting)
+OPERATION_ROUTES = {}  # type: Dict[str, str]
+
+
+def _operation(name: str, route: str):
+    """Registra um handler, validando os parâmetros pela assinatura (como os Query das rotas)"""
+    def register(func):
+        OPERATIONS[name] = validate_call(func)
+        OPERATION_ROUTES[name] = route
+        return func
+    return register
+
+
+def batch_cost(queries: List[BatchQuery]) -> float:
+    """Custo do lote: soma dos custos das rotas equivalentes (mínimo de 1)"""
+    costs = rate_limiter.route_costs
+    return max(1, sum(costs.get(OPERATION_ROUTES.get(q.op, ""), 1) for q in queries))
+
+
+def _page(total: int, page: int, page_size: int, books, extra: Optional[Dict] = None) -> Dict:
+    content = {"total": total, "page": page, "page_size": page_size, "books": books}
+    content.update({k: v for k, v in (extra or {}).items() if v is not None})
+    return content
+
+
+@_operation("books", "/api/v1/books")
+async def _books(view: Any, page: Page = 1, page_size: PageSize = DEFAULT_PAGE_SIZE, fields: Optional[str] = None):
+    books = await view.get_all_books((page - 1) * page_size, page_size, parse_fields(fields))
+    return _page(view.get_total_count(), page, page_size, books)
+
+
+@_operation("book", "/api/v1/books/{book_id}")
+async def _book(view: Any, book_id: int):
+    book = await view.get_book_by_id(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail=f"Livro com ID {book_id} não encontrado")
+    return book
+
+
+@_operation("search", "/api/v1/books/search")
+async def _search(
+    view: Any,
+    title: Optional[str] = None,
+    category: Optional[str] = None,
+    facets: Optional[str] = None,
+    page: Page = 1,
+    page_size: PageSize = DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None
+):
+    result = await view.query_books(
+        title=title, category=category, skip=(page - 1) * page_size, limit=page_size,
+        facets=parse_facets(facets), fields=parse_fields(fields)
+    )
+    return _page(result["total"], page, page_size, result["books"], {"facets": result.get("facets")})
+
+
+@_operation("query", "/api/v1/books/query")
+async def _query(
+    view: Any,
+    title: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Annotated[Optional[float], Field(ge=0)] = None,
+    max_price: Annotated[Optional[float], Field(ge=0)] = None,
+    min_rating: Annotated[Optional[int], Field(ge=0, le=5)] = None,
+    max_rating: Annotated[Optional[int], Field(ge=0, le=5)] = None,
+    in_stock: Optional[bool] = None,
+    sort: Annotated[Optional[str], Field(pattern="^(id|title|price|rating)$")] = None,
+    order: Annotated[str, Field(pattern="^(asc|desc)$")] = "asc",
+    facets: Optional[str] = None,
+    explain: bool = False,
+    page: Page = 1,
+    page_size: PageSize = DEFAULT_PAGE_SIZE
+):
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="Preço mínimo não pode ser maior que o máximo")
+    if min_rating is not None and max_rating is not None and min_rating > max_rating:
+        raise HTTPException(status_code=400, detail="Rating mínimo não pode ser maior que o máximo")
+    result = await view.query_books(
+        title=title, category=category, min_price=min_price, max_price=max_price,
+        min_rating=min_rating, max_rating=max_rating, in_stock=in_stock,
+        sort=sort, descending=order == "desc",
+        skip=(page - 1) * page_size, limit=page_size, facets=parse_facets(facets)
+    )
+    extra = {"facets": result.get("facets"), "plan": result["plan"] if explain else None}
+    return _page(result["total"], page, page_size, result["books"], extra)
+
+
+@_operation("fuzzy", "/api/v1/books/search/fuzzy")
+async def _fuzzy(
+    view: Any,
+    q: Annotated[str, Field(min_length=1, max_length=200)],
+    category: Optional[str] = None,
+    page: Page = 1,
+    page_size: PageSize = DEFAULT_PAGE_SIZE
+):
+    result = await view.fuzzy_search_books(q, category, (page - 1) * page_size, page_size)
+    return _page(result["total"], page, page_size, result["books"])
+
+
+@_operation("suggest", "/api/v1/books/suggest")
+async def _suggest(
+    view: Any,
+    q: Annotated[str, Field(min_length=1, max_length=100)],
+    limit: Annotated[int, Field(ge=1, le=SUGGEST_TOP_N)] = SUGGEST_TOP_N
+):
+    return {"query": q, **(await view.suggest(q, limit))}
+
+
+@_operation("categories", "/api/v1/categories")
+async def _categories(view: Any):
+    categories = view.get_all_categories()
+    return {"total": len(categories), "categories": categories}
+
+
+@_operation("stats_overview", "/api/v1/stats/overview")
+async def _stats_overview(view: Any):
+    return await view.get_stats_overview()
+
+
+@_operation("stats_categories", "/api/v1/stats/categories")
+async def _stats_categories(view: Any):
+    return await view.get_stats_by_category()
+
+
+@_operation("top_rated", "/api/v1/books/top-rated")
+async def _top_rated(view: Any, limit: Annotated[int, Field(ge=1, le=50)] = 10, fields: Optional[str] = None):
+    return await view.get_top_rated_books(limit, parse_fields(fields))
+
+
+@_operation("price_range", "/api/v1/books/price-range")
+async def _price_range(
+    view: Any,
+    min: Annotated[float, Field(ge=0)],
+    max: Annotated[float, Field(ge=0)],
+    skip: Annotated[int, Field(ge=0)] = 0,
+    limit: Annotated[int, Field(ge=1, le=100)] = 20,
+    fields: Optional[str] = None
+):
+    if min > max:
+        raise HTTPException(status_code=400, detail="Preço mínimo não pode ser maior que o máximo")
+    return await view.get_books_by_price_range(min, max, skip, limit, parse_fields(fields))
+
+
+async def _execute(view: AsyncDatabase, query: BatchQuery) -> Dict:
+    """Executa uma sub-consulta, convertendo erros no status da rota equivalente"""
+    result = {"id": query.id, "op": query.op}
+    handler = OPERATIONS.get(query.op)
+    if handler is None:
+        return dict(result, status=400, error=f"Operação inválida: {query.op}. Use: {', '.join(OPERATIONS)}")
+    try:
+        return dict(result, status=200, data=await handler(view, **query.params))
+    except ValidationError as e:
+        details = "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+        return dict(result, status=422, error=details)
+    except HTTPException as e:
+        return dict(result, status=e.status_code, error=e.detail)
+    except ValueError as e:
+        return dict(result, status=400, error=str(e))
+
+
+@router.post("/batch", response_model=BatchResponse, response_model_exclude_none=True)
+async def run_batch(request: BatchRequest, http_request: Request):
+    """
+    Executa várias consultas em uma requisição, sobre o mesmo conjunto de dados.
+
+    Cada item de `queries` tem `op` (a operação, equivalente a uma rota),
+    `params` (os parâmetros da rota) e um `id` opcional. Os resultados vêm
+    na mesma ordem, cada um com `status` e `data` (ou `error`).
+    """
+    if not db.is_loaded():
+        raise HTTPException(status_code=503, detail="Dados não carregados.")
+    if len(request.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"Máximo de {BATCH_MAX_QUERIES} sub-consultas por lote")
+    # O middleware já cobrou o custo da própria rota; cobra o restante das sub-consultas
+    already_paid = rate_limiter.route_costs.get(http_request.url.path, 1)
+    rejection = await rate_limiter.charge(http_request, batch_cost(request.queries) - already_paid)
+    if rejection is not None:
+        return rejection
+
+    view = db.snapshot()
+    results = await asyncio.gather(*(_execute(view, query) for query in request.queries))
+    return {"data_version": view.data_version(), "results": results}
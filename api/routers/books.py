@@ -5,62 +5,191 @@ Endpoints principais para consulta de livros.
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
-from api.models.schemas import Book, BooksListResponse
-from api.database import db
-from api.config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from typing import List, Optional
+from api.models.schemas import Book, BooksListResponse, BookSearchResponse, BookQueryResponse, FuzzySearchResponse, ScoredBook, SuggestResponse
+from api.async_database import db
+from api.config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SUGGEST_TOP_N
+from api.monitoring.profiler import ProfiledRoute, phase
+from api.routers.projection import FIELDS_DESCRIPTION, parse_fields, projected_response
+from api.storage.query import FACET_FIELDS
+
+FACETS_DESCRIPTION = f"Facetas a contar sobre o resultado, separadas por vírgula ({', '.join(FACET_FIELDS)})"
 
 # Cria o router
-router = APIRouter(prefix="/api/v1", tags=["Livros"])
+router = APIRouter(prefix="/api/v1", tags=["Livros"], route_class=ProfiledRoute)
 
 
 @router.get("/books", response_model=BooksListResponse)
 async def get_all_books(
     page: int = Query(1, ge=1, description="Número da página"),
-    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Tamanho da página")
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Tamanho da página"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """
     Lista todos os livros disponíveis na base de dados com paginação.
+    
+    Com `fields=id,title,price`, cada livro traz só esses campos.
     """
     if not db.is_loaded():
         raise HTTPException(status_code=503, detail="Dados não carregados.")
     
+    projection = parse_fields(fields)
     skip = (page - 1) * page_size
-    books = db.get_all_books(skip=skip, limit=page_size)
+    books = await db.get_all_books(skip=skip, limit=page_size, fields=projection)
     total = db.get_total_count()
     
-    return BooksListResponse(
-        total=total,
-        page=page,
-        page_size=page_size,
-        books=[Book(**book) for book in books]
-    )
+    with phase("model_build"):
+        if projection is not None:
+            return projected_response({"total": total, "page": page, "page_size": page_size, "books": books})
+        return BooksListResponse(
+            total=total,
+            page=page,
+            page_size=page_size,
+            books=[Book(**book) for book in books]
+        )
+
+
+def parse_facets(facets: Optional[str]) -> List[str]:
+    """Valida a lista de facetas (separadas por vírgula)"""
+    names = [f.strip() for f in facets.split(",") if f.strip()] if facets else []
+    invalid = [f for f in names if f not in FACET_FIELDS]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Faceta inválida: {', '.join(invalid)}. Use: {', '.join(FACET_FIELDS)}"
+        )
+    return list(dict.fromkeys(names))
 
 
-@router.get("/books/search", response_model=BooksListResponse)
+@router.get("/books/search", response_model=BookSearchResponse, response_model_exclude_none=True)
 async def search_books(
     title: Optional[str] = Query(None, description="Título (ou parte dele) para buscar"),
     category: Optional[str] = Query(None, description="Categoria para filtrar"),
+    facets: Optional[str] = Query(None, description=FACETS_DESCRIPTION),
     page: int = Query(1, ge=1, description="Número da página"),
-    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Tamanho da página")
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Tamanho da página"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """
     Busca livros por título e/ou categoria.
+    
+    Com `facets=category,rating,price,availability`, inclui as contagens
+    de cada faceta sobre todo o resultado (não só a página). Com
+    `fields=id,title,price`, cada livro traz só esses campos.
     """
     if not db.is_loaded():
         raise HTTPException(status_code=503, detail="Dados não carregados.")
     
-    skip = (page - 1) * page_size
-    books = db.search_books(title=title, category=category, skip=skip, limit=page_size)
-    all_results = db.search_books(title=title, category=category, skip=0, limit=10000)
-    total = len(all_results)
-    
-    return BooksListResponse(
-        total=total,
-        page=page,
-        page_size=page_size,
-        books=[Book(**book) for book in books]
+    projection = parse_fields(fields)
+    # Página, total exato e facetas em uma única consulta
+    result = await db.query_books(
+        title=title, category=category,
+        skip=(page - 1) * page_size, limit=page_size,
+        facets=parse_facets(facets), fields=projection
     )
+    
+    with phase("model_build"):
+        if projection is not None:
+            content = {"total": result["total"], "page": page, "page_size": page_size, "books": result["books"]}
+            if "facets" in result:
+                content["facets"] = result["facets"]
+            return projected_response(content)
+        return BookSearchResponse(
+            total=result["total"],
+            page=page,
+            page_size=page_size,
+            books=[Book(**book) for book in result["books"]],
+            facets=result.get("facets")
+        )
+
+
+@router.get("/books/suggest", response_model=SuggestResponse)
+async def suggest_books(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto digitado até agora"),
+    limit: int = Query(SUGGEST_TOP_N, ge=1, le=SUGGEST_TOP_N, description="Máximo de títulos e de categorias")
+):
+    """
+    Autocomplete: títulos (por rating) e categorias que começam com o texto
+    digitado. Pensado para ser chamado a cada tecla.
+    """
+    if not db.is_loaded():
+        raise HTTPException(status_code=503, detail="Dados não carregados.")
+    
+    return SuggestResponse(query=q, **(await db.suggest(q, limit)))
+
+
+@router.get("/books/search/fuzzy", response_model=FuzzySearchResponse)
+async def fuzzy_search_books(
+    q: str = Query(..., min_length=1, max_length=200, description="Título aproximado (aceita erros de digitação)"),
+    category: Optional[str] = Query(None, description="Categoria para filtrar"),
+    page: int = Query(1, ge=1, description="Número da página"),
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Tamanho da página")
+):
+    """
+    Busca aproximada por título, tolerante a erros de digitação.
+    
+    Os resultados vêm ordenados por similaridade, cada um com seu `score`.
+    """
+    if not db.is_loaded():
+        raise HTTPException(status_code=503, detail="Dados não carregados.")
+    
+    result = await db.fuzzy_search_books(q, category=category, skip=(page - 1) * page_size, limit=page_size)
+    
+    with phase("model_build"):
+        return FuzzySearchResponse(
+            total=result["total"],
+            page=page,
+            page_size=page_size,
+            books=[ScoredBook(**book) for book in result["books"]]
+        )
+
+
+@router.get("/books/query", response_model=BookQueryResponse, response_model_exclude_none=True)
+async def query_books(
+    title: Optional[str] = Query(None, description="Título (ou parte dele) para buscar"),
+    category: Optional[str] = Query(None, description="Categoria (ou parte dela) para filtrar"),
+    min_price: Optional[float] = Query(None, ge=0, description="Preço mínimo"),
+    max_price: Optional[float] = Query(None, ge=0, description="Preço máximo"),
+    min_rating: Optional[int] = Query(None, ge=0, le=5, description="Rating mínimo"),
+    max_rating: Optional[int] = Query(None, ge=0, le=5, description="Rating máximo"),
+    in_stock: Optional[bool] = Query(None, description="Filtra por disponibilidade"),
+    sort: Optional[str] = Query(None, pattern="^(id|title|price|rating)$", description="Campo de ordenação"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Direção da ordenação"),
+    facets: Optional[str] = Query(None, description=FACETS_DESCRIPTION),
+    explain: bool = Query(False, description="Inclui o plano de execução na resposta"),
+    page: int = Query(1, ge=1, description="Número da página"),
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Tamanho da página")
+):
+    """
+    Consulta composta: combina título, categoria, faixa de preço, faixa de
+    rating e disponibilidade, com ordenação e total exato.
+    """
+    if not db.is_loaded():
+        raise HTTPException(status_code=503, detail="Dados não carregados.")
+    
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="Preço mínimo não pode ser maior que o máximo")
+    if min_rating is not None and max_rating is not None and min_rating > max_rating:
+        raise HTTPException(status_code=400, detail="Rating mínimo não pode ser maior que o máximo")
+    
+    result = await db.query_books(
+        title=title, category=category,
+        min_price=min_price, max_price=max_price,
+        min_rating=min_rating, max_rating=max_rating,
+        in_stock=in_stock, sort=sort, descending=order == "desc",
+        skip=(page - 1) * page_size, limit=page_size,
+        facets=parse_facets(facets)
+    )
+    
+    with phase("model_build"):
+        return BookQueryResponse(
+            total=result["total"],
+            page=page,
+            page_size=page_size,
+            books=[Book(**book) for book in result["books"]],
+            facets=result.get("facets"),
+            plan=result["plan"] if explain else None
+        )
 
 
 @router.get("/books/{book_id}", response_model=Book)
@@ -71,10 +200,11 @@ async def get_book_by_id(book_id: int):
     if not db.is_loaded():
         raise HTTPException(status_code=503, detail="Dados não carregados.")
     
-    book = db.get_book_by_id(book_id)
+    book = await db.get_book_by_id(book_id)
     
     if not book:
         raise HTTPException(status_code=404, detail=f"Livro com ID {book_id} não encontrado")
     
-    return Book(**book)
+    with phase("model_build"):
+        return Book(**book)
 
@@ -4,9 +4,10 @@ Router de Categorias
 
 from fastapi import APIRouter, HTTPException
 from api.models.schemas import CategoryResponse
-from api.database import db
+from api.async_database import db
+from api.monitoring.profiler import ProfiledRoute
 
-router = APIRouter(prefix="/api/v1", tags=["Categorias"])
+router = APIRouter(prefix="/api/v1", tags=["Categorias"], route_class=ProfiledRoute)
 
 @router.get("/categories", response_model=CategoryResponse)
 async def get_categories():
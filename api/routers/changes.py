@@ -0,0 +1,27 @@
+"""
+Router do Feed de Alterações
+
+Sincronização incremental do catálogo entre scrapings.
+"""
+
+from fastapi import APIRouter, Query
+from api.models.schemas import ChangesResponse
+from api.storage.changes import change_log
+from api.monitoring.profiler import ProfiledRoute
+
+router = APIRouter(prefix="/api/v1", tags=["Alterações"], route_class=ProfiledRoute)
+
+
+@router.get("/books/changes", response_model=ChangesResponse)
+def get_changes(
+    since: int = Query(0, ge=0, description="Última versão já aplicada pelo cliente (0 = desde o início do feed)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Máximo aproximado de alterações (versões vêm sempre completas)")
+):
+    """
+    Lista o que mudou no catálogo (livros adicionados/removidos, preço e
+    disponibilidade) depois da versão `since`.
+    
+    Para sincronizar, chame de novo com `since=next_since` enquanto
+    `has_more` for verdadeiro.
+    """
+    return change_log.changes_since(since, limit)
@@ -1,13 +1,24 @@
 """
 Router de Health Check
+
+- `/health`: status geral (para pessoas e dashboards)
+- `/health/live`: o processo responde (liveness; reiniciar se falhar)
+- `/health/ready`: dados carregados e aquecimento concluído sem falhas
+  (readiness; 503 enquanto o worker não deve receber tráfego)
 """
 
-from fastapi import APIRouter
-from api.models.schemas import HealthResponse
+import time
+
+from fastapi import APIRouter, Request, Response
+from api.models.schemas import HealthResponse, LivenessResponse, ReadinessResponse
 from api.config import API_VERSION
-from api.database import db
+from api.async_database import db
+from api.warmup import warmup
+from api.monitoring.profiler import ProfiledRoute
 
-router = APIRouter(prefix="/api/v1", tags=["Health"])
+router = APIRouter(prefix="/api/v1", tags=["Health"], route_class=ProfiledRoute)
+
+_STARTED = time.monotonic()
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -27,5 +38,42 @@ async def health_check():
         api_version=API_VERSION,
         data_loaded=data_loaded,
         total_books=total_books,
-        message=message
+        message=message,
+        ingest=db.ingest_stats()
+    )
+
+
+@router.get("/health/live", response_model=LivenessResponse)
+async def liveness():
+    """Responde enquanto o processo e o event loop estão de pé (não consulta os dados)"""
+    return LivenessResponse(status="alive", uptime_seconds=round(time.monotonic() - _STARTED, 3))
+
+
+@router.get("/health/ready", response_model=ReadinessResponse)
+async def readiness(request: Request, response: Response):
+    """
+    Indica se o worker pode receber tráfego: 200 com os dados carregados e
+    o aquecimento concluído, 503 caso contrário (com o progresso). Uma etapa
+    do aquecimento que falhou deixa o worker degradado (503).
+    """
+    # Sem lifespan (ex: alguns runtimes serverless), o aquecimento começa aqui
+    warmup.start(request.app)
+    data_loaded = db.is_loaded()
+    if not data_loaded:
+        status = "not_loaded"
+    elif not warmup.finished:
+        status = "warming_up"
+    elif warmup.failed:
+        status = "degraded"
+    else:
+        status = "ready"
+    ready = status == "ready"
+    if not ready:
+        response.status_code = 503
+    return ReadinessResponse(
+        ready=ready,
+        status=status,
+        data_loaded=data_loaded,
+        total_books=db.get_total_count() if data_loaded else 0,
+        warmup=warmup.status()
     )
@@ -0,0 +1,74 @@
+"""
+Router do Histórico de Preços
+
+Séries de preço acumuladas entre scrapings (ver api/storage/timeseries.py).
+"""
+
+from datetime import date, datetime, time, timezone
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from api.models.schemas import BookPriceHistoryResponse, CategoryPriceTrendResponse
+from api.async_database import db
+from api.storage.timeseries import price_history
+from api.monitoring.profiler import ProfiledRoute
+
+router = APIRouter(prefix="/api/v1", tags=["Histórico de Preços"], route_class=ProfiledRoute)
+
+
+def _period(start: Optional[date], end: Optional[date]) -> Tuple[Optional[int], Optional[int]]:
+    """Converte datas (UTC, inclusivas) em timestamps"""
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start deve ser anterior ou igual a end")
+    first = int(datetime.combine(start, time.min, timezone.utc).timestamp()) if start else None
+    last = int(datetime.combine(end, time.max, timezone.utc).timestamp()) if end else None
+    return first, last
+
+
+@router.get("/books/{book_id}/price-history", response_model=BookPriceHistoryResponse)
+async def get_book_price_history(
+    book_id: int,
+    resolution: str = Query("raw", pattern="^(raw|daily|weekly)$", description="raw (cada scraping), daily ou weekly"),
+    start: Optional[date] = Query(None, description="Data inicial (UTC, AAAA-MM-DD)"),
+    end: Optional[date] = Query(None, description="Data final (UTC, inclusiva)")
+):
+    """
+    Histórico de preço e disponibilidade de um livro.
+
+    `daily` e `weekly` vêm dos rollups pré-calculados (mínimo, máximo,
+    média e último preço do período), indicados para períodos longos.
+    """
+    if not db.is_loaded():
+        raise HTTPException(status_code=503, detail="Dados não carregados")
+
+    book = await db.get_book_by_id(book_id)
+    if book is None:
+        raise HTTPException(status_code=404, detail=f"Livro com ID {book_id} não encontrado")
+
+    first, last = _period(start, end)
+    points = await run_in_threadpool(price_history.book_history, book['book_url'], resolution, first, last)
+    return {"book_id": book_id, "title": book['title'], "resolution": resolution, "points": points}
+
+
+@router.get(
+    "/stats/categories/{category}/price-trend",
+    response_model=CategoryPriceTrendResponse,
+    response_model_exclude_none=True
+)
+def get_category_price_trend(
+    category: str,
+    resolution: str = Query("daily", pattern="^(daily|weekly)$", description="daily ou weekly"),
+    start: Optional[date] = Query(None, description="Data inicial (UTC, AAAA-MM-DD)"),
+    end: Optional[date] = Query(None, description="Data final (UTC, inclusiva)")
+):
+    """
+    Evolução do preço médio, mínimo e máximo de uma categoria (nome exato),
+    servida dos rollups diários ou semanais.
+    """
+    first, last = _period(start, end)
+    return {
+        "category": category,
+        "resolution": resolution,
+        "points": price_history.category_trend(category, resolution, first, last),
+    }
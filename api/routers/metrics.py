@@ -0,0 +1,40 @@
+"""
+Router de Métricas
+
+Expõe as métricas em memória no formato de exposição do Prometheus.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from api.async_database import db
+from api.monitoring.metrics import metrics
+from api.monitoring.coalescing import coalescing
+from api.auth.jwt_handler import token_cache
+from api.compression import compressed_cache
+from api.monitoring.rate_limiter import rate_limiter
+from api.monitoring.profiler import ProfiledRoute
+
+router = APIRouter(tags=["Monitoramento"], route_class=ProfiledRoute)
+
+# Gauges do dataset e dos caches, calculados no momento da coleta
+metrics.register_gauge("dataset_books", "Livros carregados em memória", db.get_total_count)
+metrics.register_gauge("dataset_version", "Versão dos dados servidos (muda a cada recarga)", db.data_version)
+metrics.register_gauge("dataset_categories", "Categorias distintas carregadas", lambda: len(db.get_all_categories()))
+metrics.register_gauge("index_entries", "Entradas por estrutura de índice", db.get_index_sizes, label="index")
+metrics.register_gauge("token_cache", "Tamanho do cache de tokens JWT", lambda: {"size": token_cache.stats()["size"]}, label="stat")
+metrics.register_gauge("compression_cache", "Entradas e bytes do cache de respostas comprimidas", lambda: {k: v for k, v in compressed_cache.stats().items() if k in ("entries", "bytes")}, label="stat")
+metrics.register_gauge("event_loop_lag_seconds", "Atraso médio do event loop", lambda: round(rate_limiter.loop_monitor.lag, 6))
+
+# Contadores monotônicos mantidos pelos próprios componentes (expostos como *_total)
+metrics.register_counter("token_cache_hits", "Acertos do cache de tokens JWT", lambda: token_cache.hits)
+metrics.register_counter("token_cache_misses", "Faltas do cache de tokens JWT", lambda: token_cache.misses)
+metrics.register_counter("compression_cache_hits", "Acertos do cache de respostas comprimidas", lambda: compressed_cache.hits)
+metrics.register_counter("compression_cache_misses", "Faltas do cache de respostas comprimidas", lambda: compressed_cache.misses)
+metrics.register_counter("query_executions", "Consultas executadas no backend, por operação", lambda: dict(coalescing.executions), label="operation")
+metrics.register_counter("query_coalesced", "Consultas atendidas por uma execução idêntica em andamento", lambda: dict(coalescing.coalesced), label="operation")
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """Retorna as métricas no formato texto do Prometheus"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,35 @@
+"""
+Router de Profiling
+
+Consulta dos perfis capturados pelo middleware de monitoramento (apenas admin).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from api.auth.jwt_handler import admin_required
+from api.monitoring.profiler import ProfiledRoute, profiler
+
+router = APIRouter(prefix="/api/v1/monitoring", tags=["Monitoramento"], dependencies=[Depends(admin_required)], route_class=ProfiledRoute)
+
+
+@router.get("/profiles", summary="Lista os perfis mais recentes")
+async def list_profiles(limit: int = Query(20, ge=1, le=100)):
+    """Retorna os perfis do buffer, do mais recente para o mais antigo, sem o detalhamento de funções"""
+    return {
+        "sample_rate": profiler.sample_rate,
+        "buffer_size": profiler.profiles.maxlen,
+        "profiles": profiler.list_profiles(limit)
+    }
+
+
+@router.get("/profiles/{profile_id}", summary="Detalha um perfil")
+async def get_profile(profile_id: int):
+    """Retorna tempos por fase e as funções com maior tempo acumulado"""
+    profile = profiler.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Perfil {profile_id} não encontrado (pode ter saído do buffer)")
+    return profile
+
+
+@router.delete("/profiles", summary="Limpa o buffer de perfis", status_code=204)
+async def clear_profiles():
+    profiler.clear()
@@ -0,0 +1,41 @@
+"""
+Projeção de Campos (`fields=`)
+
+Com `fields=id,title,price`, as rotas de listagem pedem ao backend só
+essas colunas e devolvem os dicionários direto como JSON, sem construir
+modelos `Book`: o tamanho da resposta e o custo de serialização passam a
+depender só dos campos pedidos. Sem `fields`, a resposta é a de sempre.
+"""
+
+from typing import List, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from api.storage.base import BOOK_FIELDS
+
+FIELDS_DESCRIPTION = f"Campos de cada livro, separados por vírgula ({', '.join(BOOK_FIELDS)}); omitido = todos"
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Valida a lista de campos pedida.
+
+    Returns:
+        Campos sem repetição, na ordem pedida, ou None para todos
+    """
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    invalid = [f for f in names if f not in BOOK_FIELDS]
+    if invalid or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campo inválido: {', '.join(invalid) or '(vazio)'}. Use: {', '.join(BOOK_FIELDS)}"
+        )
+    return names
+
+
+def projected_response(content) -> JSONResponse:
+    """Resposta já serializada, sem passar pelo `response_model` da rota"""
+    return JSONResponse(content=content)
@@ -4,31 +4,25 @@ Router de Scraping
 Endpoint para disparar o scraping em background (apenas admin).
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordBearer
-from api.auth.jwt_handler import get_current_user
+from api.auth.jwt_handler import admin_required
 import threading
-from scripts.scraper import main as run_scraper
 from api.config import DATA_PATH
 import os
+from api.monitoring.profiler import ProfiledRoute
 
-router = APIRouter(prefix="/api/v1/scraping", tags=["Scraping"])
+router = APIRouter(prefix="/api/v1/scraping", tags=["Scraping"], route_class=ProfiledRoute)
 
 
-def admin_required(user: dict = Depends(get_current_user)):
-    # user é um dict: {"username": ..., ...}
-    from api.auth.jwt_handler import FAKE_USERS_DB
-    username = user.get("username")
-    user_obj = FAKE_USERS_DB.get(username)
-    if not user_obj or user_obj.get("role") != "admin":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso permitido apenas para admin.")
-    return user_obj
-
 scraping_status = {"running": False, "last_result": None}
 
 def scraping_task():
     scraping_status["running"] = True
     try:
+        # Import tardio: o scraper traz requests, bs4 e pandas, que não fazem
+        # parte das dependências de produção (requirements.txt)
+        from scripts.scraper import main as run_scraper
         run_scraper()
         scraping_status["last_result"] = "Scraping concluído com sucesso."
     except Exception as e:
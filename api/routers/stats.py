@@ -3,11 +3,13 @@ Router de Estatísticas
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from typing import List
+from typing import List, Optional
 from api.models.schemas import StatsOverview, CategoryStats, Book
-from api.database import db
+from api.async_database import db
+from api.monitoring.profiler import ProfiledRoute, phase
+from api.routers.projection import FIELDS_DESCRIPTION, parse_fields, projected_response
 
-router = APIRouter(prefix="/api/v1", tags=["Estatísticas"])
+router = APIRouter(prefix="/api/v1", tags=["Estatísticas"], route_class=ProfiledRoute)
 
 @router.get("/stats/overview", response_model=StatsOverview)
 async def get_stats_overview():
@@ -15,8 +17,9 @@ async def get_stats_overview():
     if not db.is_loaded():
         raise HTTPException(status_code=503, detail="Dados não carregados")
     
-    stats = db.get_stats_overview()
-    return StatsOverview(**stats)
+    stats = await db.get_stats_overview()
+    with phase("model_build"):
+        return StatsOverview(**stats)
 
 @router.get("/stats/categories", response_model=List[CategoryStats])
 async def get_stats_by_category():
@@ -24,24 +27,33 @@ async def get_stats_by_category():
     if not db.is_loaded():
         raise HTTPException(status_code=503, detail="Dados não carregados")
     
-    stats = db.get_stats_by_category()
-    return [CategoryStats(**s) for s in stats]
+    stats = await db.get_stats_by_category()
+    with phase("model_build"):
+        return [CategoryStats(**s) for s in stats]
 
 @router.get("/books/top-rated", response_model=List[Book])
-async def get_top_rated_books(limit: int = Query(10, ge=1, le=50)):
+async def get_top_rated_books(
+    limit: int = Query(10, ge=1, le=50),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Lista os livros com melhor avaliação (rating 5)"""
     if not db.is_loaded():
         raise HTTPException(status_code=503, detail="Dados não carregados")
     
-    books = db.get_top_rated_books(limit)
-    return [Book(**book) for book in books]
+    projection = parse_fields(fields)
+    books = await db.get_top_rated_books(limit, projection)
+    with phase("model_build"):
+        if projection is not None:
+            return projected_response(books)
+        return [Book(**book) for book in books]
 
 @router.get("/books/price-range", response_model=List[Book])
 async def get_books_by_price_range(
     min: float = Query(..., ge=0, description="Preço mínimo"),
     max: float = Query(..., ge=0, description="Preço máximo"),
     skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """Filtra livros dentro de uma faixa de preço específica"""
     if not db.is_loaded():
@@ -50,5 +62,9 @@ async def get_books_by_price_range(
     if min > max:
         raise HTTPException(status_code=400, detail="Preço mínimo não pode ser maior que o máximo")
     
-    books = db.get_books_by_price_range(min, max, skip, limit)
-    return [Book(**book) for book in books]
+    projection = parse_fields(fields)
+    books = await db.get_books_by_price_range(min, max, skip, limit, projection)
+    with phase("model_build"):
+        if projection is not None:
+            return projected_response(books)
+        return [Book(**book) for book in books]
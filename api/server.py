@@ -0,0 +1,84 @@
+"""
+Launcher de Produção (multi-processo)
+
+Sobe N workers do uvicorn sobre `api.main:app` com o dataset carregado uma
+única vez no processo pai e publicado em memória compartilhada: cada worker
+se anexa ao snapshot colunar sem copiá-lo, então a memória do catálogo não
+é multiplicada pelo número de workers. Os índices derivados são construídos
+em cada worker (ver `api/storage/shared.py`).
+
+Com um único worker, o uvicorn atende no próprio processo: não há snapshot,
+e o processo carrega o CSV normalmente (SIGHUP não recarrega os dados).
+
+Uso:
+    python -m api.server --workers 4 --port 8000
+
+Para recarregar o CSV (ex: depois de um scraping), envie SIGHUP ao processo
+pai; os workers passam para a nova geração do snapshot em até ~1s:
+    kill -HUP <pid do processo pai>
+"""
+
+import argparse
+import os
+import signal
+import threading
+
+import uvicorn
+
+
+def main():
+    """Publica o snapshot e inicia os workers"""
+    parser = argparse.ArgumentParser(description="Books API - launcher multi-processo")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        # O uvicorn atende neste processo: sem snapshot, carga normal
+        uvicorn.run("api.main:app", host=args.host, port=args.port)
+        return
+
+    # O pai não atende requisições: o singleton não lê o CSV (LAZY_INIT) e o
+    # publisher carrega só as colunas. Os workers herdam o ambiente original.
+    lazy_init = os.environ.get("LAZY_INIT")
+    os.environ["LAZY_INIT"] = "1"
+    from api.database import db, BooksDatabase, SNAPSHOT_ENV
+    if lazy_init is None:
+        del os.environ["LAZY_INIT"]
+    else:
+        os.environ["LAZY_INIT"] = lazy_init
+
+    if not isinstance(db, BooksDatabase):
+        # O backend SQLite já compartilha o page cache do SO entre workers
+        uvicorn.run("api.main:app", host=args.host, port=args.port, workers=args.workers)
+        return
+
+    from api.storage.shared import SnapshotPublisher
+
+    publisher = SnapshotPublisher(db.csv_path)
+    publisher.publish()
+    # Os workers (processos spawn do uvicorn) herdam o ambiente
+    os.environ[SNAPSHOT_ENV] = publisher.control_name
+
+    def publish():
+        try:
+            publisher.publish()
+        except Exception as e:
+            print(f"❌ Erro ao recarregar o snapshot (a geração atual continua em uso): {e}")
+
+    def reload_snapshot(signum, frame):
+        # Recarrega fora do handler de sinal para não bloquear o supervisor
+        threading.Thread(target=publish, daemon=True).start()
+
+    signal.signal(signal.SIGHUP, reload_snapshot)
+    print(f"PID do processo pai: {os.getpid()} (kill -HUP para recarregar os dados)")
+
+    try:
+        uvicorn.run("api.main:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        publisher.close()
+
+
+if __name__ == "__main__":
+    main()
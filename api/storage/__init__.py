@@ -0,0 +1,10 @@
+"""
+Backends de Armazenamento
+
+Implementações intercambiáveis do acesso aos dados dos livros. O backend é
+escolhido pela extensão de `DATA_PATH` (ver `api.database.create_database`).
+"""
+
+from api.storage.base import StorageBackend, normalize_row, BOOK_FIELDS
+
+__all__ = ["StorageBackend", "normalize_row", "BOOK_FIELDS"]
@@ -0,0 +1,207 @@
+"""
+Interface Comum dos Backends de Armazenamento
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+
+# Colunas de um livro, na ordem do CSV
+BOOK_FIELDS = ("id", "title", "price", "rating", "availability", "category", "image_url", "book_url")
+
+
+def normalize_row(row: Dict) -> Dict:
+    """
+    Converte os tipos de uma linha lida do CSV.
+
+    Args:
+        row: Linha do csv.DictReader (valores em texto)
+
+    Returns:
+        A mesma linha com id/price/rating numéricos e availability padronizada
+
+    Raises:
+        ValueError: Se algum campo numérico for inválido
+    """
+    row['id'] = int(row.get('id', 0))
+    price_val = row.get('price', '0')
+    if isinstance(price_val, str):
+        price_val = price_val.replace('£', '').strip()
+    row['price'] = float(price_val) if price_val else 0.0
+    row['rating'] = int(row.get('rating', 0))
+    # Padronizar availability
+    avail = row.get('availability', '')
+    row['availability'] = 'In Stock' if 'in stock' in avail.lower() else 'Out of Stock'
+    row['title'] = row.get('title', '')
+    row['category'] = row.get('category', '')
+    return row
+
+
+def timed_steps(steps) -> Dict[str, float]:
+    """Executa (nome, função) em ordem e devolve os segundos de cada uma"""
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings[name] = round(time.perf_counter() - start, 4)
+    return timings
+
+
+class StorageBackend(ABC):
+    """Operações de consulta que todo backend precisa oferecer"""
+
+    # Incrementada a cada troca do conjunto de dados (invalida caches derivados)
+    data_version = 0
+
+    # Estatísticas da última carga (linhas/s, rejeitadas por motivo), se houver
+    ingest_stats = None  # type: Optional[Dict]
+
+    # Carga adiada (LAZY_INIT): feita uma única vez, em `ensure_loaded`
+    _load_pending = False
+    _load_lock = threading.Lock()
+
+    @abstractmethod
+    def load_data(self) -> bool:
+        """Carrega (ou abre) os dados; retorna True se deu certo"""
+
+    def defer_load(self) -> None:
+        """Marca a carga como pendente, para ser feita na primeira consulta"""
+        self._load_pending = True
+
+    def ensure_loaded(self) -> bool:
+        """Faz a carga pendente, se houver (uma vez, mesmo com chamadas concorrentes)"""
+        if self._load_pending:
+            with self._load_lock:
+                if self._load_pending:
+                    self.load_data()
+                    self._load_pending = False
+        return self.is_loaded()
+
+    def is_loaded(self) -> bool:
+        """Verifica se os dados estão carregados"""
+        return self.get_total_count() > 0
+
+    @abstractmethod
+    def get_all_books(self, skip: int = 0, limit: int = 20, fields: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Retorna todos os livros com paginação (só os campos `fields`, se informado)"""
+
+    @abstractmethod
+    def get_book_by_id(self, book_id: int) -> Optional[Dict]:
+        """Retorna um livro pelo ID, ou None"""
+
+    @abstractmethod
+    def search_books(
+        self,
+        title: Optional[str] = None,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Dict]:
+        """Busca livros por título e/ou categoria (substring, sem diferenciar maiúsculas)"""
+
+    @abstractmethod
+    def query_books(
+        self,
+        title: Optional[str] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        in_stock: Optional[bool] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        skip: int = 0,
+        limit: int = 20,
+        facets: Sequence[str] = (),
+        fields: Optional[Sequence[str]] = None
+    ) -> Dict:
+        """
+        Consulta composta (filtros combinados com AND).
+
+        Retorna {"total": total exato, "books": página, "plan": passos executados}
+        e, se `facets` for informado, "facets": faceta -> [{"value", "count"}].
+        Com `fields`, os livros da página trazem só esses campos.
+        """
+
+    @abstractmethod
+    def fuzzy_search_books(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Dict:
+        """
+        Busca aproximada por título, tolerante a erros de digitação.
+
+        Retorna {"total": resultados acima do score mínimo, "books": página
+        ordenada por similaridade, cada livro com o campo "score"}
+        """
+
+    @abstractmethod
+    def suggest(self, query: str, limit: int = 10) -> Dict:
+        """
+        Autocomplete: completions para o texto digitado.
+
+        Retorna {"categories": [nomes], "titles": [{"id", "title", "rating"}]},
+        títulos ordenados por rating
+        """
+
+    @abstractmethod
+    def get_all_categories(self) -> List[str]:
+        """Retorna a lista ordenada de categorias"""
+
+    @abstractmethod
+    def get_total_count(self) -> int:
+        """Retorna o número total de livros"""
+
+    def get_index_sizes(self) -> Dict[str, int]:
+        """Retorna o número de entradas de cada estrutura auxiliar (para métricas)"""
+        return {}
+
+    def snapshot(self) -> "StorageBackend":
+        """
+        Visão dos dados atuais que não muda com recargas posteriores (para
+        executar várias consultas sobre o mesmo conjunto de dados).
+
+        O padrão devolve o próprio backend, o que serve para backends cujos
+        dados não são trocados durante a vida do processo (ex: SQLite).
+        """
+        return self
+
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Calcula antecipadamente os agregados que as consultas reaproveitam.
+
+        Returns:
+            Segundos gastos em cada etapa
+        """
+        return timed_steps((
+            ("stats", lambda: (self.get_stats_overview(), self.get_stats_by_category())),
+            ("top_rated", self.get_top_rated_books),
+        ))
+
+    @abstractmethod
+    def get_stats_overview(self) -> Dict:
+        """Retorna estatísticas gerais da coleção"""
+
+    @abstractmethod
+    def get_stats_by_category(self) -> List[Dict]:
+        """Retorna estatísticas por categoria, ordenadas por quantidade"""
+
+    @abstractmethod
+    def get_top_rated_books(self, limit: int = 10, fields: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Retorna os livros com rating 5, em ordem de título (só os campos `fields`, se informado)"""
+
+    @abstractmethod
+    def get_books_by_price_range(
+        self,
+        min_price: float,
+        max_price: float,
+        skip: int = 0,
+        limit: int = 20,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Dict]:
+        """Retorna livros dentro de uma faixa de preço (só os campos `fields`, se informado)"""
@@ -0,0 +1,256 @@
+"""
+Feed de Alterações do Catálogo (change data capture)
+
+A cada scraping, o novo catálogo é comparado com o anterior (chave:
+`book_url`) e as diferenças viram uma nova versão do log de alterações:
+
+- `added`: livro novo
+- `removed`: livro que sumiu do site
+- `price_changed`: preço diferente
+- `availability_changed`: entrou ou saiu de estoque
+
+As versões ficam em um banco SQLite (`CHANGES_DB_PATH`) e são servidas por
+`GET /api/v1/books/changes?since=<versão>`, para que os clientes
+sincronizem só o que mudou em vez de baixar o catálogo inteiro.
+
+Comparar dois CSVs manualmente (grava uma versão):
+    python -m api.storage.changes data/books_antigo.csv data/books.csv
+"""
+
+import csv
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from api.config import CHANGES_DB_PATH
+from api.storage.base import normalize_row
+
+# Tipos de alteração, na ordem em que aparecem dentro de uma versão
+CHANGE_KINDS = ("added", "removed", "price_changed", "availability_changed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    version INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    change_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL REFERENCES versions (version),
+    kind TEXT NOT NULL,
+    book_url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    old_price REAL,
+    new_price REAL,
+    old_availability TEXT,
+    new_availability TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_changes_version ON changes (version);
+"""
+
+
+def read_books_csv(path: Path) -> List[Dict]:
+    """Lê um CSV de livros (mesmas regras de conversão do carregamento da API)"""
+    rows = []
+    with Path(path).open(newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            try:
+                rows.append(normalize_row(row))
+            except Exception:
+                continue  # Ignora linhas malformadas
+    return rows
+
+
+def diff_books(previous: Iterable[Dict], current: Iterable[Dict]) -> List[Dict]:
+    """
+    Compara dois catálogos pela `book_url`.
+
+    Args:
+        previous: Livros do catálogo anterior
+        current: Livros do catálogo novo
+
+    Returns:
+        Lista de alterações (dicionários com `kind`, `book_url`, `title` e
+        os valores antigo/novo de preço e disponibilidade)
+    """
+    before = {b['book_url']: b for b in previous if b.get('book_url')}
+    after = {b['book_url']: b for b in current if b.get('book_url')}
+    found = {kind: [] for kind in CHANGE_KINDS}
+
+    for url, new in after.items():
+        old = before.get(url)
+        if old is None:
+            found["added"].append(_change("added", None, new))
+            continue
+        if round(float(old['price']), 2) != round(float(new['price']), 2):
+            found["price_changed"].append(_change("price_changed", old, new))
+        if old['availability'] != new['availability']:
+            found["availability_changed"].append(_change("availability_changed", old, new))
+
+    for url, old in before.items():
+        if url not in after:
+            found["removed"].append(_change("removed", old, None))
+
+    return [change for kind in CHANGE_KINDS for change in found[kind]]
+
+
+def _change(kind: str, old: Optional[Dict], new: Optional[Dict]) -> Dict:
+    book = new if new is not None else old
+    return {
+        "kind": kind,
+        "book_url": book['book_url'],
+        "title": book.get('title', ''),
+        "old_price": float(old['price']) if old is not None else None,
+        "new_price": float(new['price']) if new is not None else None,
+        "old_availability": old['availability'] if old is not None else None,
+        "new_availability": new['availability'] if new is not None else None,
+    }
+
+
+class ChangeLog:
+    """Log versionado de alterações do catálogo"""
+
+    def __init__(self, path: Path = CHANGES_DB_PATH):
+        """
+        Args:
+            path: Banco SQLite com as versões
+        """
+        self.path = Path(path)
+        self._ready = False
+        self._setup_lock = threading.Lock()
+
+    def _setup(self) -> None:
+        """
+        Cria o banco, o schema e ativa o WAL (persistente no arquivo), uma
+        única vez por processo. Fica fora do `__init__` para que importar o
+        módulo não crie arquivos (ex: em sistemas de arquivos somente-leitura).
+        """
+        with self._setup_lock:
+            if self._ready:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(sqlite3.connect(str(self.path), timeout=5.0)) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+            self._ready = True
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self._setup()
+        conn = sqlite3.connect(str(self.path), timeout=5.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def record(self, changes: List[Dict]) -> Optional[int]:
+        """
+        Grava as alterações como uma nova versão.
+
+        Returns:
+            Número da nova versão, ou None se não havia alterações
+        """
+        if not changes:
+            return None
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO versions (created_at, change_count) VALUES (?, ?)",
+                (datetime.now(timezone.utc).isoformat(timespec="seconds"), len(changes))
+            )
+            version = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO changes (version, kind, book_url, title, old_price, new_price, "
+                "old_availability, new_availability) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (version, c["kind"], c["book_url"], c["title"], c["old_price"], c["new_price"],
+                     c["old_availability"], c["new_availability"])
+                    for c in changes
+                ]
+            )
+        return version
+
+    def record_snapshot(self, previous: Iterable[Dict], current: Iterable[Dict]) -> Optional[int]:
+        """Calcula a diferença entre dois catálogos e grava como nova versão"""
+        return self.record(diff_books(previous, current))
+
+    def latest_version(self) -> int:
+        """Versão mais recente (0 se nenhuma alteração foi gravada)"""
+        if not self.path.exists():
+            return 0
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COALESCE(MAX(version), 0) FROM versions").fetchone()[0]
+
+    def changes_since(self, since: int, limit: int = 1000) -> Dict:
+        """
+        Alterações posteriores a `since`, sempre em versões completas.
+
+        Versões inteiras são incluídas enquanto couberem em `limit` (pelo
+        menos uma, mesmo que maior), então `next_since` é sempre um ponto
+        de retomada consistente.
+
+        Args:
+            since: Última versão que o cliente já aplicou
+            limit: Máximo aproximado de alterações na resposta
+
+        Returns:
+            Dicionário com `since`, `latest_version`, `next_since`,
+            `has_more`, `versions` e `changes`
+        """
+        result = {"since": since, "latest_version": 0, "next_since": since,
+                  "has_more": False, "versions": [], "changes": []}
+        if not self.path.exists():
+            return result
+
+        with closing(self._connect()) as conn:
+            pending = conn.execute(
+                "SELECT version, created_at, change_count FROM versions WHERE version > ? ORDER BY version",
+                (since,)
+            ).fetchall()
+            result["latest_version"] = pending[-1]["version"] if pending else conn.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM versions"
+            ).fetchone()[0]
+
+            included = []
+            total = 0
+            for row in pending:
+                if included and total + row["change_count"] > limit:
+                    break
+                included.append(dict(row))
+                total += row["change_count"]
+            if not included:
+                return result
+
+            last = included[-1]["version"]
+            result["changes"] = [
+                dict(r) for r in conn.execute(
+                    "SELECT version, kind, book_url, title, old_price, new_price, old_availability, "
+                    "new_availability FROM changes WHERE version > ? AND version <= ? ORDER BY seq",
+                    (since, last)
+                )
+            ]
+            result["versions"] = included
+            result["next_since"] = last
+            result["has_more"] = last < result["latest_version"]
+        return result
+
+
+# Instância global do log de alterações (singleton)
+change_log = ChangeLog()
+
+
+def main():
+    """Compara dois CSVs e grava a diferença como nova versão"""
+    if len(sys.argv) != 3:
+        print("Uso: python -m api.storage.changes <csv anterior> <csv novo>")
+        sys.exit(1)
+    version = change_log.record_snapshot(read_books_csv(Path(sys.argv[1])), read_books_csv(Path(sys.argv[2])))
+    if version is None:
+        print("✓ Nenhuma alteração entre os catálogos")
+    else:
+        print(f"✓ Versão {version} gravada em {change_log.path}")
+
+
+if __name__ == "__main__":
+    main()
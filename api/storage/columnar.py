@@ -0,0 +1,526 @@
+"""
+Armazenamento Colunar dos Livros
+
+Guarda o catálogo em arrays tipados (um por coluna) em vez de uma lista de
+dicionários. Além de ocupar bem menos memória, o layout pode ser serializado
+em um único buffer contíguo (snapshot) e lido de volta sem cópia, por
+exemplo a partir de memória compartilhada entre workers.
+
+Cada linha só vira dicionário quando é devolvida por uma consulta (`row()`).
+As URLs (`image_url`, `book_url`) são guardadas sem os prefixos e sufixos
+que se repetem entre as linhas (ver `URLColumn`) e só são remontadas nesse
+momento.
+"""
+
+import json
+import re
+import struct
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from api.storage.fuzzy import TrigramIndex
+from api.storage.suggest import SuggestIndex
+
+SNAPSHOT_MAGIC = b"BKSNAP02"
+_HEADER = struct.Struct("<8sQ")  # magic, tamanho do cabeçalho JSON
+_ALIGN = 8
+
+# Um prefixo/sufixo de URL só entra no dicionário se for comum a pelo menos
+# tantas linhas (evita um dicionário enorme de diretórios quase únicos)
+URL_AFFIX_MIN_ROWS = 64
+# Linhas amostradas para escolher os prefixos/sufixos do dicionário
+URL_SAMPLE_SIZE = 20000
+URL_SAMPLE_MIN_HITS = 8
+
+
+def to_bitmap(positions: Iterable[int], count: int) -> int:
+    """
+    Converte posições em um bitmap (inteiro Python, bit i = linha i).
+
+    Operações entre bitmaps (`&`, `|`, `bit_count()`) rodam em C sobre
+    palavras de máquina, então contar uma interseção custa ~N/64 passos.
+    """
+    bits = bytearray((count + 7) // 8)
+    for i in positions:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def typed_column(typecode: str, rows: Sequence[Dict], column: str, get) -> array:
+    """
+    Monta o array tipado de uma coluna a partir das linhas.
+
+    Um valor que não cabe no tipo (ex: rating 1000 em "b") vira um
+    ValueError com a linha e a coluna, em vez de um OverflowError genérico.
+
+    Args:
+        typecode: Typecode do módulo array
+        rows: Linhas de origem
+        column: Nome da coluna (para a mensagem de erro)
+        get: Função linha -> valor
+    """
+    try:
+        return array(typecode, (get(r) for r in rows))
+    except (OverflowError, TypeError):
+        # Caminho de erro: refaz valor a valor para apontar a linha culpada
+        probe = array(typecode)
+        for i, row in enumerate(rows):
+            value = get(row)
+            try:
+                probe.append(value)
+            except (OverflowError, TypeError):
+                raise ValueError(f"Linha {i}: valor inválido para a coluna {column} ({typecode}): {value!r}") from None
+        raise
+
+
+class StringColumn:
+    """
+    Coluna de textos: todos os valores em UTF-8 concatenados em um único
+    buffer, mais um array de offsets (n + 1 posições).
+    """
+
+    __slots__ = ("offsets", "data")
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str]) -> "StringColumn":
+        offsets = array("q", [0])
+        chunks = []
+        pos = 0
+        for value in values:
+            encoded = value.encode("utf-8")
+            chunks.append(encoded)
+            pos += len(encoded)
+            offsets.append(pos)
+        return cls(offsets, b"".join(chunks))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def find_rows(self, needle: bytes, rows: Optional[Iterable[int]] = None) -> List[int]:
+        """
+        Retorna as linhas cujo valor contém `needle` (comparação em bytes).
+
+        A busca roda sobre o buffer UTF-8 com o motor de regex (em C), sem
+        decodificar linha a linha.
+
+        Args:
+            needle: Texto procurado, já em UTF-8
+            rows: Restringe a busca a estas linhas (opcional)
+        """
+        offsets = self.offsets
+        data = self.data
+        pattern = re.compile(re.escape(needle))
+        if rows is not None:
+            return [i for i in rows if pattern.search(data, offsets[i], offsets[i + 1])]
+
+        found = []
+        pos = 0
+        end = offsets[len(offsets) - 1]
+        while pos < end:
+            match = pattern.search(data, pos, end)
+            if match is None:
+                break
+            row = bisect_right(offsets, match.start()) - 1
+            row_end = offsets[row + 1]
+            if match.end() <= row_end:
+                found.append(row)
+                pos = row_end  # já casou: pula para a próxima linha
+            else:
+                pos = match.start() + 1  # o trecho atravessou a fronteira entre linhas
+        return found
+
+    def nbytes(self) -> int:
+        return memoryview(self.offsets).nbytes + memoryview(self.data).nbytes
+
+
+class URLColumn:
+    """
+    Coluna de URLs com dicionário de prefixos e sufixos.
+
+    Cada URL vira (modelo, miolo): o modelo é um par (prefixo, sufixo) do
+    dicionário e o miolo, a parte variável, fica em uma `StringColumn`.
+    Prefixos candidatos terminam em "/" ("https://books.toscrape.com/catalogue/");
+    sufixos candidatos começam no último "/" ou "." ("/index.html", ".jpg").
+    Cada linha usa o prefixo e o sufixo mais longos do dicionário que cabem nela.
+    """
+
+    __slots__ = ("templates", "codes", "middle")
+
+    def __init__(self, templates: List[Tuple[str, str]], codes, middle: StringColumn):
+        self.templates = templates
+        self.codes = codes
+        self.middle = middle
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str], min_rows: int = URL_AFFIX_MIN_ROWS) -> "URLColumn":
+        values = values if isinstance(values, list) else list(values)
+
+        # Candidatos contados em uma amostra (até URL_SAMPLE_SIZE linhas espaçadas)
+        stride = max(1, len(values) // URL_SAMPLE_SIZE)
+        prefixes = Counter()  # type: Counter
+        suffixes = Counter()  # type: Counter
+        for value in values[::stride]:
+            pos = value.find("/")
+            while pos != -1:
+                prefixes[value[:pos + 1]] += 1
+                pos = value.find("/", pos + 1)
+            for sep in "/.":
+                pos = value.rfind(sep)
+                if pos != -1:
+                    suffixes[value[pos:]] += 1
+        # Exige também várias ocorrências na amostra, para não estimar a partir de ruído
+        needed = max(min_rows / stride, min(min_rows, URL_SAMPLE_MIN_HITS))
+        prefixes = {p for p, n in prefixes.items() if n >= needed}
+        suffixes = {s for s, n in suffixes.items() if n >= needed}
+        # Cada linha testa só os comprimentos existentes no dicionário, do maior para o menor
+        prefix_lengths = sorted({len(p) for p in prefixes}, reverse=True)
+
+        template_index = {}  # type: Dict[Tuple[str, str], int]
+        codes = array("I")
+        middles = []
+        for value in values:
+            prefix = ""
+            for length in prefix_lengths:
+                if value[:length] in prefixes:
+                    prefix = value[:length]
+                    break
+            suffix = ""
+            for sep in "/.":
+                pos = value.rfind(sep)
+                if pos >= len(prefix) and len(value) - pos > len(suffix) and value[pos:] in suffixes:
+                    suffix = value[pos:]
+            template = (prefix, suffix)
+            code = template_index.get(template)
+            if code is None:
+                code = template_index[template] = len(template_index)
+            codes.append(code)
+            middles.append(value[len(prefix):len(value) - len(suffix)])
+
+        if len(template_index) <= 0xFFFF:
+            codes = array("H", codes)
+        return cls(list(template_index), codes, StringColumn.from_strings(middles))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str:
+        prefix, suffix = self.templates[self.codes[i]]
+        return prefix + self.middle[i] + suffix
+
+    def nbytes(self) -> int:
+        dictionary = sum(len(p.encode("utf-8")) + len(s.encode("utf-8")) for p, s in self.templates)
+        return memoryview(self.codes).nbytes + self.middle.nbytes() + dictionary
+
+
+class BookColumns:
+    """Catálogo de livros em colunas tipadas"""
+
+    # Colunas numéricas: nome -> typecode do módulo array
+    NUMERIC = {
+        "ids": "q",
+        "prices": "d",
+        "ratings": "b",
+        "in_stock": "b",
+        "category_codes": "I",
+        "id_order": "q",  # posições ordenadas por id (busca binária por ID)
+    }
+    STRINGS = ("title", "title_folded")
+    URLS = ("image_url", "book_url")
+
+    def __init__(self, count: int, categories: List[str], numeric: Dict, strings: Dict[str, StringColumn],
+                 urls: Dict[str, URLColumn]):
+        self.count = count
+        self.categories = categories  # código -> nome (ordem de primeira aparição)
+        for name in self.NUMERIC:
+            setattr(self, name, numeric[name])
+        for name in self.STRINGS:
+            setattr(self, name, strings[name])
+        for name in self.URLS:
+            setattr(self, name, urls[name])
+        # Agregados derivados (estatísticas, ordenações), calculados sob demanda
+        # e válidos enquanto este snapshot estiver em uso
+        self.derived = {}  # type: Dict
+        self._buffer = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict]) -> "BookColumns":
+        """
+        Constrói as colunas a partir de linhas já normalizadas.
+        
+        Args:
+            rows: Dicionários com os campos de BOOK_FIELDS
+
+        Raises:
+            ValueError: Se um valor não couber no tipo da coluna
+        """
+        numeric = cls.NUMERIC
+        return cls.from_columns(
+            ids=typed_column(numeric["ids"], rows, "id", lambda r: r['id']),
+            titles=[r['title'] for r in rows],
+            prices=typed_column(numeric["prices"], rows, "price", lambda r: r['price']),
+            ratings=typed_column(numeric["ratings"], rows, "rating", lambda r: r['rating']),
+            in_stock=array(numeric["in_stock"], (r['availability'] == 'In Stock' for r in rows)),
+            categories=[r['category'] for r in rows],
+            image_urls=[r.get('image_url', '') for r in rows],
+            book_urls=[r.get('book_url', '') for r in rows],
+        )
+
+    @classmethod
+    def from_columns(cls, ids: array, titles: List[str], prices: array, ratings: array, in_stock: array,
+                     categories: List[str], image_urls: List[str], book_urls: List[str]) -> "BookColumns":
+        """
+        Constrói as colunas a partir de listas já convertidas (uma por campo,
+        na ordem das linhas), ex: as partes produzidas pela carga paralela.
+        """
+        category_index = {}  # type: Dict[str, int]
+        codes = array(cls.NUMERIC["category_codes"])
+        max_code = 2 ** (8 * codes.itemsize) - 1
+        for i, category in enumerate(categories):
+            code = category_index.get(category)
+            if code is None:
+                code = len(category_index)
+                if code > max_code:
+                    raise ValueError(f"Linha {i}: mais de {max_code + 1} categorias distintas na coluna category")
+                category_index[category] = code
+            codes.append(code)
+
+        numeric = {
+            "ids": ids,
+            "prices": prices,
+            "ratings": ratings,
+            "in_stock": in_stock,
+            "category_codes": codes,
+            "id_order": array("q", sorted(range(len(ids)), key=ids.__getitem__)),
+        }
+        strings = {
+            "title": StringColumn.from_strings(titles),
+            "title_folded": StringColumn.from_strings(t.lower() for t in titles),
+        }
+        urls = {"image_url": URLColumn.from_strings(image_urls), "book_url": URLColumn.from_strings(book_urls)}
+        return cls(len(ids), list(category_index), numeric, strings, urls)
+
+    def row(self, i: int) -> Dict:
+        """Materializa a linha `i` como dicionário"""
+        return {
+            "id": self.ids[i],
+            "title": self.title[i],
+            "price": self.prices[i],
+            "rating": self.ratings[i],
+            "availability": "In Stock" if self.in_stock[i] else "Out of Stock",
+            "category": self.categories[self.category_codes[i]],
+            "image_url": self.image_url[i],
+            "book_url": self.book_url[i],
+        }
+
+    def rows(self, positions: Iterable[int], fields: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Materializa as linhas de `positions`, só com as colunas pedidas.
+
+        Args:
+            positions: Posições das linhas, na ordem desejada
+            fields: Campos do livro a incluir (ver `BOOK_FIELDS`); None = todos
+
+        Returns:
+            Lista de dicionários com os campos na ordem de `fields`
+        """
+        if fields is None:
+            return [self.row(i) for i in positions]
+        getters = [(name, self._field_getter(name)) for name in fields]
+        return [{name: get(i) for name, get in getters} for i in positions]
+
+    def _field_getter(self, name: str):
+        """Função posição -> valor de um campo do livro"""
+        if name == "availability":
+            in_stock = self.in_stock
+            return lambda i: "In Stock" if in_stock[i] else "Out of Stock"
+        if name == "category":
+            categories, codes = self.categories, self.category_codes
+            return lambda i: categories[codes[i]]
+        if name == "id":
+            return self.ids.__getitem__
+        if name == "price":
+            return self.prices.__getitem__
+        if name == "rating":
+            return self.ratings.__getitem__
+        if name in ("title", "image_url", "book_url"):
+            return getattr(self, name).__getitem__
+        raise ValueError(f"Campo inválido: {name}")
+
+    def find_id(self, book_id: int) -> Optional[int]:
+        """Busca binária da posição de um ID (primeira ocorrência)"""
+        ids, order = self.ids, self.id_order
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ids[order[mid]] < book_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and ids[order[lo]] == book_id:
+            return order[lo]
+        return None
+
+    def nbytes(self) -> int:
+        """Bytes ocupados pelas colunas"""
+        total = sum(memoryview(getattr(self, name)).nbytes for name in self.NUMERIC)
+        return total + sum(getattr(self, name).nbytes() for name in self.STRINGS + self.URLS)
+
+    # ------------------------------------------------------------------
+    # Índices derivados (construídos sob demanda, um por snapshot)
+    # ------------------------------------------------------------------
+
+    def postings(self, column: str) -> Dict[int, array]:
+        """
+        Lista de posições (em ordem crescente) de cada valor de uma coluna
+        de baixa cardinalidade: `category_codes`, `ratings` ou `in_stock`.
+        """
+        key = "postings:" + column
+        index = self.derived.get(key)
+        if index is None:
+            index = {}
+            for i, value in enumerate(getattr(self, column)):
+                rows = index.get(value)
+                if rows is None:
+                    rows = index[value] = array("q")
+                rows.append(i)
+            self.derived[key] = index
+        return index
+
+    def bitmaps(self, column: str) -> Dict[int, int]:
+        """Bitmap de cada valor de uma coluna de baixa cardinalidade (ver `postings`)"""
+        key = "bitmaps:" + column
+        index = self.derived.get(key)
+        if index is None:
+            index = {value: to_bitmap(rows, self.count) for value, rows in self.postings(column).items()}
+            self.derived[key] = index
+        return index
+
+    def trigram_index(self) -> TrigramIndex:
+        """Índice de trigramas dos títulos (busca aproximada)"""
+        index = self.derived.get("trigrams")
+        if index is None:
+            index = self.derived["trigrams"] = TrigramIndex.build(self.title[i] for i in range(self.count))
+        return index
+
+    def suggest_index(self, top_n: int) -> SuggestIndex:
+        """Trie de prefixos para o autocomplete (`top_n` completions por nó)"""
+        index = self.derived.get("suggest")
+        if index is None:
+            postings = self.postings("category_codes")
+            index = self.derived["suggest"] = SuggestIndex.build(
+                [self.title[i] for i in range(self.count)],
+                self.ratings,
+                self.categories,
+                [len(postings.get(code, ())) for code in range(len(self.categories))],
+                top_n
+            )
+        return index
+
+    def price_index(self):
+        """
+        Retorna (preços ordenados, posições na mesma ordem), para resolver
+        faixas de preço com busca binária.
+        """
+        index = self.derived.get("price_index")
+        if index is None:
+            prices = self.prices
+            order = array("q", sorted(range(self.count), key=prices.__getitem__))
+            index = self.derived["price_index"] = (array("d", (prices[i] for i in order)), order)
+        return index
+
+    # ------------------------------------------------------------------
+    # Snapshot (buffer contíguo, lido sem cópia)
+    # ------------------------------------------------------------------
+
+    def _sections(self):
+        """Lista (nome, typecode, buffer) de todas as seções do snapshot"""
+        sections = [(name, code, getattr(self, name)) for name, code in self.NUMERIC.items()]
+        for name in self.STRINGS:
+            column = getattr(self, name)
+            sections.append((name + ".offsets", "q", column.offsets))
+            sections.append((name + ".data", "B", column.data))
+        for name in self.URLS:
+            column = getattr(self, name)
+            sections.append((name + ".codes", column.codes.typecode if isinstance(column.codes, array)
+                             else column.codes.format, column.codes))
+            sections.append((name + ".offsets", "q", column.middle.offsets))
+            sections.append((name + ".data", "B", column.middle.data))
+        return sections
+
+    def _layout(self):
+        sections = self._sections()
+        layout = {}
+        pos = 0
+        for name, code, buf in sections:
+            nbytes = memoryview(buf).nbytes
+            layout[name] = [pos, nbytes, code]
+            pos += (nbytes + _ALIGN - 1) // _ALIGN * _ALIGN
+        templates = {name: getattr(self, name).templates for name in self.URLS}
+        header = json.dumps({"count": self.count, "categories": self.categories,
+                             "url_templates": templates, "sections": layout}).encode()
+        data_start = (_HEADER.size + len(header) + _ALIGN - 1) // _ALIGN * _ALIGN
+        return sections, layout, header, data_start, data_start + pos
+
+    def snapshot_size(self) -> int:
+        """Tamanho em bytes do snapshot serializado"""
+        return self._layout()[4]
+
+    def write_snapshot(self, buf) -> int:
+        """
+        Serializa as colunas em `buf` (bytearray, mmap ou SharedMemory.buf).
+
+        Returns:
+            Número de bytes escritos
+        """
+        sections, layout, header, data_start, total = self._layout()
+        target = memoryview(buf)
+        _HEADER.pack_into(target, 0, SNAPSHOT_MAGIC, len(header))
+        target[_HEADER.size:_HEADER.size + len(header)] = header
+        for name, _, source in sections:
+            offset, nbytes, _ = layout[name]
+            start = data_start + offset
+            target[start:start + nbytes] = memoryview(source).cast("B")
+        return total
+
+    @classmethod
+    def from_snapshot(cls, buf) -> "BookColumns":
+        """
+        Abre um snapshot sem copiar os dados: as colunas passam a ser
+        memoryviews sobre `buf`, que precisa continuar vivo.
+        """
+        view = memoryview(buf)
+        magic, header_len = _HEADER.unpack_from(view, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Snapshot inválido (magic não confere)")
+        header = json.loads(bytes(view[_HEADER.size:_HEADER.size + header_len]))
+        data_start = (_HEADER.size + header_len + _ALIGN - 1) // _ALIGN * _ALIGN
+
+        def section(name):
+            offset, nbytes, code = header["sections"][name]
+            return view[data_start + offset:data_start + offset + nbytes].cast(code)
+
+        numeric = {name: section(name) for name in cls.NUMERIC}
+        strings = {name: StringColumn(section(name + ".offsets"), section(name + ".data")) for name in cls.STRINGS}
+        urls = {
+            name: URLColumn(
+                [tuple(t) for t in header["url_templates"][name]],
+                section(name + ".codes"),
+                StringColumn(section(name + ".offsets"), section(name + ".data"))
+            )
+            for name in cls.URLS
+        }
+        columns = cls(header["count"], header["categories"], numeric, strings, urls)
+        columns._buffer = view
+        return columns
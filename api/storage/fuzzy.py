@@ -0,0 +1,201 @@
+"""
+Busca Aproximada por Título (tolerante a erros de digitação)
+
+Índice invertido de trigramas: cada palavra normalizada do título é
+preenchida com espaços ("  harry ") e quebrada em trigramas; o índice
+guarda, para cada trigrama, as posições (crescentes) dos livros que o têm.
+
+Uma consulta acontece em duas etapas:
+
+1. Candidatos: livros que compartilham pelo menos `k` trigramas com a
+   consulta. Pelo princípio da casa dos pombos, todo candidato aparece em
+   alguma das `t - k + 1` listas mais curtas (t = trigramas da consulta);
+   só essas listas são percorridas, e as `k - 1` mais longas são
+   consultadas por busca binária. Com poucos trigramas na consulta (k = 1
+   ou 2), listas comuns como " th" ainda são percorridas por inteiro. Um
+   filtro de posições (ex: a categoria) é aplicado já nesta etapa; se for
+   menor que as listas, a contagem parte dele.
+2. Ranking: todos os candidatos são repontuados pela distância de edição
+   entre cada palavra da consulta e a palavra mais próxima do título. As
+   distâncias são memorizadas por palavra do título, então o custo cresce
+   com o vocabulário dos candidatos, não com o tamanho dos títulos.
+"""
+
+import math
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Fração mínima dos trigramas da consulta que um candidato precisa ter
+MIN_SHARED_RATIO = 0.3
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_EMPTY = array("I")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sem acentos e sem pontuação (palavras separadas por um espaço)"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas das palavras de um texto já normalizado"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def shared_needed(grams: int) -> int:
+    """Trigramas em comum exigidos de um candidato, para uma consulta com `grams` trigramas"""
+    return max(1, math.ceil(grams * MIN_SHARED_RATIO))
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Distância de edição (inserção, remoção e troca custam 1)"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def similarity(query_words: Sequence[str], title: str) -> float:
+    """
+    Similaridade entre 0 e 1: para cada palavra da consulta, a palavra do
+    título com menor distância de edição; a média é ponderada pelo tamanho
+    das palavras da consulta.
+    """
+    title_words = normalize(title).split()
+    if not query_words or not title_words:
+        return 0.0
+    total = 0.0
+    for word in query_words:
+        best = min(levenshtein(word, t) / max(len(word), len(t)) for t in title_words)
+        total += len(word) * (1.0 - best)
+    return total / sum(len(w) for w in query_words)
+
+
+class TrigramIndex:
+    """Índice invertido trigrama -> posições dos títulos"""
+
+    def __init__(self, postings: Dict[str, array], count: int):
+        self.postings = postings
+        self.count = count
+
+    @classmethod
+    def build(cls, titles: Iterable[str]) -> "TrigramIndex":
+        postings = {}  # type: Dict[str, array]
+        count = 0
+        for i, title in enumerate(titles):
+            count += 1
+            for gram in trigrams(normalize(title)):
+                rows = postings.get(gram)
+                if rows is None:
+                    rows = postings[gram] = array("I")
+                rows.append(i)
+        return cls(postings, count)
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def nbytes(self) -> int:
+        return sum(memoryview(rows).nbytes for rows in self.postings.values())
+
+    def candidates(self, query: str, allowed: Optional[Sequence[int]] = None) -> List[Tuple[int, int]]:
+        """
+        Livros com pelo menos `MIN_SHARED_RATIO` dos trigramas da consulta.
+
+        Args:
+            query: Consulta já normalizada
+            allowed: Posições permitidas, em ordem crescente (ex: as da
+                     categoria pedida); None = todas
+
+        Returns:
+            Lista de (posição, trigramas em comum), sem ordem definida
+        """
+        lists = sorted((self.postings.get(g, _EMPTY) for g in trigrams(query)), key=len)
+        if not lists:
+            return []
+        needed = shared_needed(len(lists))
+        cut = len(lists) - needed + 1
+
+        counts = Counter()  # type: Counter
+        if allowed is not None and len(allowed) < sum(len(rows) for rows in lists[:cut]):
+            # Filtro mais seletivo que as listas curtas: a contagem parte dele
+            counts.update(dict.fromkeys(allowed, 0))
+            probe = lists
+        else:
+            # Etapa 1: contagem só nas listas curtas (todo candidato está em alguma delas)
+            for rows in lists[:cut]:
+                counts.update(rows)
+            if allowed is not None:
+                permitted = set(allowed)
+                counts = Counter({pos: shared for pos, shared in counts.items() if pos in permitted})
+            probe = lists[cut:]
+
+        # Etapa 2: completa a contagem nas demais listas por busca binária
+        for rows in probe:
+            size = len(rows)
+            for pos in counts:
+                j = bisect_left(rows, pos)
+                if j < size and rows[j] == pos:
+                    counts[pos] += 1
+
+        return [(pos, shared) for pos, shared in counts.items() if shared >= needed]
+
+
+def rank(
+    query: str,
+    candidates: Iterable[Tuple[int, int]],
+    title_at: Callable[[int], str],
+    min_score: float
+) -> List[Tuple[int, float]]:
+    """
+    Repontua candidatos pela distância de edição (mesmo score de `similarity`).
+
+    Args:
+        query: Consulta já normalizada
+        candidates: (posição, trigramas em comum), como em `TrigramIndex.candidates`
+        title_at: Função que devolve o título de uma posição
+        min_score: Similaridade mínima para entrar no resultado
+
+    Returns:
+        Lista de (posição, score), do mais para o menos similar
+    """
+    words = query.split()
+    if not words:
+        return []
+    weights = [len(w) for w in words]
+    total_weight = sum(weights)
+    # Palavra do título -> distância relativa a cada palavra da consulta
+    distances = {}  # type: Dict[str, List[float]]
+
+    scored = []
+    for pos, shared in candidates:
+        best = None
+        for title_word in set(normalize(title_at(pos)).split()):
+            ratios = distances.get(title_word)
+            if ratios is None:
+                ratios = distances[title_word] = [
+                    levenshtein(w, title_word) / max(len(w), len(title_word)) for w in words
+                ]
+            best = ratios if best is None else [min(b, r) for b, r in zip(best, ratios)]
+        if best is None:
+            continue
+        score = sum(weight * (1.0 - b) for weight, b in zip(weights, best)) / total_weight
+        if score >= min_score:
+            scored.append((pos, round(score, 4), shared))
+    scored.sort(key=lambda s: (-s[1], -s[2], s[0]))
+    return [(pos, score) for pos, score, _ in scored]
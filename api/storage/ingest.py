@@ -0,0 +1,259 @@
+"""
+Carga Paralela do CSV
+
+O arquivo é dividido em blocos de ~`INGEST_CHUNK_BYTES` em fronteiras de
+linha; cada bloco é lido, convertido (mesmas regras de `normalize_row`) e
+devolvido já em colunas (arrays tipados e listas de textos) por um pool de
+processos. O processo principal só concatena as partes, na ordem do
+arquivo, e monta o `BookColumns`.
+
+Linhas rejeitadas não somem mais em silêncio: cada uma é contada por
+motivo, com algumas amostras (número da linha e motivo), e as estatísticas
+da carga (linhas/s, rejeições) aparecem no health check. Valores que não
+cabem nos arrays tipados (ex: rating 1000 em um byte) e bytes que não são
+UTF-8 válido também rejeitam só a linha, em vez de derrubar a carga ou
+virar U+FFFD em silêncio.
+
+Arquivos pequenos (< `INGEST_PARALLEL_MIN_BYTES`) são lidos no próprio
+processo, onde subir o pool custaria mais que a leitura. A divisão por
+linhas assume que nenhum campo entre aspas contém quebra de linha (o
+formato gerado pelo scraper); uma linha assim seria rejeitada, não
+misturada com a seguinte.
+"""
+
+import csv
+import io
+import os
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from api.config import INGEST_CHUNK_BYTES, INGEST_PARALLEL_MIN_BYTES, INGEST_WORKERS
+from api.storage.base import BOOK_FIELDS, normalize_row
+from api.storage.columnar import BookColumns
+
+# Quantas linhas rejeitadas são guardadas como exemplo
+REJECTED_SAMPLES = 10
+
+_TEXT_FIELDS = ("title", "category", "image_url", "book_url")
+
+INVALID_UTF8 = "invalid_utf8"
+
+
+def _int_bounds(typecode: str) -> Tuple[int, int]:
+    """Menor e maior inteiro que cabem em um array do typecode (com sinal)"""
+    bits = 8 * array(typecode).itemsize
+    return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+
+
+# Colunas inteiras e os limites dos seus arrays em BookColumns
+_INT_RANGES = (
+    ("id", _int_bounds(BookColumns.NUMERIC["ids"])),
+    ("rating", _int_bounds(BookColumns.NUMERIC["ratings"])),
+)
+
+
+def out_of_range(row: Dict) -> Optional[str]:
+    """
+    Motivo de rejeição se um valor já convertido não couber na sua coluna.
+
+    Args:
+        row: Linha já convertida por `normalize_row`
+
+    Returns:
+        Ex: "rating fora do intervalo", ou None se a linha cabe nas colunas
+    """
+    for field, (low, high) in _INT_RANGES:
+        if not low <= row[field] <= high:
+            return f"{field} fora do intervalo"
+    return None
+
+
+def decode_chunk(raw: bytes) -> Tuple[str, Set[int]]:
+    """
+    Decodifica um bloco como UTF-8 estrito, isolando as linhas inválidas.
+
+    Returns:
+        (texto, números das linhas inválidas, a partir de 1); cada linha
+        inválida vira uma linha vazia, para não deslocar as seguintes
+    """
+    try:
+        return raw.decode("utf-8"), set()
+    except UnicodeDecodeError:
+        pass
+    lines, invalid = [], set()
+    for number, line in enumerate(raw.split(b"\n"), 1):
+        try:
+            lines.append(line.decode("utf-8"))
+        except UnicodeDecodeError:
+            lines.append("")
+            invalid.add(number)
+    return "\n".join(lines), invalid
+
+
+def utf8_lines(lines: Iterable[bytes]) -> Iterator[str]:
+    """Decodifica linhas como UTF-8 estrito, pulando as inválidas (para o csv.reader)"""
+    for line in lines:
+        try:
+            yield line.decode("utf-8")
+        except UnicodeDecodeError:
+            continue
+
+
+def split_chunks(path: Path, chunk_bytes: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Divide o arquivo em faixas de bytes terminadas em fim de linha.
+
+    Returns:
+        (linha de cabeçalho, lista de (início, fim) dos blocos de dados)
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        chunks = []
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()  # avança até o fim da linha corrente
+            end = min(f.tell(), size)
+            chunks.append((start, end))
+            start = end
+    return header, chunks
+
+
+def _invalid_field(row: Dict) -> str:
+    """Identifica o campo que impediu a conversão (mesmas regras de normalize_row)"""
+    checks = (("id", int), ("price", lambda v: float(v.replace('£', '').strip() or 0)), ("rating", int))
+    for field, convert in checks:
+        try:
+            convert(row.get(field, '0'))
+        except (TypeError, ValueError):
+            return f"{field} inválido"
+    return "linha inválida"
+
+
+def parse_chunk(path: str, start: int, end: int, fieldnames: List[str]) -> Dict:
+    """
+    Converte um bloco do CSV em colunas (roda nos processos do pool).
+
+    Args:
+        path: Caminho do CSV
+        start: Offset do primeiro byte do bloco
+        end: Offset do fim do bloco (exclusivo)
+        fieldnames: Colunas do cabeçalho
+
+    Returns:
+        Dicionário com as colunas do bloco, `lines` (linhas lidas),
+        `rejected` (contagem por motivo) e `samples` (linha relativa, motivo)
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        text, invalid = decode_chunk(f.read(end - start))
+
+    numeric = BookColumns.NUMERIC
+    ids, prices = array(numeric["ids"]), array(numeric["prices"])
+    ratings, in_stock = array(numeric["ratings"]), array(numeric["in_stock"])
+    texts = {field: [] for field in _TEXT_FIELDS}  # type: Dict[str, List[str]]
+    rejected = Counter()  # type: Counter
+    samples = []
+    width = len(fieldnames)
+    lines = 0
+
+    for lines, values in enumerate(csv.reader(io.StringIO(text)), 1):
+        if lines in invalid:
+            reason = INVALID_UTF8
+        elif not values:
+            continue  # linha em branco (o DictReader também as ignora)
+        elif len(values) != width:
+            reason = f"{len(values)} colunas (esperadas {width})"
+        else:
+            row = dict(zip(fieldnames, values))
+            try:
+                normalize_row(row)
+                reason = out_of_range(row)
+            except (TypeError, ValueError):
+                reason = _invalid_field(row)
+        if reason is not None:
+            rejected[reason] += 1
+            if len(samples) < REJECTED_SAMPLES:
+                samples.append((lines, reason))
+            continue
+        ids.append(row['id'])
+        prices.append(row['price'])
+        ratings.append(row['rating'])
+        in_stock.append(row['availability'] == 'In Stock')
+        for field in _TEXT_FIELDS:
+            texts[field].append(row.get(field, ''))
+
+    return {"ids": ids, "prices": prices, "ratings": ratings, "in_stock": in_stock,
+            **texts, "lines": lines, "rejected": rejected, "samples": samples}
+
+
+def load_columns(path: Path, workers: int = INGEST_WORKERS) -> Tuple[BookColumns, Dict]:
+    """
+    Lê o CSV em paralelo e monta as colunas.
+
+    Args:
+        path: CSV no formato de `data/books.csv`
+        workers: Processos do pool (0 = número de CPUs)
+
+    Returns:
+        (colunas, estatísticas da carga)
+    """
+    started = time.perf_counter()
+    path = Path(path)
+    size = path.stat().st_size
+    header, ranges = split_chunks(path, INGEST_CHUNK_BYTES)
+    fieldnames = next(csv.reader([header.decode("utf-8-sig")]), [])
+    missing = [f for f in BOOK_FIELDS if f not in fieldnames and f not in ("image_url", "book_url")]
+    if missing:
+        raise ValueError(f"Cabeçalho sem as colunas: {', '.join(missing)}")
+
+    workers = workers or os.cpu_count() or 1
+    parallel = size >= INGEST_PARALLEL_MIN_BYTES and len(ranges) > 1 and workers > 1
+    if parallel:
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            parts = list(pool.map(parse_chunk, *zip(*[(str(path), s, e, fieldnames) for s, e in ranges])))
+    else:
+        parts = [parse_chunk(str(path), s, e, fieldnames) for s, e in ranges]
+    parsed = time.perf_counter()
+
+    merged = {name: array(BookColumns.NUMERIC[name]) for name in ("ids", "prices", "ratings", "in_stock")}
+    texts = {field: [] for field in _TEXT_FIELDS}  # type: Dict[str, List[str]]
+    rejected = Counter()  # type: Counter
+    samples = []
+    line_offset = 1  # linha 1 é o cabeçalho
+    for part in parts:
+        for name, column in merged.items():
+            column.extend(part[name])
+        for field in _TEXT_FIELDS:
+            texts[field].extend(part[field])
+        rejected.update(part["rejected"])
+        for line, reason in part["samples"]:
+            if len(samples) < REJECTED_SAMPLES:
+                samples.append({"line": line_offset + line, "reason": reason})
+        line_offset += part["lines"]
+
+    columns = BookColumns.from_columns(
+        ids=merged["ids"], titles=texts["title"], prices=merged["prices"], ratings=merged["ratings"],
+        in_stock=merged["in_stock"], categories=texts["category"],
+        image_urls=texts["image_url"], book_urls=texts["book_url"],
+    )
+    elapsed = time.perf_counter() - started
+    stats = {
+        "source": str(path),
+        "bytes": size,
+        "rows_loaded": columns.count,
+        "rows_rejected": sum(rejected.values()),
+        "rejected_by_reason": dict(rejected.most_common()),
+        "rejected_samples": samples,
+        "chunks": len(ranges),
+        "workers": min(workers, len(ranges)) if parallel else 1,
+        "parse_seconds": round(parsed - started, 3),
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(columns.count / elapsed, 1) if elapsed else None,
+    }
+    return columns, stats
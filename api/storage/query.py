@@ -0,0 +1,311 @@
+"""
+Motor de Consultas Compostas (backend colunar)
+
+Combina título, categoria, faixa de preço, faixa de rating e
+disponibilidade em uma única consulta. O planejador calcula, pelos índices
+derivados de `BookColumns`, quantas linhas cada filtro seleciona; a
+execução parte do filtro mais seletivo e só testa os demais nas linhas que
+sobraram, do mais para o menos seletivo. A busca por título (substring)
+não tem índice: ela varre o buffer inteiro apenas quando nenhum outro
+filtro reduz bem o conjunto, e caso contrário é aplicada por último.
+
+Facetas (contagens por categoria, rating, faixa de preço e disponibilidade
+dentro do resultado) são calculadas com bitmaps: o conjunto resultante vira
+um bitmap e cada contagem é o popcount da interseção com o bitmap
+pré-calculado daquele valor.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from typing import Callable, Dict, List, Optional, Sequence
+
+from api.storage.columnar import BookColumns, to_bitmap
+
+# Campos aceitos em `sort`
+SORT_FIELDS = ("id", "title", "price", "rating")
+
+# Facetas disponíveis e limites das faixas de preço (£)
+FACET_FIELDS = ("category", "rating", "price", "availability")
+PRICE_FACET_EDGES = (10, 20, 30, 40, 50)
+
+
+def price_bucket_labels() -> List[str]:
+    """Rótulos das faixas de preço ("0-10", "10-20", ..., "50+")"""
+    bounds = (0,) + PRICE_FACET_EDGES
+    labels = [f"{lo}-{hi}" for lo, hi in zip(bounds, bounds[1:])]
+    return labels + [f"{PRICE_FACET_EDGES[-1]}+"]
+
+
+# Acima desta fração do catálogo, o título é buscado varrendo o buffer
+# inteiro (regex em C) em vez de linha a linha sobre os candidatos
+TITLE_SCAN_RATIO = 0.25
+
+
+class BookQuery:
+    """Critérios de uma consulta composta (todos opcionais, combinados com AND)"""
+
+    __slots__ = ("title", "category", "min_price", "max_price", "min_rating", "max_rating",
+                 "in_stock", "sort", "descending")
+
+    def __init__(
+        self,
+        title: Optional[str] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        in_stock: Optional[bool] = None,
+        sort: Optional[str] = None,
+        descending: bool = False
+    ):
+        if sort is not None and sort not in SORT_FIELDS:
+            raise ValueError(f"Campo de ordenação inválido: {sort}")
+        self.title = title
+        self.category = category
+        self.min_price = min_price
+        self.max_price = max_price
+        self.min_rating = min_rating
+        self.max_rating = max_rating
+        self.in_stock = in_stock
+        self.sort = sort
+        self.descending = descending
+
+
+class _Filter:
+    """Um filtro indexado: quantas linhas seleciona, quais são e como testar uma linha"""
+
+    __slots__ = ("name", "estimate", "rows", "test")
+
+    def __init__(self, name: str, estimate: int, rows: Callable[[], Sequence[int]], test: Callable[[int], bool]):
+        self.name = name
+        self.estimate = estimate
+        self.rows = rows
+        self.test = test
+
+
+def _merge(lists: List[Sequence[int]]) -> Sequence[int]:
+    """Une listas de posições crescentes e disjuntas, mantendo a ordem"""
+    if len(lists) == 1:
+        return lists[0]
+    return sorted(chain.from_iterable(lists))
+
+
+def _category_filter(cols: BookColumns, category: str) -> _Filter:
+    needle = category.lower()
+    codes = {code for code, name in enumerate(cols.categories) if needle in name.lower()}
+    postings = cols.postings("category_codes")
+    lists = [postings[c] for c in codes if c in postings]
+    category_codes = cols.category_codes
+    return _Filter(
+        "category", sum(len(p) for p in lists),
+        lambda: _merge(lists), lambda i: category_codes[i] in codes
+    )
+
+
+def category_rows(cols: BookColumns, category: str) -> Sequence[int]:
+    """Posições (crescentes) dos livros cuja categoria contém `category`"""
+    return _category_filter(cols, category).rows()
+
+
+def _price_filter(cols: BookColumns, low: float, high: float) -> _Filter:
+    sorted_prices, order = cols.price_index()
+    lo, hi = bisect_left(sorted_prices, low), bisect_right(sorted_prices, high)
+    prices = cols.prices
+    return _Filter(
+        "price", max(0, hi - lo),
+        lambda: sorted(order[lo:hi]), lambda i: low <= prices[i] <= high
+    )
+
+
+def _rating_filter(cols: BookColumns, low: int, high: int) -> _Filter:
+    lists = [rows for rating, rows in cols.postings("ratings").items() if low <= rating <= high]
+    ratings = cols.ratings
+    return _Filter(
+        "rating", sum(len(p) for p in lists),
+        lambda: _merge(lists), lambda i: low <= ratings[i] <= high
+    )
+
+
+def _availability_filter(cols: BookColumns, in_stock: bool) -> _Filter:
+    flag = int(in_stock)
+    rows = cols.postings("in_stock").get(flag, ())
+    column = cols.in_stock
+    return _Filter("availability", len(rows), lambda: rows, lambda i: column[i] == flag)
+
+
+def _index_filters(cols: BookColumns, q: BookQuery) -> List[_Filter]:
+    """Monta os filtros que têm índice, com a cardinalidade exata de cada um"""
+    filters = []
+    if q.category:
+        filters.append(_category_filter(cols, q.category))
+    if q.min_price is not None or q.max_price is not None:
+        filters.append(_price_filter(
+            cols,
+            float("-inf") if q.min_price is None else q.min_price,
+            float("inf") if q.max_price is None else q.max_price
+        ))
+    if q.min_rating is not None or q.max_rating is not None:
+        filters.append(_rating_filter(
+            cols,
+            0 if q.min_rating is None else q.min_rating,
+            5 if q.max_rating is None else q.max_rating
+        ))
+    if q.in_stock is not None:
+        filters.append(_availability_filter(cols, q.in_stock))
+    return filters
+
+
+def execute(
+    cols: BookColumns,
+    q: BookQuery,
+    skip: int = 0,
+    limit: int = 20,
+    facets: Sequence[str] = (),
+    fields: Optional[Sequence[str]] = None
+) -> Dict:
+    """
+    Executa uma consulta composta.
+
+    Args:
+        cols: Colunas do snapshot em uso
+        q: Critérios da consulta
+        skip: Número de registros para pular
+        limit: Número máximo de registros a retornar
+        facets: Facetas a calcular sobre o resultado (ver FACET_FIELDS)
+        fields: Campos dos livros da página (None = todos)
+
+    Returns:
+        Dicionário com `total` (exato), `books` (a página), `plan`
+        (passos executados, em ordem) e, se pedidas, `facets`
+    """
+    invalid = [f for f in facets if f not in FACET_FIELDS]
+    if invalid:
+        raise ValueError(f"Faceta inválida: {', '.join(invalid)}")
+
+    filters = sorted(_index_filters(cols, q), key=lambda f: f.estimate)
+    needle = q.title.lower().encode("utf-8") if q.title else None
+    plan = []
+
+    if filters and filters[0].estimate == 0:
+        plan.append(f"empty {filters[0].name}")
+        result = {"total": 0, "books": [], "plan": plan}
+        if facets:
+            result["facets"] = facet_counts(cols, [], facets)
+        return result
+
+    # Escolhe o ponto de partida: o índice mais seletivo, ou a varredura do
+    # título quando nenhum índice descarta a maior parte do catálogo
+    if needle is not None and (not filters or filters[0].estimate > cols.count * TITLE_SCAN_RATIO):
+        matches = cols.title_folded.find_rows(needle)
+        plan.append(f"scan title ({len(matches)} rows)")
+        needle = None
+    elif filters:
+        driver = filters.pop(0)
+        matches = driver.rows()
+        plan.append(f"index {driver.name} ({driver.estimate} rows)")
+    else:
+        matches = range(cols.count)
+        plan.append(f"all ({cols.count} rows)")
+
+    for f in filters:
+        test = f.test
+        matches = [i for i in matches if test(i)]
+        plan.append(f"probe {f.name} ({len(matches)} rows)")
+
+    if needle is not None:
+        matches = cols.title_folded.find_rows(needle, matches)
+        plan.append(f"probe title ({len(matches)} rows)")
+
+    total = len(matches)
+    page = _page(cols, matches, q, skip, limit)
+    if q.sort:
+        plan.append(f"sort {q.sort} {'desc' if q.descending else 'asc'}")
+    result = {"total": total, "books": cols.rows(page, fields), "plan": plan}
+    if facets:
+        result["facets"] = facet_counts(cols, matches, facets)
+        plan.append(f"facets {','.join(facets)} (bitmap)")
+    return result
+
+
+def _price_bitmaps(cols: BookColumns) -> List[int]:
+    """Bitmap de cada faixa de preço (na ordem de `price_bucket_labels`)"""
+    bitmaps = cols.derived.get("bitmaps:price")
+    if bitmaps is None:
+        sorted_prices, order = cols.price_index()
+        cuts = [0] + [bisect_left(sorted_prices, edge) for edge in PRICE_FACET_EDGES] + [cols.count]
+        bitmaps = [to_bitmap(order[lo:hi], cols.count) for lo, hi in zip(cuts, cuts[1:])]
+        cols.derived["bitmaps:price"] = bitmaps
+    return bitmaps
+
+
+def facet_counts(cols: BookColumns, matches: Sequence[int], facets: Sequence[str]) -> Dict[str, List[Dict]]:
+    """
+    Conta os livros de `matches` por valor de cada faceta.
+
+    O resultado é convertido em bitmap uma única vez; cada contagem é o
+    popcount de `resultado & bitmap do valor`. Categorias vêm ordenadas por
+    quantidade (só as presentes no resultado); rating, preço e
+    disponibilidade vêm na ordem natural, incluindo zeros.
+
+    Args:
+        cols: Colunas do snapshot em uso
+        matches: Posições do resultado
+        facets: Nomes das facetas (ver FACET_FIELDS)
+
+    Returns:
+        Faceta -> lista de {"value", "count"}
+    """
+    if isinstance(matches, range) and len(matches) == cols.count:
+        selected = (1 << cols.count) - 1
+    else:
+        selected = to_bitmap(matches, cols.count)
+
+    result = {}
+    for facet in facets:
+        if facet == "category":
+            counts = [
+                {"value": cols.categories[code], "count": (selected & bitmap).bit_count()}
+                for code, bitmap in cols.bitmaps("category_codes").items()
+            ]
+            counts = [c for c in counts if c["count"]]
+            counts.sort(key=lambda c: (-c["count"], c["value"]))
+        elif facet == "rating":
+            bitmaps = cols.bitmaps("ratings")
+            counts = [
+                {"value": str(rating), "count": (selected & bitmaps[rating]).bit_count() if rating in bitmaps else 0}
+                for rating in sorted(set(range(1, 6)) | set(bitmaps))
+            ]
+        elif facet == "price":
+            counts = [
+                {"value": label, "count": (selected & bitmap).bit_count()}
+                for label, bitmap in zip(price_bucket_labels(), _price_bitmaps(cols))
+            ]
+        else:  # availability
+            bitmaps = cols.bitmaps("in_stock")
+            counts = [
+                {"value": label, "count": (selected & bitmaps[flag]).bit_count() if flag in bitmaps else 0}
+                for flag, label in ((1, "In Stock"), (0, "Out of Stock"))
+            ]
+        result[facet] = counts
+    return result
+
+
+def _page(cols: BookColumns, matches: Sequence[int], q: BookQuery, skip: int, limit: int) -> Sequence[int]:
+    """Ordena (se pedido) e recorta a página; empates mantêm a ordem do catálogo"""
+    if not q.sort:
+        return matches[skip:skip + limit]
+
+    key = {
+        "id": cols.ids.__getitem__,
+        "title": cols.title.__getitem__,
+        "price": cols.prices.__getitem__,
+        "rating": cols.ratings.__getitem__,
+    }[q.sort]
+    wanted = skip + limit
+    if wanted < len(matches) // 8:
+        # Página pequena em um resultado grande: seleção parcial com heap
+        select = heapq.nlargest if q.descending else heapq.nsmallest
+        return select(wanted, matches, key=key)[skip:]
+    return sorted(matches, key=key, reverse=q.descending)[skip:wanted]
@@ -0,0 +1,205 @@
+"""
+Snapshot Colunar em Memória Compartilhada
+
+O processo pai (`api/server.py`) carrega o CSV uma única vez, serializa as
+colunas em um segmento de `multiprocessing.shared_memory` e publica o nome
+do segmento em um pequeno bloco de controle junto com um contador de
+geração. Os workers se anexam ao segmento e leem as colunas sem cópia.
+
+Recargas criam um novo segmento e incrementam a geração; cada worker
+verifica o contador periodicamente e troca de snapshot sozinho.
+
+Só as colunas são compartilhadas. Os índices derivados (postings, bitmaps,
+índice de preços, trigramas, autocomplete) são dicionários e listas de
+objetos Python, que não podem ser lidos de um buffer sem cópia: cada worker
+os constrói sobre o snapshot (autocomplete na carga, os demais no
+aquecimento ou na primeira consulta). O pai não atende requisições e não
+constrói nenhum deles.
+
+Layout do bloco de controle:
+    [geração: u64][nome do segmento: 64 bytes, UTF-8, preenchido com zeros]
+"""
+
+import os
+import struct
+import threading
+import time
+import weakref
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from api.storage.columnar import BookColumns
+from api.storage.ingest import load_columns
+
+_CONTROL = struct.Struct("<Q64s")
+
+# Intervalo (segundos) entre verificações da geração nos workers
+WATCH_INTERVAL = 1.0
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Abre um segmento existente sem assumir a posse dele.
+
+    Os workers são processos spawn do uvicorn e compartilham o
+    resource_tracker do pai, então o segmento é removido uma única vez,
+    pelo pai. No Python 3.13+ o registro no tracker é evitado de vez.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+class SnapshotPublisher:
+    """Lado do processo pai: gera e publica snapshots"""
+
+    def __init__(self, csv_path: Path):
+        """
+        Args:
+            csv_path: CSV de origem, relido a cada publicação
+        """
+        self.csv_path = Path(csv_path)
+        self.control = shared_memory.SharedMemory(create=True, size=_CONTROL.size)
+        self.generation = 0
+        self.segment = None  # type: Optional[shared_memory.SharedMemory]
+        self._lock = threading.Lock()
+
+    @property
+    def control_name(self) -> str:
+        return self.control.name
+
+    def publish(self) -> int:
+        """
+        Carrega o CSV, publica um novo snapshot e descarta o anterior.
+
+        Workers que ainda estão lendo o segmento antigo não são afetados:
+        o mapeamento continua válido até eles o fecharem.
+
+        Returns:
+            Número da nova geração
+        """
+        with self._lock:
+            # Só as colunas: os índices derivados são construídos nos workers
+            columns, stats = load_columns(self.csv_path)
+            if stats["rows_rejected"]:
+                print(f"⚠ {stats['rows_rejected']} linhas rejeitadas na carga do snapshot")
+            generation = self.generation + 1
+            segment = shared_memory.SharedMemory(
+                create=True,
+                size=max(columns.snapshot_size(), 1),
+                name=f"books_api_{os.getpid()}_{generation}"
+            )
+            columns.write_snapshot(segment.buf)
+
+            # Nome primeiro, geração depois: quem lê a geração nova já vê o nome novo
+            name = segment.name.encode("utf-8")
+            self.control.buf[8:8 + 64] = name.ljust(64, b"\0")
+            struct.pack_into("<Q", self.control.buf, 0, generation)
+
+            previous, self.segment, self.generation = self.segment, segment, generation
+            if previous is not None:
+                previous.close()
+                previous.unlink()
+
+            print(f"✓ Snapshot publicado: geração {generation}, {columns.count} livros, "
+                  f"{segment.size / 1024 / 1024:.1f} MB em memória compartilhada")
+            return generation
+
+    def close(self) -> None:
+        """Remove o segmento atual e o bloco de controle"""
+        with self._lock:
+            for shm in (self.segment, self.control):
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+            self.segment = None
+
+
+class SnapshotClient:
+    """Lado do worker: anexa ao snapshot atual e acompanha novas gerações"""
+
+    def __init__(self, control_name: str):
+        self.control = _attach(control_name)
+        self.generation = 0
+        self.segment = None  # type: Optional[shared_memory.SharedMemory]
+        self._columns = None  # type: Optional[BookColumns]
+        self._retired = []  # type: List[Tuple[shared_memory.SharedMemory, weakref.ref]]
+
+    def read_control(self) -> Tuple[int, str]:
+        """Lê (geração, nome do segmento) de forma consistente"""
+        while True:
+            generation, raw_name = _CONTROL.unpack_from(self.control.buf, 0)
+            again, _ = _CONTROL.unpack_from(self.control.buf, 0)
+            if generation == again:
+                return generation, raw_name.rstrip(b"\0").decode("utf-8")
+
+    def attach(self) -> BookColumns:
+        """
+        Anexa ao segmento publicado mais recente.
+
+        Returns:
+            Colunas lidas diretamente da memória compartilhada
+        """
+        for _ in range(50):
+            generation, name = self.read_control()
+            try:
+                segment = _attach(name)
+            except (OSError, ValueError):
+                time.sleep(0.1)  # Segmento trocado entre a leitura e a abertura
+                continue
+            columns = BookColumns.from_snapshot(segment.buf)
+            if self.segment is not None:
+                self._retired.append((self.segment, weakref.ref(self._columns)))
+            self.segment, self._columns, self.generation = segment, columns, generation
+            return columns
+        raise RuntimeError("Não foi possível anexar ao snapshot compartilhado")
+
+    def _close_retired(self) -> None:
+        """
+        Fecha segmentos antigos cujas colunas já foram coletadas, ou seja,
+        que não têm mais nenhuma consulta em andamento.
+        """
+        still_open = []
+        for segment, columns_ref in self._retired:
+            if columns_ref() is not None:
+                still_open.append((segment, columns_ref))
+                continue
+            try:
+                segment.close()
+            except BufferError:
+                still_open.append((segment, columns_ref))
+        self._retired = still_open
+
+    def watch(self, database, interval: float = WATCH_INTERVAL) -> None:
+        """Laço do worker: troca de snapshot quando a geração muda"""
+        while True:
+            time.sleep(interval)
+            try:
+                if self.read_control()[0] != self.generation:
+                    database.use_columns(self.attach())
+                    print(f"✓ Worker {os.getpid()}: snapshot atualizado para a geração {self.generation}")
+                self._close_retired()
+            except Exception as e:
+                print(f"❌ Erro ao atualizar snapshot compartilhado: {e}")
+
+
+def attach_database(control_name: str, csv_path: Path):
+    """
+    Cria um BooksDatabase sobre o snapshot compartilhado e inicia a thread
+    que acompanha novas gerações.
+
+    Args:
+        control_name: Nome do bloco de controle publicado pelo processo pai
+        csv_path: Caminho do CSV de origem (apenas informativo)
+    """
+    from api.database import BooksDatabase
+
+    client = SnapshotClient(control_name)
+    database = BooksDatabase(csv_path, columns=client.attach())
+    database.snapshot_client = client
+    print(f"✓ Worker {os.getpid()}: {database.get_total_count()} livros via memória compartilhada "
+          f"(geração {client.generation})")
+    threading.Thread(target=client.watch, args=(database,), daemon=True, name="snapshot-watch").start()
+    return database
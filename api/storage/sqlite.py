@@ -0,0 +1,660 @@
+"""
+Backend SQLite
+
+Alternativa ao CSV em memória: os dados ficam em um arquivo SQLite (modo
+WAL) com índices em id, categoria, preço e rating, e uma tabela FTS5
+(tokenizer trigram) para a busca por título. Cada worker abre apenas
+conexões somente-leitura, então N workers compartilham o mesmo page cache
+do sistema operacional e o catálogo pode ser maior que a RAM.
+
+O autocomplete e a busca aproximada também são respondidos pelo banco,
+sem nada proporcional ao catálogo em memória. Na geração, os mesmos
+índices do backend colunar viram tabelas (`SEARCH_SCHEMA`): os nós da trie
+de prefixos (`suggest_nodes`, uma leitura por tecla), as palavras de cada
+título com a colocação do livro no ranking (`title_words`, para consultas
+de várias palavras) e os trigramas normalizados dos títulos
+(`title_trigrams`). Os resultados são os mesmos do backend colunar; as
+completions por nó são as de `SUGGEST_TOP_N` no momento da geração. Bancos
+gerados antes dessas tabelas precisam ser gerados de novo.
+
+Gerar o banco a partir do CSV:
+    python -m api.storage.sqlite data/books.csv data/books.db
+
+Depois, basta apontar `DATA_PATH=data/books.db`.
+"""
+
+import csv
+import json
+import queue
+import sqlite3
+import sys
+import threading
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from api.config import DB_EXECUTOR_WORKERS, FUZZY_MIN_SCORE, SUGGEST_TOP_N
+from api.monitoring.profiler import phase
+from api.storage.base import StorageBackend, BOOK_FIELDS, normalize_row
+from api.storage.fuzzy import normalize, rank, shared_needed, trigrams
+from api.storage.ingest import out_of_range, utf8_lines
+from api.storage import suggest as suggest_index
+from api.storage.suggest import build_from_rows
+from api.storage.query import FACET_FIELDS, PRICE_FACET_EDGES, SORT_FIELDS, price_bucket_labels
+
+# Conexões somente-leitura mantidas abertas por worker (uma por thread de consulta)
+POOL_SIZE = DB_EXECUTOR_WORKERS
+
+# Tamanho do mmap por conexão (leitura direto do page cache do SO)
+MMAP_SIZE = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE books (
+    seq INTEGER PRIMARY KEY,          -- ordem original do CSV
+    id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    price REAL NOT NULL,
+    rating INTEGER NOT NULL,
+    availability TEXT NOT NULL,
+    category TEXT NOT NULL,
+    image_url TEXT NOT NULL,
+    book_url TEXT NOT NULL
+);
+CREATE INDEX idx_books_id ON books (id);
+CREATE INDEX idx_books_category ON books (category);
+CREATE INDEX idx_books_price ON books (price);
+CREATE INDEX idx_books_rating_title ON books (rating, title);
+"""
+
+# Autocomplete e busca aproximada (ver `_write_search_tables`)
+SEARCH_SCHEMA = """
+CREATE TABLE suggest_nodes (
+    prefix TEXT PRIMARY KEY,
+    categories TEXT NOT NULL,         -- nomes, JSON, já ranqueados
+    seqs BLOB NOT NULL                -- array('q') de seq, já ranqueados
+) WITHOUT ROWID;
+CREATE TABLE title_words (
+    word TEXT NOT NULL,               -- palavra normalizada do título
+    seq INTEGER NOT NULL,
+    rank INTEGER NOT NULL,            -- colocação do livro no ranking por rating
+    PRIMARY KEY (word, seq)
+) WITHOUT ROWID;
+CREATE TABLE book_ranks (
+    rank INTEGER PRIMARY KEY,
+    seq INTEGER NOT NULL
+);
+CREATE TABLE title_trigrams (
+    gram TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (gram, seq)
+) WITHOUT ROWID;
+"""
+
+SEARCH_TABLES = ("suggest_nodes", "title_words", "book_ranks", "title_trigrams")
+
+_COLUMNS = ", ".join(BOOK_FIELDS)
+
+
+def build_sqlite_database(csv_path: Path, db_path: Path) -> int:
+    """
+    Gera o banco SQLite a partir do CSV (substitui o arquivo se existir).
+
+    Args:
+        csv_path: CSV no formato de `data/books.csv`
+        db_path: Caminho do banco a ser criado
+
+    Returns:
+        Número de livros gravados
+    """
+    db_path = Path(db_path)
+    tmp_path = db_path.with_suffix(db_path.suffix + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.executescript(SCHEMA + SEARCH_SCHEMA)
+        try:
+            conn.execute("CREATE VIRTUAL TABLE books_fts USING fts5(title, content='books', content_rowid='seq', tokenize='trigram')")
+            has_fts = True
+        except sqlite3.OperationalError:
+            has_fts = False  # SQLite sem FTS5/trigram: a busca usa LIKE
+
+        with Path(csv_path).open('rb') as f:
+            rows = []
+            for row in csv.DictReader(utf8_lines(f)):
+                try:
+                    row = normalize_row(row)
+                except Exception:
+                    continue  # Ignora linhas malformadas (mesma regra do backend em memória)
+                if out_of_range(row):
+                    continue
+                rows.append(tuple(row.get(field, '') for field in BOOK_FIELDS))
+
+        conn.executemany(f"INSERT INTO books ({_COLUMNS}) VALUES ({', '.join('?' * len(BOOK_FIELDS))})", rows)
+        _write_search_tables(conn, rows)
+        if has_fts:
+            conn.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+
+    tmp_path.replace(db_path)
+    return len(rows)
+
+
+def _write_search_tables(conn: sqlite3.Connection, rows: List[Tuple]) -> None:
+    """
+    Grava os índices do autocomplete e da busca aproximada.
+
+    São os mesmos do backend colunar (`SuggestIndex` e trigramas de
+    `api/storage/fuzzy.py`), construídos uma vez, na geração. A posição i
+    do catálogo é o seq i + 1 (ordem de inserção). As linhas entram na
+    ordem da chave primária e o índice secundário é criado no fim, o que
+    evita reorganizar as árvores a cada inserção.
+    """
+    title, rating, category = (BOOK_FIELDS.index(f) for f in ("title", "rating", "category"))
+    index = build_from_rows(((r[title], r[rating], r[category]) for r in rows), SUGGEST_TOP_N)
+
+    conn.executemany(
+        "INSERT INTO suggest_nodes (prefix, categories, seqs) VALUES (?, ?, ?)",
+        ((prefix, json.dumps([index.categories[c] for c in codes]), array("q", (p + 1 for p in positions)).tobytes())
+         for prefix, (codes, positions) in sorted(index.nodes.items()))
+    )
+    conn.executemany(
+        "INSERT INTO title_words (word, seq, rank) VALUES (?, ?, ?)",
+        ((word, pos + 1, index.rank[pos])
+         for word, postings in zip(index.vocabulary, index.postings) for pos in postings)
+    )
+    conn.execute("CREATE INDEX idx_title_words_seq ON title_words (seq, word)")
+    conn.executemany("INSERT INTO book_ranks (rank, seq) VALUES (?, ?)",
+                     ((place, pos + 1) for place, pos in enumerate(index.order)))
+    conn.executemany(
+        "INSERT INTO title_trigrams (gram, seq) VALUES (?, ?)",
+        sorted((gram, pos + 1) for pos, r in enumerate(rows) for gram in trigrams(normalize(r[title])))
+    )
+
+
+class _ConnectionPool:
+    """Pool simples de conexões somente-leitura"""
+
+    def __init__(self, db_path: Path, size: int = POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue()  # type: queue.LifoQueue
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Empresta uma conexão (cria sob demanda até `size`, depois espera)"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            conn = self._connect() if create else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+class SQLiteBackend(StorageBackend):
+    """Backend de dados sobre um arquivo SQLite somente-leitura"""
+
+    def __init__(self, db_path: Path, pool_size: int = POOL_SIZE, lazy: bool = False):
+        """
+        Inicializa o backend.
+
+        Args:
+            db_path: Caminho do banco gerado por `build_sqlite_database`
+            pool_size: Número máximo de conexões abertas
+            lazy: Adia a abertura do banco para `ensure_loaded`
+        """
+        self.db_path = Path(db_path)
+        self.pool = _ConnectionPool(self.db_path, pool_size)
+        self.total = 0
+        self.categories = []  # type: List[str]
+        self.has_fts = False
+        self.has_search = False
+        # (categoria, palavras), das maiores para as menores (autocomplete de várias palavras)
+        self._category_words = []  # type: List[Tuple[str, List[str]]]
+        if lazy:
+            self.defer_load()
+        else:
+            self.load_data()
+
+    def load_data(self) -> bool:
+        """
+        Abre o banco e lê os metadados (total e categorias).
+
+        Returns:
+            True se abriu com sucesso, False caso contrário
+        """
+        try:
+            if not self.db_path.exists():
+                print(f"⚠ Banco SQLite não encontrado: {self.db_path}")
+                return False
+
+            self.pool.close()
+            with self.pool.connection() as conn:
+                self.total = conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+                self.categories = [
+                    r[0] for r in conn.execute("SELECT DISTINCT category FROM books WHERE category != '' ORDER BY category")
+                ]
+                self.has_fts = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'books_fts'"
+                ).fetchone() is not None
+
+                self.has_search = conn.execute(
+                    f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({', '.join('?' * len(SEARCH_TABLES))})",
+                    SEARCH_TABLES
+                ).fetchone()[0] == len(SEARCH_TABLES)
+                sizes = conn.execute("SELECT category, COUNT(*) FROM books GROUP BY category").fetchall()
+                self._category_words = [
+                    (name, normalize(name).split()) for name, _ in sorted(sizes, key=lambda r: (-r[1], r[0]))
+                ]
+
+            if not self.has_search:
+                print("⚠ Banco SQLite sem as tabelas de autocomplete e busca aproximada: "
+                      "gere-o de novo com python -m api.storage.sqlite")
+            self.data_version += 1
+            print(f"✓ Dados carregados (SQLite): {self.total} livros")
+            return True
+
+        except Exception as e:
+            print(f"❌ Erro ao abrir banco SQLite: {e}")
+            return False
+
+    def _query(self, sql: str, params=()) -> List[Dict]:
+        with self.pool.connection() as conn:
+            return [dict(r) for r in conn.execute(sql, params)]
+
+    def get_total_count(self) -> int:
+        return self.total
+
+    def get_index_sizes(self) -> Dict[str, int]:
+        return {"categories": len(self.categories)}
+
+    def get_all_books(self, skip: int = 0, limit: int = 20, fields: Optional[Sequence[str]] = None) -> List[Dict]:
+        with phase("lookup"):
+            return self._query(f"SELECT {_select(fields)} FROM books ORDER BY seq LIMIT ? OFFSET ?", (limit, skip))
+
+    def get_book_by_id(self, book_id: int) -> Optional[Dict]:
+        with phase("lookup"):
+            rows = self._query(f"SELECT {_COLUMNS} FROM books WHERE id = ? ORDER BY seq LIMIT 1", (book_id,))
+            return rows[0] if rows else None
+
+    def _where(self, title: Optional[str], category: Optional[str]):
+        """
+        Monta as condições de título/categoria.
+
+        Returns:
+            (condições, parâmetros), ou None se a categoria não casa com nenhuma
+        """
+        where = []
+        params = []  # type: List
+
+        if title:
+            if self.has_fts and len(title) >= 3:
+                # Trigram FTS: casa substrings sem varrer a tabela
+                where.append("seq IN (SELECT rowid FROM books_fts WHERE books_fts MATCH ?)")
+                params.append('"' + title.replace('"', '""') + '"')
+            else:
+                where.append("title LIKE ? ESCAPE '\\'")
+                params.append("%" + _escape_like(title) + "%")
+
+        if category:
+            # Resolve o substring contra a lista (pequena) de categorias e usa o índice
+            needle = category.lower()
+            matches = [c for c in self.categories if needle in c.lower()]
+            if not matches:
+                return None
+            where.append(f"category IN ({', '.join('?' * len(matches))})")
+            params.extend(matches)
+
+        return where, params
+
+    def search_books(
+        self,
+        title: Optional[str] = None,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Dict]:
+        with phase("filter"):
+            conditions = self._where(title, category)
+            if conditions is None:
+                return []
+            where, params = conditions
+
+            sql = f"SELECT {_COLUMNS} FROM books"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            sql += " ORDER BY seq LIMIT ? OFFSET ?"
+            return self._query(sql, params + [limit, skip])
+
+    def query_books(
+        self,
+        title: Optional[str] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        in_stock: Optional[bool] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        skip: int = 0,
+        limit: int = 20,
+        facets: Sequence[str] = (),
+        fields: Optional[Sequence[str]] = None
+    ) -> Dict:
+        if sort is not None and sort not in SORT_FIELDS:
+            raise ValueError(f"Campo de ordenação inválido: {sort}")
+        invalid = [f for f in facets if f not in FACET_FIELDS]
+        if invalid:
+            raise ValueError(f"Faceta inválida: {', '.join(invalid)}")
+
+        with phase("filter"):
+            conditions = self._where(title, category)
+            if conditions is None:
+                result = {"total": 0, "books": [], "plan": ["empty category"]}
+                if facets:
+                    result["facets"] = self._facet_counts(None, "", [], facets)
+                return result
+            where, params = conditions
+
+            # O planejador do SQLite escolhe o índice mais seletivo (estatísticas do ANALYZE)
+            for column, op, value in (("price", ">=", min_price), ("price", "<=", max_price),
+                                      ("rating", ">=", min_rating), ("rating", "<=", max_rating)):
+                if value is not None:
+                    where.append(f"{column} {op} ?")
+                    params.append(value)
+            if in_stock is not None:
+                where.append("availability = ?")
+                params.append("In Stock" if in_stock else "Out of Stock")
+
+            clause = " WHERE " + " AND ".join(where) if where else ""
+            order = f"{sort} {'DESC' if descending else 'ASC'}, seq" if sort else "seq"
+            sql = f"SELECT {_select(fields)} FROM books{clause} ORDER BY {order} LIMIT ? OFFSET ?"
+
+            with self.pool.connection() as conn:
+                total = conn.execute(f"SELECT COUNT(*) FROM books{clause}", params).fetchone()[0]
+                books = [dict(r) for r in conn.execute(sql, params + [limit, skip])]
+                plan = [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params + [limit, skip])]
+                result = {"total": total, "books": books, "plan": plan}
+                if facets:
+                    result["facets"] = self._facet_counts(conn, clause, params, facets)
+
+        return result
+
+    def fuzzy_search_books(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Dict:
+        with phase("filter"):
+            normalized = normalize(query)
+            grams = sorted(trigrams(normalized))
+            if not self.has_search or not grams:
+                return {"total": 0, "books": []}
+            where = [f"t.gram IN ({', '.join('?' * len(grams))})"]
+            params = list(grams)  # type: List
+            if category:
+                needle = category.lower()
+                matches = [c for c in self.categories if needle in c.lower()]
+                if not matches:
+                    return {"total": 0, "books": []}
+                where.append(f"b.category IN ({', '.join('?' * len(matches))})")
+                params.extend(matches)
+
+            # Candidatos: mesma regra de `TrigramIndex.candidates`, contada pelo índice (gram, seq)
+            with self.pool.connection() as conn:
+                candidates = conn.execute(
+                    "SELECT t.seq, COUNT(*) AS shared, b.title FROM title_trigrams t JOIN books b ON b.seq = t.seq "
+                    f"WHERE {' AND '.join(where)} GROUP BY t.seq HAVING shared >= ?",
+                    params + [shared_needed(len(grams))]
+                ).fetchall()
+            titles = {seq: title for seq, _, title in candidates}
+            ranked = rank(normalized, ((seq, shared) for seq, shared, _ in candidates), titles.__getitem__, FUZZY_MIN_SCORE)
+            page = ranked[skip:skip + limit]
+            found = {}
+            if page:
+                found = {
+                    r["seq"]: r for r in self._query(
+                        f"SELECT seq, {_COLUMNS} FROM books WHERE seq IN ({', '.join('?' * len(page))})",
+                        [seq for seq, _ in page]
+                    )
+                }
+
+        books = []
+        for seq, score in page:
+            book = {field: found[seq][field] for field in BOOK_FIELDS}
+            book["score"] = score
+            books.append(book)
+        return {"total": len(ranked), "books": books}
+
+    def suggest(self, query: str, limit: int = SUGGEST_TOP_N) -> Dict:
+        """Mesmas regras de `SuggestIndex.lookup`, sobre as tabelas do banco"""
+        words = normalize(query).split()
+        if not self.has_search or not words:
+            return {"categories": [], "titles": []}
+        with self.pool.connection() as conn:
+            node = conn.execute("SELECT categories, seqs FROM suggest_nodes WHERE prefix = ?", (words[-1],)).fetchone()
+            if len(words) == 1:
+                categories = json.loads(node["categories"])[:limit] if node else []
+                seqs = list(_seqs(node["seqs"]))[:limit] if node else []
+            else:
+                # Várias palavras: cada uma precisa casar (como prefixo) com
+                # alguma palavra do título ou da categoria
+                categories = [
+                    name for name, category_words in self._category_words
+                    if all(any(cw.startswith(w) for cw in category_words) for w in words)
+                ][:limit]
+                seqs = self._rows_with_words(conn, words, limit) if node and node["seqs"] else []
+            found = {}
+            if seqs:
+                found = {
+                    r["seq"]: r for r in conn.execute(
+                        f"SELECT seq, id, title, rating FROM books WHERE seq IN ({', '.join('?' * len(seqs))})", seqs
+                    )
+                }
+        return {
+            "categories": categories,
+            "titles": [{"id": found[s]["id"], "title": found[s]["title"], "rating": found[s]["rating"]} for s in seqs],
+        }
+
+    @staticmethod
+    def _rows_with_words(conn: sqlite3.Connection, words: Sequence[str], limit: int) -> List[int]:
+        """
+        Os `limit` melhores livros com todos os prefixos, como em
+        `SuggestIndex._rows_with_words`: parte do prefixo mais seletivo ou,
+        se todos forem comuns, percorre no máximo `SCAN_LIMIT` livros do ranking.
+        """
+        ranges = []
+        for word in words:
+            end = word[:-1] + chr(ord(word[-1]) + 1)
+            covered = conn.execute(
+                "SELECT COUNT(*) FROM title_words WHERE word >= ? AND word < ?", (word, end)
+            ).fetchone()[0]
+            ranges.append((covered, word, end))
+        ranges.sort(key=lambda r: r[0])
+
+        def has_words(alias: str, selected) -> Tuple[str, List[str]]:
+            sql = "".join(
+                f" AND EXISTS (SELECT 1 FROM title_words o WHERE o.seq = {alias}.seq AND o.word >= ? AND o.word < ?)"
+                for _ in selected
+            )
+            return sql, [bound for _, word, end in selected for bound in (word, end)]
+
+        covered, word, end = ranges[0]
+        if covered <= suggest_index.SCAN_LIMIT:
+            # Prefixo seletivo: testa só os livros dele
+            exists, params = has_words("t", ranges[1:])
+            sql = ("SELECT DISTINCT t.seq, t.rank FROM title_words t WHERE t.word >= ? AND t.word < ?"
+                   f"{exists} ORDER BY t.rank LIMIT ?")
+            return [r[0] for r in conn.execute(sql, [word, end] + params + [limit])]
+
+        # Todos os prefixos são comuns: percorre o ranking até completar a página
+        exists, params = has_words("r", ranges)
+        sql = f"SELECT r.seq FROM book_ranks r WHERE r.rank < ?{exists} ORDER BY r.rank LIMIT ?"
+        return [r[0] for r in conn.execute(sql, [suggest_index.SCAN_LIMIT] + params + [limit])]
+
+    def _facet_counts(self, conn, clause, params: List, facets: Sequence[str]) -> Dict[str, List[Dict]]:
+        """
+        Conta o resultado por faceta com um GROUP BY por faceta (mesmo WHERE).
+
+        Segue o formato do backend colunar: categorias por quantidade, só as
+        presentes; rating, preço e disponibilidade na ordem natural, com zeros.
+        """
+        labels = price_bucket_labels()
+        bucket_sql = "CASE " + " ".join(
+            f"WHEN price < {edge} THEN {i}" for i, edge in enumerate(PRICE_FACET_EDGES)
+        ) + f" ELSE {len(PRICE_FACET_EDGES)} END"
+        expressions = {
+            "category": "category",
+            "rating": "rating",
+            "price": bucket_sql,
+            "availability": "availability",
+        }
+
+        result = {}
+        for facet in facets:
+            counts = {}
+            if conn is not None:
+                counts = dict(conn.execute(
+                    f"SELECT {expressions[facet]} AS value, COUNT(*) FROM books{clause} GROUP BY value", params
+                ).fetchall())
+            if facet == "category":
+                values = sorted(({"value": v, "count": c} for v, c in counts.items()),
+                                key=lambda x: (-x["count"], x["value"]))
+            elif facet == "rating":
+                values = [{"value": str(r), "count": counts.get(r, 0)} for r in sorted(set(range(1, 6)) | set(counts))]
+            elif facet == "price":
+                values = [{"value": label, "count": counts.get(i, 0)} for i, label in enumerate(labels)]
+            else:  # availability
+                values = [{"value": v, "count": counts.get(v, 0)} for v in ("In Stock", "Out of Stock")]
+            result[facet] = values
+        return result
+
+    def get_all_categories(self) -> List[str]:
+        return list(self.categories)
+
+    def get_stats_overview(self) -> Dict:
+        if not self.is_loaded():
+            return {}
+
+        with phase("aggregate"):
+            with self.pool.connection() as conn:
+                total, price_sum, min_price, max_price, rating_sum, in_stock = conn.execute(
+                    "SELECT COUNT(*), SUM(price), MIN(price), MAX(price), SUM(rating), "
+                    "SUM(availability = 'In Stock') FROM books"
+                ).fetchone()
+
+        return {
+            "total_books": total,
+            "total_categories": len(self.categories),
+            "average_price": round(price_sum / total, 2) if total else 0.0,
+            "min_price": round(min_price, 2) if total else 0.0,
+            "max_price": round(max_price, 2) if total else 0.0,
+            "average_rating": round(rating_sum / total, 2) if total else 0.0,
+            "in_stock_count": in_stock or 0,
+            "out_of_stock_count": total - (in_stock or 0)
+        }
+
+    def get_stats_by_category(self) -> List[Dict]:
+        with phase("aggregate"):
+            rows = self._query(
+                "SELECT category, COUNT(*) AS count, SUM(price) AS price_sum, MIN(price) AS min_price, "
+                "MAX(price) AS max_price, SUM(rating) AS rating_sum FROM books "
+                "GROUP BY category ORDER BY count DESC, MIN(seq)"
+            )
+
+        return [
+            {
+                'category': r['category'],
+                'count': r['count'],
+                'avg_price': round(r['price_sum'] / r['count'], 2),
+                'min_price': round(r['min_price'], 2),
+                'max_price': round(r['max_price'], 2),
+                'avg_rating': round(r['rating_sum'] / r['count'], 2),
+            }
+            for r in rows
+        ]
+
+    def get_top_rated_books(self, limit: int = 10, fields: Optional[Sequence[str]] = None) -> List[Dict]:
+        with phase("filter"):
+            return self._query(
+                f"SELECT {_select(fields)} FROM books WHERE rating = 5 ORDER BY title, seq LIMIT ?", (limit,)
+            )
+
+    def get_books_by_price_range(
+        self,
+        min_price: float,
+        max_price: float,
+        skip: int = 0,
+        limit: int = 20,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Dict]:
+        with phase("filter"):
+            return self._query(
+                f"SELECT {_select(fields)} FROM books WHERE price BETWEEN ? AND ? ORDER BY seq LIMIT ? OFFSET ?",
+                (min_price, max_price, limit, skip)
+            )
+
+
+def _seqs(blob: bytes) -> array:
+    """seqs gravados em `suggest_nodes` (array('q') serializado)"""
+    seqs = array("q")
+    seqs.frombytes(blob)
+    return seqs
+
+
+def _select(fields: Optional[Sequence[str]]) -> str:
+    """Lista de colunas do SELECT (só campos conhecidos, nunca texto do cliente)"""
+    if fields is None:
+        return _COLUMNS
+    invalid = [f for f in fields if f not in BOOK_FIELDS]
+    if invalid:
+        raise ValueError(f"Campo inválido: {', '.join(invalid)}")
+    return ", ".join(fields)
+
+
+def _escape_like(value: str) -> str:
+    """Escapa curingas do LIKE"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def main():
+    """Gera o banco SQLite a partir do CSV"""
+    csv_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/books.csv")
+    db_path = Path(sys.argv[2]) if len(sys.argv) > 2 else csv_path.with_suffix(".db")
+    total = build_sqlite_database(csv_path, db_path)
+    print(f"✓ Banco SQLite gerado em: {db_path} ({total} livros)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Autocomplete (typeahead) de Títulos e Categorias
+
+Trie achatada: cada prefixo de cada palavra normalizada dos títulos e dos
+nomes de categoria é uma chave de dicionário, e o nó guarda as completions
+já ranqueadas. Uma tecla digitada vira uma única consulta O(1) ao
+dicionário, sem ler nenhum registro.
+
+- Títulos: os `top_n` melhores por rating (empate: título, depois ordem
+  do catálogo) entre os livros que têm alguma palavra com o prefixo.
+- Categorias: as `top_n` com mais livros entre as que têm alguma palavra
+  com o prefixo.
+
+Consultas com várias palavras ("harry po") exigem que cada palavra case
+como prefixo de alguma palavra do título. O vocabulário ordenado dá, por
+busca binária, o intervalo de palavras de cada prefixo e quantas posições
+ele cobre; as posições do prefixo mais seletivo são testadas contra os
+demais pelas palavras de cada título. Se até o mais seletivo cobre mais de
+`SCAN_LIMIT` posições, os livros são percorridos em ordem de ranking até
+achar `limit` completions (no máximo `SCAN_LIMIT` livros): cada tecla custa
+O(SCAN_LIMIT), não O(N).
+"""
+
+import heapq
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from api.storage.fuzzy import normalize
+
+_EMPTY_NODE = ((), ())  # type: Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+# Máximo de livros examinados por consulta de várias palavras
+SCAN_LIMIT = 4096
+
+
+class SuggestIndex:
+    """Prefixo -> (códigos de categoria, posições de livros) já ranqueados"""
+
+    def __init__(self, nodes: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]],
+                 vocabulary: List[str], postings: List[array], rank: array, order: array,
+                 row_words: array, row_offsets: array, categories: List[str], category_order: List[int]):
+        self.nodes = nodes
+        self.vocabulary = vocabulary  # palavras dos títulos, ordenadas
+        self.postings = postings  # posições (crescentes) de cada palavra do vocabulário
+        # covered[i] = posições nas listas das palavras vocabulary[:i]
+        self.covered = array("q", [0])
+        for rows in postings:
+            self.covered.append(self.covered[-1] + len(rows))
+        self.rank = rank  # posição -> colocação no ranking por rating
+        self.order = order  # colocação -> posição (inverso de rank)
+        # Palavras (índices no vocabulário, crescentes) do título da posição i:
+        # row_words[row_offsets[i]:row_offsets[i + 1]]
+        self.row_words = row_words
+        self.row_offsets = row_offsets
+        self.categories = categories  # código -> nome
+        self.category_words = [normalize(name).split() for name in categories]
+        self.category_order = category_order  # códigos de categoria, das maiores para as menores
+
+    @classmethod
+    def build(
+        cls,
+        titles: Sequence[str],
+        ratings: Sequence[int],
+        categories: Sequence[str],
+        category_sizes: Sequence[int],
+        top_n: int
+    ) -> "SuggestIndex":
+        """
+        Args:
+            titles: Título de cada posição
+            ratings: Rating de cada posição
+            categories: Nome de cada código de categoria
+            category_sizes: Número de livros de cada código de categoria
+            top_n: Completions guardadas por nó
+        """
+        count = len(titles)
+        order = sorted(range(count), key=lambda i: (-ratings[i], titles[i], i))
+        rank = array("I", bytes(4 * count))
+        for place, pos in enumerate(order):
+            rank[pos] = place
+
+        words = {}  # type: Dict[str, array]
+        for pos in range(count):
+            for word in set(normalize(titles[pos]).split()):
+                rows = words.get(word)
+                if rows is None:
+                    rows = words[word] = array("I")
+                rows.append(pos)
+
+        # Candidatos de cada nó: o top-N de cada palavra sob o prefixo
+        pending = {}  # type: Dict[str, List[int]]
+        for word, rows in words.items():
+            best = heapq.nsmallest(top_n, rows, key=rank.__getitem__)
+            for length in range(1, len(word) + 1):
+                pending.setdefault(word[:length], []).extend(best)
+
+        category_order = sorted(range(len(categories)), key=lambda c: (-category_sizes[c], categories[c]))
+        category_words = [normalize(name).split() for name in categories]
+        category_pending = {}  # type: Dict[str, List[int]]
+        for code in category_order:
+            for prefix in {w[:n] for w in category_words[code] for n in range(1, len(w) + 1)}:
+                category_pending.setdefault(prefix, []).append(code)
+
+        nodes = {}
+        for prefix in pending.keys() | category_pending.keys():
+            rows = heapq.nsmallest(top_n, set(pending.get(prefix, ())), key=rank.__getitem__)
+            codes = category_pending.get(prefix, [])[:top_n]
+            nodes[prefix] = (tuple(codes), tuple(rows))
+
+        vocabulary = sorted(words)
+        per_row = [[] for _ in range(count)]  # type: List[List[int]]
+        for word_id, word in enumerate(vocabulary):
+            for pos in words[word]:
+                per_row[pos].append(word_id)
+        row_words, row_offsets = array("I"), array("I", [0])
+        for ids in per_row:
+            row_words.extend(ids)
+            row_offsets.append(len(row_words))
+
+        return cls(nodes, vocabulary, [words[w] for w in vocabulary], rank, array("I", order),
+                   row_words, row_offsets, list(categories), category_order)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def _word_range(self, prefix: str) -> Tuple[int, int]:
+        """Intervalo [início, fim) do vocabulário com as palavras começando por `prefix`"""
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_left(self.vocabulary, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+        return start, end
+
+    def _has_words(self, pos: int, ranges: Sequence[Tuple[int, int]]) -> bool:
+        """Se o título da posição tem uma palavra em cada intervalo do vocabulário"""
+        words, lo, hi = self.row_words, self.row_offsets[pos], self.row_offsets[pos + 1]
+        for start, end in ranges:
+            j = bisect_left(words, start, lo, hi)
+            if j == hi or words[j] >= end:
+                return False
+        return True
+
+    def _rows_with_words(self, words: Sequence[str], limit: int) -> Sequence[int]:
+        """As `limit` melhores posições com todos os prefixos (no máximo SCAN_LIMIT livros examinados)"""
+        ranges = sorted((self._word_range(w) for w in words), key=lambda r: self.covered[r[1]] - self.covered[r[0]])
+        start, end = ranges[0]
+        if self.covered[end] - self.covered[start] <= SCAN_LIMIT:
+            # Prefixo seletivo: testa só as posições dele
+            rows = {pos for postings in self.postings[start:end] for pos in postings}
+            found = [pos for pos in rows if self._has_words(pos, ranges[1:])]
+            return heapq.nsmallest(limit, found, key=self.rank.__getitem__)
+
+        # Todos os prefixos são comuns: percorre o ranking até completar a página
+        found = []
+        for pos in self.order[:SCAN_LIMIT]:
+            if self._has_words(pos, ranges):
+                found.append(pos)
+                if len(found) == limit:
+                    break
+        return found
+
+    def lookup(self, query: str, limit: int) -> Tuple[Sequence[int], Sequence[int]]:
+        """
+        Completions para o texto digitado.
+
+        Returns:
+            (códigos de categoria, posições de livros), já ranqueados
+        """
+        words = normalize(query).split()
+        if not words:
+            return (), ()
+        codes, rows = self.nodes.get(words[-1], _EMPTY_NODE)
+        if len(words) == 1:
+            return codes[:limit], rows[:limit]
+
+        # Várias palavras: cada uma precisa casar (como prefixo) com alguma
+        # palavra do título ou da categoria
+        codes = [
+            code for code in self.category_order
+            if all(any(cw.startswith(w) for cw in self.category_words[code]) for w in words)
+        ][:limit]
+        if not rows:
+            return codes, ()
+        return codes, self._rows_with_words(words, limit)
+
+
+def build_from_rows(rows: Iterable[Tuple[str, int, str]], top_n: int) -> SuggestIndex:
+    """
+    Constrói o índice a partir de (título, rating, categoria) em ordem de posição.
+    """
+    titles, ratings = [], []
+    category_index = {}  # type: Dict[str, int]
+    sizes = []  # type: List[int]
+    for title, rating, category in rows:
+        code = category_index.get(category)
+        if code is None:
+            code = category_index[category] = len(category_index)
+            sizes.append(0)
+        sizes[code] += 1
+        titles.append(title)
+        ratings.append(rating)
+    return SuggestIndex.build(titles, ratings, list(category_index), sizes, top_n)
@@ -0,0 +1,458 @@
+"""
+Histórico de Preços (série temporal)
+
+Cada scraping acrescenta um bloco ao arquivo binário `points.bin`
+(append-only), em formato colunar:
+
+    [magic "BLK1"][timestamp: i64][n: u32]
+    [série: u32 × n, crescente][preço em centavos: u32 × n][em estoque: u8 × n]
+
+São 9 bytes por livro por scraping. A série de um livro é encontrada em
+cada bloco por busca binária, sem ler os demais livros.
+
+O mapeamento `book_url` -> série e os agregados pré-calculados (rollups
+diários e semanais, por livro e por categoria) ficam em `history.db`
+(SQLite), atualizados na mesma gravação. Consultas de períodos longos leem
+só os rollups.
+
+O bloco é gravado (com fsync) antes do commit no SQLite, e o commit
+registra até onde `points.bin` é válido (`points_file`). Uma queda entre
+os dois deixa no fim do arquivo um bloco não confirmado, cujas séries
+não existem no banco: os leitores o ignoram e a próxima gravação o
+sobrescreve, assim como um bloco truncado no meio da escrita.
+
+Registrar o CSV atual como um ponto do histórico:
+    python -m api.storage.timeseries data/books.csv
+"""
+
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from api.config import PRICE_HISTORY_DIR
+
+_BLOCK = struct.Struct("<4sqI")
+_MAGIC = b"BLK1"
+_POINT_SIZE = 9  # série (4) + centavos (4) + estoque (1)
+
+# Resoluções dos rollups (períodos em UTC; semanas começam na segunda-feira)
+RESOLUTIONS = ("daily", "weekly")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS points_file (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    size INTEGER NOT NULL  -- bytes de points.bin confirmados
+);
+CREATE TABLE IF NOT EXISTS series (
+    idx INTEGER PRIMARY KEY,
+    book_url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_series_category ON series (category);
+CREATE TABLE IF NOT EXISTS book_rollups (
+    resolution TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    min_cents INTEGER NOT NULL,
+    max_cents INTEGER NOT NULL,
+    sum_cents INTEGER NOT NULL,
+    last_cents INTEGER NOT NULL,
+    last_ts INTEGER NOT NULL,
+    in_stock INTEGER NOT NULL,
+    PRIMARY KEY (resolution, idx, bucket)
+);
+CREATE TABLE IF NOT EXISTS category_rollups (
+    resolution TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    samples INTEGER NOT NULL,
+    min_cents INTEGER NOT NULL,
+    max_cents INTEGER NOT NULL,
+    sum_cents INTEGER NOT NULL,
+    in_stock INTEGER NOT NULL,
+    PRIMARY KEY (resolution, category, bucket)
+);
+"""
+
+
+def bucket_start(timestamp: int, resolution: str) -> int:
+    """Início (UTC, epoch) do dia ou da semana (segunda-feira) do timestamp"""
+    day = timestamp - timestamp % 86400
+    if resolution == "weekly":
+        weekday = datetime.fromtimestamp(day, timezone.utc).weekday()
+        return day - weekday * 86400
+    return day
+
+
+def _iso(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="seconds")
+
+
+def _day(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).date().isoformat()
+
+
+class _Block:
+    """Um scraping no arquivo de pontos (visões sem cópia sobre o mmap)"""
+
+    __slots__ = ("timestamp", "series", "cents", "in_stock")
+
+    def __init__(self, timestamp: int, series, cents, in_stock):
+        self.timestamp = timestamp
+        self.series = series
+        self.cents = cents
+        self.in_stock = in_stock
+
+    def find(self, idx: int) -> Optional[int]:
+        pos = bisect_left(self.series, idx)
+        if pos < len(self.series) and self.series[pos] == idx:
+            return pos
+        return None
+
+
+class PriceHistory:
+    """Histórico de preços append-only com rollups diários e semanais"""
+
+    def __init__(self, directory: Path = PRICE_HISTORY_DIR):
+        """
+        Args:
+            directory: Diretório com `points.bin` e `history.db`
+        """
+        self.directory = Path(directory)
+        self.points_path = self.directory / "points.bin"
+        self.db_path = self.directory / "history.db"
+        self._lock = threading.Lock()
+        self._blocks = []  # type: List[_Block]
+        self._map = None  # type: Optional[mmap.mmap]
+        self._view = memoryview(b"")
+        self._mapped_size = 0
+        self._valid_size = 0
+        self._ready = False
+        self._setup_lock = threading.Lock()
+
+    def _setup(self) -> None:
+        """
+        Cria o diretório, o schema e ativa o WAL (persistente no arquivo),
+        uma única vez por processo. Fica fora do `__init__` para que importar
+        o módulo não crie arquivos (ex: em sistemas de arquivos somente-leitura).
+        """
+        with self._setup_lock:
+            if self._ready:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with closing(sqlite3.connect(str(self.db_path), timeout=5.0)) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+            self._ready = True
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self._setup()
+        return sqlite3.connect(str(self.db_path), timeout=5.0)
+
+    @staticmethod
+    def _committed_size(conn: sqlite3.Connection) -> Optional[int]:
+        """Bytes de points.bin confirmados (None em bancos anteriores a esse registro)"""
+        row = conn.execute("SELECT size FROM points_file WHERE id = 0").fetchone()
+        return row[0] if row else None
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def append(self, books: Iterable[Dict], timestamp: Optional[int] = None) -> int:
+        """
+        Registra um scraping.
+
+        Args:
+            books: Livros com book_url, title, category, price e availability
+            timestamp: Momento do scraping (epoch, UTC); padrão: agora
+
+        Returns:
+            Número de pontos gravados
+        """
+        timestamp = int(time.time()) if timestamp is None else int(timestamp)
+        latest = {b['book_url']: b for b in books if b.get('book_url')}
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")  # Um escritor por vez, também entre processos
+            known = dict(conn.execute("SELECT book_url, idx FROM series"))
+            points = []
+            for url, book in latest.items():
+                idx = known.get(url)
+                if idx is None:
+                    idx = conn.execute(
+                        "INSERT INTO series (book_url, title, category) VALUES (?, ?, ?)",
+                        (url, book.get('title', ''), book.get('category', ''))
+                    ).lastrowid
+                else:
+                    conn.execute("UPDATE series SET title = ?, category = ? WHERE idx = ?",
+                                 (book.get('title', ''), book.get('category', ''), idx))
+                points.append((idx, int(round(float(book['price']) * 100)),
+                               int(book['availability'] == 'In Stock'), book.get('category', '')))
+            points.sort()
+
+            size = self._write_block(timestamp, points, self._committed_size(conn))
+            self._update_rollups(conn, timestamp, points)
+            conn.execute(
+                "INSERT INTO points_file (id, size) VALUES (0, ?) ON CONFLICT (id) DO UPDATE SET size = excluded.size",
+                (size,)
+            )
+        return len(points)
+
+    def _write_block(self, timestamp: int, points: List[Tuple[int, int, int, str]], committed: Optional[int]) -> int:
+        """Grava o bloco após o último confirmado e devolve o novo tamanho válido"""
+        self._refresh(committed)
+        data = bytearray(_BLOCK.pack(_MAGIC, timestamp, len(points)))
+        data += array("I", (p[0] for p in points)).tobytes()
+        data += array("I", (p[1] for p in points)).tobytes()
+        data += bytes(p[2] for p in points)
+        with open(self.points_path, "ab") as f:
+            if f.tell() > self._valid_size:
+                f.truncate(self._valid_size)  # Descarta um bloco incompleto ou não confirmado
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return self._valid_size + len(data)
+
+    @staticmethod
+    def _update_rollups(conn: sqlite3.Connection, timestamp: int, points: List[Tuple[int, int, int, str]]) -> None:
+        categories = {}  # type: Dict[str, List[int]]
+        for _, cents, in_stock, category in points:
+            agg = categories.get(category)
+            if agg is None:
+                categories[category] = [1, cents, cents, cents, in_stock]
+            else:
+                agg[0] += 1
+                agg[1] = min(agg[1], cents)
+                agg[2] = max(agg[2], cents)
+                agg[3] += cents
+                agg[4] += in_stock
+
+        for resolution in RESOLUTIONS:
+            bucket = bucket_start(timestamp, resolution)
+            conn.executemany(
+                "INSERT INTO book_rollups VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (resolution, idx, bucket) DO UPDATE SET "
+                "samples = samples + 1, min_cents = MIN(min_cents, excluded.min_cents), "
+                "max_cents = MAX(max_cents, excluded.max_cents), sum_cents = sum_cents + excluded.sum_cents, "
+                "last_cents = CASE WHEN excluded.last_ts >= last_ts THEN excluded.last_cents ELSE last_cents END, "
+                "last_ts = MAX(last_ts, excluded.last_ts), in_stock = in_stock + excluded.in_stock",
+                [(resolution, bucket, idx, cents, cents, cents, cents, timestamp, in_stock)
+                 for idx, cents, in_stock, _ in points]
+            )
+            conn.executemany(
+                "INSERT INTO category_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (resolution, category, bucket) DO UPDATE SET "
+                "samples = samples + excluded.samples, min_cents = MIN(min_cents, excluded.min_cents), "
+                "max_cents = MAX(max_cents, excluded.max_cents), sum_cents = sum_cents + excluded.sum_cents, "
+                "in_stock = in_stock + excluded.in_stock",
+                [(resolution, bucket, category, *agg) for category, agg in categories.items()]
+            )
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def _refresh(self, committed: Optional[int] = None) -> None:
+        """
+        Mapeia os blocos do arquivo (gravados por este ou outro processo).
+
+        Há um único mapa por vez: quando o arquivo cresce, os blocos são
+        refeitos sobre um mapa novo e o anterior é fechado.
+
+        Args:
+            committed: Bytes confirmados no history.db; None = todos os
+                       blocos completos do arquivo
+        """
+        try:
+            size = self.points_path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if committed is not None:
+            size = min(size, committed)
+        if size == self._mapped_size:
+            return
+
+        new_map = None
+        view = memoryview(b"")
+        if size:
+            with open(self.points_path, "rb") as f:
+                new_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(new_map)
+
+        blocks = []
+        offset = 0
+        while offset + _BLOCK.size <= size:
+            magic, timestamp, count = _BLOCK.unpack_from(view, offset)
+            end = offset + _BLOCK.size + count * _POINT_SIZE
+            if magic != _MAGIC or end > size:
+                break  # Bloco incompleto ou corrompido: fim dos dados válidos
+            start = offset + _BLOCK.size
+            blocks.append(_Block(
+                timestamp,
+                view[start:start + 4 * count].cast("I"),
+                view[start + 4 * count:start + 8 * count].cast("I"),
+                view[start + 8 * count:end],
+            ))
+            offset = end
+
+        old_map, old_view = self._map, self._view
+        self._map, self._view = new_map, view
+        self._blocks, self._mapped_size, self._valid_size = blocks, size, offset
+        if old_map is not None:
+            try:
+                old_view.release()
+                old_map.close()
+            except BufferError:
+                pass  # Uma leitura em andamento ainda usa o mapa antigo: é liberado quando ela terminar
+
+    def series_for(self, book_url: str) -> Optional[int]:
+        """Número da série de um livro, ou None se ele nunca foi registrado"""
+        if not self.db_path.exists():
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT idx FROM series WHERE book_url = ?", (book_url,)).fetchone()
+        return row[0] if row else None
+
+    def book_history(
+        self,
+        book_url: str,
+        resolution: str = "raw",
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Histórico de preço de um livro.
+
+        Args:
+            book_url: Chave do livro
+            resolution: "raw" (cada scraping), "daily" ou "weekly"
+            start: Início do período (epoch, inclusive)
+            end: Fim do período (epoch, inclusive)
+
+        Returns:
+            Lista de pontos em ordem cronológica
+        """
+        if not self.db_path.exists():
+            return []
+        start = 0 if start is None else start
+        end = 2 ** 62 if end is None else end
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT idx FROM series WHERE book_url = ?", (book_url,)).fetchone()
+            if row is None:
+                return []
+            idx = row[0]
+            if resolution == "raw":
+                committed = self._committed_size(conn)
+            else:
+                rows = conn.execute(
+                    "SELECT bucket, samples, min_cents, max_cents, sum_cents, last_cents, in_stock FROM book_rollups "
+                    "WHERE resolution = ? AND idx = ? AND bucket BETWEEN ? AND ? ORDER BY bucket",
+                    (resolution, idx, bucket_start(start, resolution), end)
+                ).fetchall()
+
+        if resolution == "raw":
+            with self._lock:
+                self._refresh(committed)
+                blocks = self._blocks
+            points = []
+            for block in blocks:
+                if not start <= block.timestamp <= end:
+                    continue
+                pos = block.find(idx)
+                if pos is not None:
+                    points.append({
+                        "timestamp": _iso(block.timestamp),
+                        "price": block.cents[pos] / 100,
+                        "availability": "In Stock" if block.in_stock[pos] else "Out of Stock",
+                    })
+            return points
+
+        return [
+            {
+                "bucket": _day(bucket),
+                "samples": samples,
+                "min_price": min_c / 100,
+                "max_price": max_c / 100,
+                "avg_price": round(sum_c / samples / 100, 2),
+                "last_price": last_c / 100,
+                "in_stock_ratio": round(in_stock / samples, 3),
+            }
+            for bucket, samples, min_c, max_c, sum_c, last_c, in_stock in rows
+        ]
+
+    def category_trend(
+        self,
+        category: str,
+        resolution: str = "daily",
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Tendência de preço de uma categoria (a partir dos rollups).
+
+        Args:
+            category: Nome exato da categoria
+            resolution: "daily" ou "weekly"
+            start: Início do período (epoch, inclusive)
+            end: Fim do período (epoch, inclusive)
+        """
+        if not self.db_path.exists():
+            return []
+        start = 0 if start is None else start
+        end = 2 ** 62 if end is None else end
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT bucket, samples, min_cents, max_cents, sum_cents, in_stock FROM category_rollups "
+                "WHERE resolution = ? AND category = ? AND bucket BETWEEN ? AND ? ORDER BY bucket",
+                (resolution, category, bucket_start(start, resolution), end)
+            ).fetchall()
+        return [
+            {
+                "bucket": _day(bucket),
+                "samples": samples,
+                "min_price": min_c / 100,
+                "max_price": max_c / 100,
+                "avg_price": round(sum_c / samples / 100, 2),
+                "in_stock_ratio": round(in_stock / samples, 3),
+            }
+            for bucket, samples, min_c, max_c, sum_c, in_stock in rows
+        ]
+
+
+# Instância global do histórico de preços (singleton)
+price_history = PriceHistory()
+
+
+def main():
+    """Registra um CSV como um ponto do histórico (timestamp = agora ou argumento ISO)"""
+    from api.storage.changes import read_books_csv
+
+    if len(sys.argv) < 2:
+        print("Uso: python -m api.storage.timeseries <csv> [AAAA-MM-DDTHH:MM:SS]")
+        sys.exit(1)
+    timestamp = None
+    if len(sys.argv) > 2:
+        moment = datetime.fromisoformat(sys.argv[2])
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        timestamp = int(moment.timestamp())
+    count = price_history.append(read_books_csv(Path(sys.argv[1])), timestamp)
+    print(f"✓ {count} preços registrados em {price_history.points_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Aquecimento do Worker
+
+Depois do startup, um worker ainda tem índices derivados (postings,
+bitmaps, trigramas) e caches de resposta frios: as primeiras requisições
+pagam por eles. O aquecimento roda em segundo plano, logo após o lifespan
+liberar o servidor, em duas etapas:
+
+1. `indexes`: `warm_up()` do backend constrói todos os índices e
+   agregados (no pool de threads das consultas).
+2. `responses`: as rotas mais acessadas (`WARMUP_PATHS`) são requisitadas
+   em processo, pela pilha ASGI completa, uma vez por encoding
+   (`WARMUP_ENCODINGS`). Isso preenche o cache de corpos comprimidos e
+   paga os custos de primeira chamada (validadores do pydantic, imports
+   tardios, serialização).
+
+As requisições do aquecimento levam uma marca no scope ASGI
+(`WARMUP_SCOPE_KEY`): os middlewares de monitoramento não as contam nas
+métricas nem no log, e elas não gastam tokens do rate limiting.
+
+Enquanto isso, `/api/v1/health/live` já responde 200 e
+`/api/v1/health/ready` responde 503 com o progresso; o load balancer só
+manda tráfego quando o worker está pronto. Uma etapa que falha é registrada
+e não impede as seguintes, mas o worker fica degradado: o readiness segue
+em 503, com o erro de cada etapa.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from api.async_database import db
+from api.config import WARMUP_ENABLED, WARMUP_ENCODINGS, WARMUP_PATHS
+
+STEPS = ("indexes", "responses")
+
+# Chave do scope ASGI que marca as requisições feitas pelo aquecimento
+WARMUP_SCOPE_KEY = "books_api.warmup"
+
+
+def is_warmup(scope) -> bool:
+    """Se a requisição foi feita pelo aquecimento (e não por um cliente)"""
+    return scope.get(WARMUP_SCOPE_KEY, False)
+
+
+async def _asgi_get(app, url: str, encoding: str) -> int:
+    """Faz um GET em processo pela pilha ASGI e devolve o status"""
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"warmup"), (b"accept-encoding", encoding.encode())],
+        "client": ("warmup", 0),
+        "server": ("warmup", 80),
+        WARMUP_SCOPE_KEY: True,
+    }
+    status = 0
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        # Corpo vazio uma vez; depois, como um servidor real, só informa a
+        # desconexão quando a resposta termina (os middlewares ficam
+        # aguardando `receive` em paralelo à resposta)
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_done.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+class Warmup:
+    """Estado e execução do aquecimento deste worker"""
+
+    def __init__(self, enabled: bool = WARMUP_ENABLED):
+        self.state = "pending" if enabled else "disabled"
+        self.steps = []  # type: List[Dict]
+        self.started_at = None  # type: Optional[datetime]
+        self.seconds = None  # type: Optional[float]
+        self._task = None  # type: Optional[asyncio.Task]
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "disabled")
+
+    @property
+    def failed(self) -> List[str]:
+        """Nomes das etapas que falharam"""
+        return [s["name"] for s in self.steps if s["status"] == "failed"]
+
+    def start(self, app) -> None:
+        """Agenda o aquecimento no event loop corrente (uma única vez)"""
+        if self.state == "pending":
+            self.state = "running"
+            self._task = asyncio.create_task(self.run(app))
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def run(self, app) -> None:
+        """Executa as etapas em ordem, cronometrando cada uma"""
+        self.state = "running"
+        self.started_at = datetime.now()
+        started = time.perf_counter()
+        await self._step("indexes", db.warm_up)
+        await self._step("responses", lambda: self._responses(app))
+        self.seconds = round(time.perf_counter() - started, 4)
+        self.state = "done"
+        if self.failed:
+            print(f"⚠ Aquecimento concluído com falhas ({', '.join(self.failed)}) em {self.seconds}s")
+        else:
+            print(f"✓ Aquecimento concluído em {self.seconds}s")
+
+    async def _step(self, name: str, func) -> None:
+        step = {"name": name, "status": "running", "seconds": None, "detail": None, "error": None}
+        self.steps.append(step)
+        start = time.perf_counter()
+        try:
+            step["detail"] = await func()
+            step["status"] = "done"
+        except Exception as e:
+            step["status"] = "failed"
+            step["error"] = str(e)
+        step["seconds"] = round(time.perf_counter() - start, 4)
+
+    async def _responses(self, app) -> Dict[str, float]:
+        """Requisita cada rota de WARMUP_PATHS; segundos por rota (todas as encodings)"""
+        timings = {}
+        for url in WARMUP_PATHS:
+            start = time.perf_counter()
+            for encoding in WARMUP_ENCODINGS or ("identity",):
+                status = await _asgi_get(app, url, encoding)
+                if status >= 400:
+                    raise RuntimeError(f"GET {url} respondeu {status}")
+            timings[url] = round(time.perf_counter() - start, 4)
+        return timings
+
+    def status(self) -> Dict:
+        """Progresso e tempos por etapa (para /api/v1/health/ready)"""
+        done = sum(1 for s in self.steps if s["status"] in ("done", "failed"))
+        return {
+            "state": self.state,
+            "failed": self.failed,
+            "progress": 1.0 if self.finished else round(done / len(STEPS), 2),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "seconds": self.seconds,
+            "steps": [dict(s) for s in self.steps],
+        }
+
+
+# Instância global (singleton)
+warmup = Warmup()
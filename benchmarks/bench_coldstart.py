@@ -0,0 +1,115 @@
+"""
+Benchmark de Cold Start
+
+Cada tentativa roda em um processo Python novo (como uma função serverless
+fria) e mede:
+
+- `import_ms`: `import api.main`
+- `first_request_ms`: primeira requisição via ASGI, sem lifespan (com
+  LAZY_INIT=1 é aqui que os dados são carregados)
+- módulos pesados carregados (pandas, bs4, requests, numpy) e RSS
+
+Os modos `eager` (LAZY_INIT=0) e `lazy` (LAZY_INIT=1) são comparados pela
+mediana das tentativas. Serve também de guarda contra regressões: termina
+com código 1 se algum módulo proibido for importado ou se o import do modo
+lazy passar de `--max-import-ms`.
+
+Uso:
+    python -m benchmarks.bench_coldstart [--trials 5] [--max-import-ms 1500]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Dependências de desenvolvimento (requirements-dev.txt) que não podem entrar no import da API
+FORBIDDEN_MODULES = ("pandas", "bs4", "requests", "numpy")
+
+_TRIAL = """
+import asyncio, json, os, sys, time
+
+start = time.perf_counter()
+import api.main
+imported = time.perf_counter()
+
+import httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=api.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cold") as client:
+        return (await client.get("/api/v1/books?page=1&page_size=20")).status_code
+
+status = asyncio.run(first_request())
+done = time.perf_counter()
+with open("/proc/self/statm") as f:
+    rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+json.dump({
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (done - imported) * 1000,
+    "status": status,
+    "heavy_modules": [m for m in FORBIDDEN if m in sys.modules],
+    "rss_mb": rss,
+}, sys.__stdout__)
+"""
+
+
+def _trial(lazy: bool) -> dict:
+    """Executa uma tentativa em um processo novo"""
+    env = dict(os.environ, LAZY_INIT="1" if lazy else "0", LOG_FILE="", RATE_LIMIT_ENABLED="0")
+    root = str(Path(__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = root + os.pathsep + env.get("PYTHONPATH", "")
+    code = f"FORBIDDEN = {FORBIDDEN_MODULES!r}\n" + _TRIAL
+    result = subprocess.run([sys.executable, "-c", code], env=env, cwd=root,
+                            capture_output=True, text=True, check=True)
+    # Os prints de status da aplicação vêm antes; o JSON é a última linha
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=1500.0,
+                        help="Limite para o import no modo lazy (0 desativa)")
+    args = parser.parse_args()
+
+    report = {"benchmark": "coldstart", "trials": args.trials, "modes": {}}
+    failures = []
+    for mode in ("eager", "lazy"):
+        trials = [_trial(mode == "lazy") for _ in range(args.trials)]
+        heavy = sorted({m for t in trials for m in t["heavy_modules"]})
+        summary = {
+            "import_ms": round(_median(t["import_ms"] for t in trials), 1),
+            "first_request_ms": round(_median(t["first_request_ms"] for t in trials), 1),
+            "total_ms": round(_median(t["import_ms"] + t["first_request_ms"] for t in trials), 1),
+            "rss_mb": round(_median(t["rss_mb"] for t in trials), 1),
+            "first_request_status": sorted({t["status"] for t in trials}),
+            "heavy_modules": heavy,
+        }
+        report["modes"][mode] = summary
+        if heavy:
+            failures.append(f"{mode}: módulos pesados importados ({', '.join(heavy)})")
+        if summary["first_request_status"] != [200]:
+            failures.append(f"{mode}: primeira requisição com status {summary['first_request_status']}")
+
+    lazy_import = report["modes"]["lazy"]["import_ms"]
+    if args.max_import_ms and lazy_import > args.max_import_ms:
+        failures.append(f"lazy: import levou {lazy_import} ms (limite {args.max_import_ms} ms)")
+
+    report["failures"] = failures
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark de Memória das Colunas de URL
+
+Compara, em um catálogo sintético (ver `benchmarks/synthetic.py`), o
+espaço das URLs guardadas por inteiro (`StringColumn`) e com dicionário de
+prefixos/sufixos (`URLColumn`), além do tamanho total das colunas, do
+snapshot e do custo de remontar uma linha.
+
+Uso:
+    python -m benchmarks.bench_memory [--books 1000000]
+"""
+
+import argparse
+import json
+import time
+
+from api.storage.columnar import BookColumns, StringColumn, URLColumn
+from benchmarks.synthetic import generate_rows
+
+
+def _time_per_call(func, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = list(generate_rows(args.books, args.seed))
+    start = time.perf_counter()
+    cols = BookColumns.from_rows(rows)
+    build = time.perf_counter() - start
+
+    urls = []
+    plain_total = encoded_total = 0
+    for name in BookColumns.URLS:
+        values = [r[name] for r in rows]
+        start = time.perf_counter()
+        plain = StringColumn.from_strings(values)
+        plain_build = time.perf_counter() - start
+        start = time.perf_counter()
+        encoded = URLColumn.from_strings(values)
+        encoded_build = time.perf_counter() - start
+        if any(encoded[i] != values[i] for i in range(0, len(values), max(1, len(values) // 1000))):
+            raise SystemExit(f"❌ {name}: URL remontada diferente da original")
+        plain_total += plain.nbytes()
+        encoded_total += encoded.nbytes()
+        probe = min(100000, len(values))
+        urls.append({
+            "column": name,
+            "templates": encoded.templates[:5],
+            "template_count": len(encoded.templates),
+            "plain_bytes": plain.nbytes(),
+            "encoded_bytes": encoded.nbytes(),
+            "saved_pct": round(100 * (1 - encoded.nbytes() / plain.nbytes()), 1) if plain.nbytes() else 0.0,
+            "plain_build_s": round(plain_build, 3),
+            "encoded_build_s": round(encoded_build, 3),
+            "plain_get_ns": round(_time_per_call(plain.__getitem__, probe) * 1e9, 1),
+            "encoded_get_ns": round(_time_per_call(encoded.__getitem__, probe) * 1e9, 1),
+        })
+
+    columns_bytes = cols.nbytes()
+    print(json.dumps({
+        "benchmark": "memory",
+        "books": cols.count,
+        "columns_build_s": round(build, 3),
+        "columns_mb": round(columns_bytes / 2 ** 20, 2),
+        "columns_mb_with_plain_urls": round((columns_bytes - encoded_total + plain_total) / 2 ** 20, 2),
+        "url_mb_saved": round((plain_total - encoded_total) / 2 ** 20, 2),
+        "bytes_per_book": round(columns_bytes / max(1, cols.count), 1),
+        "snapshot_mb": round(cols.snapshot_size() / 2 ** 20, 2),
+        "row_us": round(_time_per_call(cols.row, min(100000, cols.count)) * 1e6, 2),
+        "urls": urls,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
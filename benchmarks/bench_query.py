@@ -0,0 +1,132 @@
+"""
+Benchmark da Consulta Composta
+
+Mede `query_books` (planejador + índices derivados) em uma matriz de
+combinações de filtros e compara com a alternativa anterior: varrer o
+catálogo inteiro testando todos os critérios em cada livro. O catálogo de
+`data/books.csv` é replicado `--scale` vezes (IDs novos) para simular
+coleções maiores.
+
+Uso:
+    python -m benchmarks.bench_query [--scale 100] [--repeat 20]
+"""
+
+import argparse
+import json
+import time
+
+from api.config import DATA_PATH
+from api.database import BooksDatabase
+from api.storage.columnar import BookColumns
+
+# Combinações medidas: nome -> critérios
+MATRIX = {
+    "title": {"title": "the"},
+    "category": {"category": "poetry"},
+    "price": {"min_price": 20, "max_price": 30},
+    "rating": {"min_rating": 5},
+    "in_stock": {"in_stock": True},
+    "category+price": {"category": "fiction", "min_price": 20, "max_price": 30},
+    "category+rating+in_stock": {"category": "fiction", "min_rating": 4, "in_stock": True},
+    "title+price": {"title": "the", "min_price": 50},
+    "title+category": {"title": "love", "category": "romance"},
+    "price+rating+sort": {"min_price": 10, "max_price": 40, "min_rating": 3, "sort": "price"},
+    "all_filters": {"title": "a", "category": "fic", "min_price": 15, "max_price": 45,
+                    "min_rating": 2, "max_rating": 4, "in_stock": True},
+    "sort_only": {"sort": "title", "descending": True},
+}
+
+
+def _scaled_columns(database: BooksDatabase, scale: int) -> BookColumns:
+    """Replica as linhas do catálogo `scale` vezes, com IDs únicos"""
+    cols = database.columns
+    base = [cols.row(i) for i in range(cols.count)]
+    step = max(cols.ids, default=0) + 1
+    rows = []
+    for copy in range(scale):
+        for row in base:
+            rows.append(dict(row, id=row["id"] + copy * step))
+    return BookColumns.from_rows(rows)
+
+
+def _full_scan(cols: BookColumns, criteria: dict) -> int:
+    """Referência: testa todos os critérios em todas as linhas"""
+    title = criteria.get("title", "").lower()
+    category = criteria.get("category", "").lower()
+    min_price, max_price = criteria.get("min_price"), criteria.get("max_price")
+    min_rating, max_rating = criteria.get("min_rating"), criteria.get("max_rating")
+    in_stock = criteria.get("in_stock")
+    matches = []
+    for i in range(cols.count):
+        book = cols.row(i)
+        if ((not title or title in book["title"].lower())
+                and (not category or category in book["category"].lower())
+                and (min_price is None or book["price"] >= min_price)
+                and (max_price is None or book["price"] <= max_price)
+                and (min_rating is None or book["rating"] >= min_rating)
+                and (max_rating is None or book["rating"] <= max_rating)
+                and (in_stock is None or (book["availability"] == "In Stock") == in_stock)):
+            matches.append(book)
+    if criteria.get("sort"):
+        matches.sort(key=lambda b: b[criteria["sort"]], reverse=criteria.get("descending", False))
+    return len(matches)
+
+
+def _time(func, repeat: int) -> float:
+    """Mediana de `repeat` execuções, em segundos"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=100, help="Cópias do catálogo base")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--baseline-repeat", type=int, default=3, help="Execuções da varredura completa")
+    args = parser.parse_args()
+
+    database = BooksDatabase(DATA_PATH)
+    database.use_columns(_scaled_columns(database, args.scale))
+    cols = database.columns
+
+    # Constrói os índices derivados fora da medição (uma vez por snapshot)
+    start = time.perf_counter()
+    cols.postings("category_codes")
+    cols.postings("ratings")
+    cols.postings("in_stock")
+    cols.price_index()
+    index_build = time.perf_counter() - start
+
+    results = []
+    for name, criteria in MATRIX.items():
+        result = database.query_books(**criteria)
+        baseline_total = _full_scan(cols, criteria)
+        if result["total"] != baseline_total:
+            raise SystemExit(f"❌ Resultado divergente em {name}: {result['total']} != {baseline_total}")
+
+        engine = _time(lambda: database.query_books(**criteria), args.repeat)
+        baseline = _time(lambda: _full_scan(cols, criteria), args.baseline_repeat)
+        results.append({
+            "query": name,
+            "total": result["total"],
+            "plan": result["plan"],
+            "engine_ms": round(engine * 1000, 3),
+            "full_scan_ms": round(baseline * 1000, 3),
+            "speedup": round(baseline / engine, 1) if engine else None,
+        })
+
+    print(json.dumps({
+        "benchmark": "query",
+        "books": cols.count,
+        "index_build_ms": round(index_build * 1000, 1),
+        "results": results,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
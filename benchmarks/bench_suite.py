@@ -0,0 +1,267 @@
+"""
+Suíte de Benchmarks da API
+
+Para cada tamanho de catálogo sintético (ver `benchmarks/synthetic.py`):
+
+1. Gera o CSV e mede a carga (`BooksDatabase.load_data`) e a memória (RSS).
+2. Micro-benchmark de todos os métodos de consulta do `BooksDatabase`:
+   primeira chamada (caches derivados frios) e mediana/p99 das seguintes.
+3. Teste de carga de todas as rotas públicas, em processo, via ASGI
+   (`httpx.ASGITransport`, sem rede): req/s, p50/p99 e códigos de status.
+
+O resultado é um JSON, para comparar commits (`--output` grava em arquivo).
+O rate limiting é desativado e os logs por requisição são silenciados
+durante a medição (use `--keep-logs` para incluí-los). `POST
+/scraping/trigger` fica de fora, pois dispara um scraping real.
+
+Uso:
+    python -m benchmarks.bench_suite [--sizes 1000,100000,1000000] [--requests 500] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.synthetic import write_csv
+
+
+def _rss_mb() -> float:
+    """RSS atual do processo, em MB (pico do processo fora do Linux)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _db_calls(count: int) -> List[Tuple[str, Callable]]:
+    """Chamadas medidas no BooksDatabase: (nome, função que recebe o banco)"""
+    mid = max(1, count // 2)
+    return [
+        ("get_all_books", lambda db: db.get_all_books(0, 20)),
+        ("get_all_books@deep_page", lambda db: db.get_all_books(max(0, count - 100), 100)),
+        ("get_book_by_id", lambda db: db.get_book_by_id(mid)),
+        ("search_books@title", lambda db: db.search_books(title="shadow", limit=20)),
+        ("search_books@title+category", lambda db: db.search_books(title="love", category="romance", limit=20)),
+        ("query_books", lambda db: db.query_books(category="fiction", min_price=20, max_price=30,
+                                                  min_rating=4, sort="price", limit=20)),
+        ("query_books@facets", lambda db: db.query_books(title="the", facets=("category", "rating", "price"))),
+        ("fuzzy_search_books", lambda db: db.fuzzy_search_books("shadwo nigth", limit=20)),
+        ("suggest", lambda db: db.suggest("harry po", 10)),
+        ("get_all_categories", lambda db: db.get_all_categories()),
+        ("get_total_count", lambda db: db.get_total_count()),
+        ("get_index_sizes", lambda db: db.get_index_sizes()),
+        ("get_stats_overview", lambda db: db.get_stats_overview()),
+        ("get_stats_by_category", lambda db: db.get_stats_by_category()),
+        ("get_top_rated_books", lambda db: db.get_top_rated_books(10)),
+        ("get_books_by_price_range", lambda db: db.get_books_by_price_range(20, 25, 0, 20)),
+    ]
+
+
+def bench_database(database, repeat: int) -> List[Dict]:
+    """Mede cada método de consulta do backend"""
+    results = []
+    for name, call in _db_calls(database.get_total_count()):
+        start = time.perf_counter()
+        call(database)
+        first = time.perf_counter() - start
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            call(database)
+            samples.append(time.perf_counter() - start)
+        median = _percentile(samples, 0.5)
+        results.append({
+            "method": name,
+            "first_ms": round(first * 1000, 3),
+            "p50_ms": round(median * 1000, 3),
+            "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+            "ops_per_s": round(1 / median, 1) if median else None,
+        })
+    return results
+
+
+def _routes(count: int, admin_token: str, refresh_token: str) -> List[Tuple[str, str, Dict]]:
+    """Rotas medidas: (método, URL, kwargs do httpx)"""
+    auth = {"headers": {"Authorization": f"Bearer {admin_token}"}}
+    mid = max(1, count // 2)
+    return [
+        ("GET", "/api/v1/health", {}),
+        ("GET", "/api/v1/books?page=1&page_size=20", {}),
+        ("GET", "/api/v1/books?page=1&page_size=100", {}),
+        ("GET", f"/api/v1/books/{mid}", {}),
+        ("GET", "/api/v1/books/search?title=shadow", {}),
+        ("GET", "/api/v1/books/search?title=love&facets=category,rating,price,availability", {}),
+        ("GET", "/api/v1/books/suggest?q=harry%20po", {}),
+        ("GET", "/api/v1/books/search/fuzzy?q=shadwo%20nigth", {}),
+        ("GET", "/api/v1/books/query?category=fiction&min_price=20&max_price=30&min_rating=4&sort=price", {}),
+        ("GET", "/api/v1/books/changes?since=0&limit=100", {}),
+        ("GET", f"/api/v1/books/{mid}/price-history?resolution=daily", {}),
+        ("GET", "/api/v1/books/top-rated?limit=10", {}),
+        ("GET", "/api/v1/books/price-range?min=20&max=25", {}),
+        ("GET", "/api/v1/categories", {}),
+        ("GET", "/api/v1/stats/overview", {}),
+        ("GET", "/api/v1/stats/categories", {}),
+        ("GET", "/api/v1/stats/categories/Fiction/price-trend?resolution=weekly", {}),
+        ("POST", "/api/v1/batch", {"json": {"queries": [
+            {"op": "categories"}, {"op": "stats_overview"}, {"op": "top_rated", "params": {"limit": 10}},
+            {"op": "search", "params": {"title": "shadow"}},
+        ]}}),
+        ("POST", "/api/v1/auth/login", {"json": {"username": "user", "password": "user123"}}),
+        ("POST", "/api/v1/auth/refresh", {"json": {"refresh_token": refresh_token}}),
+        ("GET", "/api/v1/ml/features", auth),
+        ("GET", "/api/v1/ml/training-data?limit=100", auth),
+        ("POST", "/api/v1/ml/predictions", dict(auth, json={"price": 20.0, "rating": 4})),
+        ("GET", "/api/v1/scraping/status", auth),
+        ("GET", "/api/v1/monitoring/profiles", auth),
+        ("GET", "/metrics", {}),
+    ]
+
+
+async def _load(client: httpx.AsyncClient, method: str, url: str, kwargs: Dict,
+                total: int, concurrency: int) -> Dict:
+    """Dispara `total` requisições com `concurrency` clientes simultâneos"""
+    latencies = []  # type: List[float]
+    statuses = {}  # type: Dict[str, int]
+    remaining = [total]
+
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            key = str(response.status_code)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    for _ in range(3):  # aquecimento (caches derivados, imports tardios)
+        await client.request(method, url, **kwargs)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "route": f"{method} {url}",
+        "requests": total,
+        "req_per_s": round(total / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "status": statuses,
+    }
+
+
+async def bench_http(app, count: int, total: int, concurrency: int) -> List[Dict]:
+    """Teste de carga de todas as rotas, em processo"""
+    from api.auth.jwt_handler import create_access_token, create_refresh_token
+
+    claims = {"sub": "admin", "role": "admin"}
+    routes = _routes(count, create_access_token(claims), create_refresh_token(claims))
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return [await _load(client, method, url, kwargs, total, concurrency) for method, url, kwargs in routes]
+
+
+def run_size(count: int, args, workdir: Path) -> Dict:
+    """Executa a suíte sobre um catálogo sintético de `count` livros"""
+    from api.database import BooksDatabase, db as app_database
+    from api.main import app
+
+    start = time.perf_counter()
+    path = write_csv(workdir / f"books_{count}.csv", count, args.seed)
+    generate = time.perf_counter() - start
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        database = BooksDatabase(path)
+    load = time.perf_counter() - start
+    if database.get_total_count() != count:
+        raise SystemExit(f"❌ Carga incompleta: {database.get_total_count()} de {count} livros")
+
+    # A aplicação passa a servir o mesmo conjunto de dados
+    app_database.csv_path = path
+    app_database.use_columns(database.columns)
+
+    result = {
+        "books": count,
+        "csv_mb": round(path.stat().st_size / 2 ** 20, 2),
+        "generate_s": round(generate, 3),
+        "load_s": round(load, 3),
+        "load_rows_per_s": round(count / load, 1),
+        "rss_mb_dataset": round(_rss_mb() - rss_before, 1),
+        "database": bench_database(database, args.repeat),
+    }
+    if not args.skip_http:
+        result["http"] = asyncio.run(bench_http(app, count, args.requests, args.concurrency))
+    result["rss_mb"] = round(_rss_mb(), 1)
+    path.unlink()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Tamanhos de catálogo, separados por vírgula")
+    parser.add_argument("--requests", type=int, default=500, help="Requisições por rota")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=20, help="Repetições por método do banco")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-http", action="store_true", help="Só o micro-benchmark do banco")
+    parser.add_argument("--keep-logs", action="store_true", help="Mantém o log por requisição")
+    parser.add_argument("--output", type=Path, help="Grava o JSON também neste arquivo")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        import api.main  # noqa: F401 (carrega o CSV padrão, com prints de status)
+        from api.monitoring.logger import api_logger
+        from api.monitoring.rate_limiter import rate_limiter
+    rate_limiter.enabled = False
+    if not args.keep_logs:
+        api_logger.setLevel(logging.WARNING)
+
+    report = {
+        "benchmark": "suite",
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "requests_per_route": args.requests,
+        "concurrency": args.concurrency,
+        "sizes": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="books-bench-") as workdir:
+        for count in (int(s) for s in args.sizes.split(",") if s.strip()):
+            print(f"… {count} livros", file=sys.stderr)
+            report["sizes"].append(run_size(count, args, Path(workdir)))
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Catálogos Sintéticos para Benchmarks
+
+Gera livros no mesmo esquema de `data/books.csv` (BOOK_FIELDS), com
+distribuições parecidas com as do site: títulos de 1 a 8 palavras, ~50
+categorias de tamanhos desiguais, preços entre 10 e 60, ratings de 1 a 5,
+~90% em estoque e URLs com os prefixos reais. A geração é determinística
+(`seed`), então dois commits são comparados sobre os mesmos dados.
+
+Uso:
+    python -m benchmarks.synthetic --books 100000 --output /tmp/books_100k.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import random
+import re
+from pathlib import Path
+from typing import Dict, Iterator
+
+from api.storage.base import BOOK_FIELDS
+
+CATEGORIES = (
+    "Travel", "Mystery", "Historical Fiction", "Sequential Art", "Classics", "Philosophy",
+    "Romance", "Womens Fiction", "Fiction", "Childrens", "Religion", "Nonfiction", "Music",
+    "Default", "Science Fiction", "Sports and Games", "Add a comment", "Fantasy", "New Adult",
+    "Young Adult", "Science", "Poetry", "Paranormal", "Art", "Psychology", "Autobiography",
+    "Parenting", "Adult Fiction", "Humor", "Horror", "History", "Food and Drink",
+    "Christian Fiction", "Business", "Biography", "Thriller", "Contemporary", "Spirituality",
+    "Academic", "Self Help", "Historical", "Christian", "Suspense", "Short Stories", "Novels",
+    "Health", "Politics", "Cultural", "Erotica", "Crime",
+)
+
+WORDS = (
+    "the", "of", "and", "a", "in", "to", "my", "love", "night", "shadow", "house", "girl", "man",
+    "world", "life", "secret", "dark", "light", "last", "first", "city", "river", "war", "king",
+    "queen", "heart", "blood", "stars", "moon", "sun", "garden", "story", "book", "history",
+    "journey", "island", "summer", "winter", "dream", "fire", "ice", "stone", "road", "home",
+    "death", "time", "lost", "found", "little", "great", "black", "white", "red", "golden",
+    "silent", "wild", "broken", "hidden", "forgotten", "american", "english", "paris", "london",
+    "harry", "potter", "sherlock", "holmes", "mystery", "murder", "guide", "art", "science",
+    "music", "poems", "letters", "children", "mother", "father", "sister", "brother", "friends",
+    "wolf", "dragon", "empire", "kingdom", "ocean", "mountain", "forest", "crown", "sword",
+    "promise", "memory", "truth", "lies", "beautiful", "strange", "final", "new", "old", "young",
+)
+
+_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def generate_rows(count: int, seed: int = 42) -> Iterator[Dict]:
+    """
+    Gera `count` livros (IDs de 1 a `count`), já com os tipos convertidos.
+
+    Args:
+        count: Número de livros
+        seed: Semente do gerador (mesma semente, mesmo catálogo)
+    """
+    rng = random.Random(seed)
+    # Pesos de Zipf: poucas categorias grandes e uma cauda de pequenas
+    weights = [1 / (rank + 1) for rank in range(len(CATEGORIES))]
+    categories = rng.choices(CATEGORIES, weights=weights, k=count)
+    for i in range(count):
+        words = rng.choices(WORDS, k=rng.randint(1, 8))
+        title = " ".join(words).capitalize()
+        digest = hashlib.md5(f"{seed}:{i}".encode()).hexdigest()
+        slug = _SLUG.sub("-", title.lower()).strip("-")
+        yield {
+            "id": i + 1,
+            "title": title,
+            "price": round(rng.uniform(10, 60), 2),
+            "rating": rng.randint(1, 5),
+            "availability": "In Stock" if rng.random() < 0.9 else "Out of Stock",
+            "category": categories[i],
+            "image_url": f"https://books.toscrape.com/media/cache/{digest[:2]}/{digest[2:4]}/{digest}.jpg",
+            "book_url": f"https://books.toscrape.com/catalogue/{slug}_{i + 1}/index.html",
+        }
+
+
+def write_csv(path: Path, count: int, seed: int = 42) -> Path:
+    """Grava um catálogo sintético em `path` (formato de data/books.csv)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=BOOK_FIELDS)
+        writer.writeheader()
+        writer.writerows(generate_rows(count, seed))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, required=True)
+    args = parser.parse_args()
+    write_csv(args.output, args.books, args.seed)
+    print(f"✓ {args.books} livros gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,37 @@
 import streamlit as st
 import requests
 import pandas as pd
-import json
 import os
 
+from api.monitoring.log_aggregator import LogAggregator, DEFAULT_LOG_PATH
+
 st.title("Dashboard de Uso da Books API")
 
-stats_file = "logs/api.log"
+stats_file = str(DEFAULT_LOG_PATH)
 if os.path.exists(stats_file):
-    with open(stats_file, "r") as f:
-        logs = [json.loads(line) for line in f if line.strip()]
-    df = pd.DataFrame(logs)
+    # Processa apenas as linhas novas do log e lê os agregados persistidos
+    aggregator = LogAggregator()
+    aggregator.update()
+    summary = aggregator.summary()
+    aggregator.close()
+
+    endpoints = pd.DataFrame(summary["endpoints"])
     st.subheader("Requisições por Endpoint")
-    st.bar_chart(df["path"].value_counts())
+    if not endpoints.empty:
+        st.bar_chart(endpoints.set_index("path")["count"])
 
     st.subheader("Tempo Médio de Processamento")
-    st.write(round(df["process_time"].mean(), 4))
+    st.write(round(summary["avg_time"], 4))
+
+    st.subheader("Latência por Endpoint (segundos)")
+    if not endpoints.empty:
+        st.dataframe(endpoints.set_index("path")[["count", "avg_time", "p50", "p95", "p99"]])
 
     st.subheader("Status Codes")
-    st.bar_chart(df["status_code"].value_counts())
+    st.bar_chart(pd.Series(summary["status_codes"], name="count"))
+
+    if summary["invalid_lines"]:
+        st.caption(f"{summary['invalid_lines']} linhas do log ignoradas (não-JSON ou sem dados de requisição)")
 else:
     st.warning("Arquivo de log não encontrado.")
 
@@ -32,4 +45,3 @@ try:
         st.warning(f"Erro ao buscar estatísticas da API: {response.status_code}")
 except Exception as e:
     st.warning(f"Erro ao conectar à API: {e}")
-
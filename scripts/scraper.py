@@ -5,6 +5,7 @@ Este módulo realiza o web scraping do site https://books.toscrape.com/
 e extrai informações sobre todos os livros disponíveis.
 """
 
+import sys
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
@@ -12,6 +13,13 @@ from typing import List, Dict
 import time
 from pathlib import Path
 
+# Permite rodar como `python3 scripts/scraper.py` (pacote `api` na raiz do projeto)
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.storage.changes import change_log, read_books_csv
+from api.storage.timeseries import price_history
+
 
 class BooksScraper:
     """Classe para fazer scraping do site Books to Scrape"""
@@ -219,6 +227,9 @@ class BooksScraper:
             # Cria o diretório se não existir
             Path(filepath).parent.mkdir(parents=True, exist_ok=True)
             
+            # Catálogo anterior, para o feed de alterações
+            previous = read_books_csv(Path(filepath)) if Path(filepath).exists() else None
+            
             # Converte para DataFrame e salva
             df = pd.DataFrame(self.books_data)
             
@@ -231,6 +242,16 @@ class BooksScraper:
             print(f"  Total de livros: {len(df)}")
             print(f"  Colunas: {', '.join(df.columns.tolist())}")
             
+            if previous is not None:
+                version = change_log.record_snapshot(previous, self.books_data)
+                if version is None:
+                    print("✓ Nenhuma alteração desde o scraping anterior")
+                else:
+                    print(f"✓ Alterações gravadas na versão {version} do feed")
+            
+            points = price_history.append(self.books_data)
+            print(f"✓ {points} preços registrados no histórico")
+            
             return True
             
         except Exception as e:
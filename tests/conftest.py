@@ -0,0 +1,53 @@
+"""
+Configuração comum dos testes
+
+As variáveis de ambiente precisam estar definidas antes do primeiro import
+de `api` (a configuração é lida no import): sem log em arquivo, sem rate
+limiting global e sem aquecimento em segundo plano.
+"""
+
+import asyncio
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("LOG_FILE", "")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+os.environ.setdefault("WARMUP_ENABLED", "0")
+
+
+@pytest.fixture(scope="session")
+def memory_db():
+    """Backend colunar sobre o CSV do repositório"""
+    from api.config import DATA_PATH
+    from api.database import BooksDatabase
+    return BooksDatabase(DATA_PATH)
+
+
+@pytest.fixture(scope="session")
+def sqlite_db(tmp_path_factory):
+    """Backend SQLite gerado a partir do mesmo CSV"""
+    from api.config import DATA_PATH
+    from api.storage.sqlite import SQLiteBackend, build_sqlite_database
+    db_path = tmp_path_factory.mktemp("sqlite") / "books.db"
+    build_sqlite_database(DATA_PATH, db_path)
+    return SQLiteBackend(db_path)
+
+
+@pytest.fixture
+def asgi():
+    """
+    Faz uma requisição em processo pela pilha ASGI (`httpx.ASGITransport`).
+
+    Diferente do `TestClient`, não executa o lifespan (que encerraria o pool
+    de consultas compartilhado entre os testes) e não depende da API do
+    `httpx.Client` que mudou no httpx 0.28.
+    """
+    def request(app, method: str, url: str, **kwargs) -> httpx.Response:
+        async def send():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, url, **kwargs)
+        return asyncio.run(send())
+    return request
@@ -0,0 +1,41 @@
+"""Testes do feed de alterações"""
+
+import sqlite3
+
+from api.storage.changes import ChangeLog
+
+
+def _book(url, price, availability="In Stock"):
+    return {"book_url": url, "title": url.upper(), "price": price, "availability": availability}
+
+
+def test_record_and_read_changes(tmp_path):
+    log = ChangeLog(tmp_path / "changes.db")
+    assert log.latest_version() == 0
+
+    version = log.record_snapshot([_book("a", 10), _book("b", 5)], [_book("a", 12), _book("c", 3)])
+    assert version == 1
+    kinds = sorted(c["kind"] for c in log.changes_since(0)["changes"])
+    assert kinds == ["added", "price_changed", "removed"]
+    assert log.changes_since(1)["changes"] == []
+
+
+def test_schema_and_wal_are_set_up_once(tmp_path, monkeypatch):
+    log = ChangeLog(tmp_path / "changes.db")
+    log.record_snapshot([], [_book("a", 10)])
+
+    statements = []
+    connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr("api.storage.changes.sqlite3.connect", traced_connect)
+    log.latest_version()
+    log.changes_since(0)
+    assert not any("PRAGMA" in s or "CREATE" in s for s in statements)
+
+    with sqlite3.connect(tmp_path / "changes.db") as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
@@ -0,0 +1,53 @@
+"""Testes da coalescência de consultas idênticas e dos contadores em /metrics"""
+
+import asyncio
+import threading
+
+from api.async_database import AsyncDatabase
+from api.monitoring.coalescing import coalescing
+from api.monitoring.metrics import metrics
+
+
+class _SlowBackend:
+    """Backend mínimo: a consulta só termina quando o teste libera"""
+    data_version = 1
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def get_book_by_id(self, book_id):
+        self.calls += 1
+        self.release.wait(5)
+        return {"id": book_id}
+
+
+def test_identical_concurrent_queries_share_one_execution():
+    backend = _SlowBackend()
+    db = AsyncDatabase(backend, max_workers=2, coalesce=True)
+    coalescing.reset()
+
+    async def scenario():
+        calls = [asyncio.ensure_future(db._query("get_book_by_id", 7)) for _ in range(5)]
+        calls.append(asyncio.ensure_future(db._query("get_book_by_id", 8)))
+        await asyncio.sleep(0.05)
+        backend.release.set()
+        return await asyncio.gather(*calls)
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        db.shutdown()
+    assert results == [{"id": 7}] * 5 + [{"id": 8}]
+    assert backend.calls == 2
+    assert coalescing.executions == {"get_book_by_id": 2}
+    assert coalescing.coalesced == {"get_book_by_id": 4}
+
+    import api.routers.metrics  # noqa: F401 (registra os contadores)
+    text = metrics.render()
+    assert "# TYPE books_api_query_executions_total counter" in text
+    assert 'books_api_query_executions_total{operation="get_book_by_id"} 2' in text
+    assert 'books_api_query_coalesced_total{operation="get_book_by_id"} 4' in text
+    assert "# TYPE books_api_compression_cache_hits_total counter" in text
+    assert "# TYPE books_api_token_cache_misses_total counter" in text
+    assert "books_api_query_executions " not in text
@@ -0,0 +1,25 @@
+"""Testes do armazenamento colunar"""
+
+import pytest
+
+from api.storage.columnar import BookColumns
+
+
+def _row(book_id, **overrides):
+    row = {"id": book_id, "title": f"Book {book_id}", "price": 10.0, "rating": 3,
+           "availability": "In Stock", "category": "Poetry", "image_url": "", "book_url": ""}
+    row.update(overrides)
+    return row
+
+
+def test_from_rows_round_trip():
+    columns = BookColumns.from_rows([_row(2), _row(1, rating=5, availability="Out of Stock", category="Travel")])
+    assert columns.row(1) == _row(1, rating=5, availability="Out of Stock", category="Travel")
+    assert columns.find_id(2) == 0
+
+
+@pytest.mark.parametrize("column, value", [("rating", 1000), ("id", 2 ** 70), ("price", "abc")])
+def test_from_rows_rejects_values_out_of_the_column_type(column, value):
+    rows = [_row(1), _row(2, **{column: value})]
+    with pytest.raises(ValueError, match=f"Linha 1: valor inválido para a coluna {column}"):
+        BookColumns.from_rows(rows)
@@ -0,0 +1,70 @@
+"""Testes do middleware de compressão"""
+
+import anyio
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from api.compression import CompressedCache, CompressionMiddleware, negotiate
+
+
+def _app(thread_min_size=1 << 20):
+    app = FastAPI()
+
+    @app.api_route("/items", methods=["GET", "HEAD"])
+    async def items(n: int = 100):
+        return {"items": [{"id": i, "name": "livro"} for i in range(n)]}
+
+    @app.get("/events")
+    async def events():
+        async def stream():
+            for i in range(3):
+                yield f"data: {'x' * 100} {i}\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return CompressionMiddleware(app, lambda: 1, CompressedCache(), minimum_size=64,
+                                 thread_min_size=thread_min_size)
+
+
+def test_negotiate_respects_quality_and_availability():
+    assert negotiate("gzip;q=0.5, identity") == "gzip"
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("unknown") is None
+
+
+def test_large_bodies_are_compressed_in_a_thread(monkeypatch, asgi):
+    calls = []
+    run_sync = anyio.to_thread.run_sync
+
+    async def tracked(func, *args, **kwargs):
+        calls.append(len(args[0]))
+        return await run_sync(func, *args, **kwargs)
+
+    monkeypatch.setattr(anyio.to_thread, "run_sync", tracked)
+    app = _app(thread_min_size=4096)
+
+    small = asgi(app, "GET", "/items", params={"n": 10}, headers={"Accept-Encoding": "gzip"})
+    large = asgi(app, "GET", "/items", params={"n": 1000}, headers={"Accept-Encoding": "gzip"})
+    assert small.headers["content-encoding"] == large.headers["content-encoding"] == "gzip"
+    assert len(large.json()["items"]) == 1000
+    assert len(calls) == 1 and calls[0] >= 4096
+
+
+def test_head_keeps_the_original_headers(asgi):
+    app = _app()
+    get = asgi(app, "GET", "/items", headers={"Accept-Encoding": "identity"})
+    head = asgi(app, "HEAD", "/items", headers={"Accept-Encoding": "gzip"})
+    assert head.status_code == 200
+    assert head.headers["content-length"] == get.headers["content-length"] != "0"
+    assert "content-encoding" not in head.headers
+
+
+def test_event_stream_is_not_buffered(asgi):
+    response = asgi(_app(), "GET", "/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text.count("data: ") == 3
+
+
+def test_small_bodies_still_vary_on_accept_encoding(asgi):
+    response = asgi(_app(), "GET", "/items", params={"n": 1}, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
@@ -0,0 +1,65 @@
+"""Testes da busca aproximada (filtro de categoria, total e paridade entre backends)"""
+
+import math
+
+import pytest
+
+from api.config import FUZZY_MIN_SCORE
+from api.storage.fuzzy import MIN_SHARED_RATIO, normalize, similarity, trigrams
+
+QUERIES = [
+    ("the", None),
+    ("the", "poetry"),
+    ("the", "Travel"),
+    ("of the", "History"),
+    ("harry poter", None),
+    ("mistery", "fiction"),
+    ("a", None),
+    ("love", "sem-categoria"),
+]
+
+
+def _brute_force(books, query, category):
+    """Varre o catálogo inteiro: mesmo critério de candidato e mesmo score"""
+    normalized = normalize(query)
+    grams = trigrams(normalized)
+    needed = max(1, math.ceil(len(grams) * MIN_SHARED_RATIO))
+    words = normalized.split()
+    found = []
+    for pos, book in enumerate(books):
+        if category and category.lower() not in book["category"].lower():
+            continue
+        shared = len(grams & trigrams(normalize(book["title"])))
+        score = round(similarity(words, book["title"]), 4)
+        if shared >= needed and score >= FUZZY_MIN_SCORE:
+            found.append((-score, -shared, pos, book))
+    found.sort(key=lambda f: f[:3])
+    return [dict(book, score=-score) for score, _, _, book in found]
+
+
+@pytest.fixture(scope="module")
+def all_books(memory_db):
+    cols = memory_db.columns
+    return cols.rows(range(len(cols)))
+
+
+@pytest.mark.parametrize("query, category", QUERIES)
+def test_fuzzy_matches_brute_force(memory_db, all_books, query, category):
+    expected = _brute_force(all_books, query, category)
+    result = memory_db.fuzzy_search_books(query, category, 0, 10000)
+    assert result["total"] == len(expected)
+    assert result["books"] == expected
+
+
+@pytest.mark.parametrize("query, category", QUERIES)
+def test_fuzzy_sqlite_matches_columnar(memory_db, sqlite_db, query, category):
+    for skip, limit in ((0, 20), (4, 9)):
+        assert sqlite_db.fuzzy_search_books(query, category, skip, limit) == \
+            memory_db.fuzzy_search_books(query, category, skip, limit)
+
+
+def test_fuzzy_category_filter_is_applied_before_ranking(memory_db):
+    # Livros de uma categoria pequena não podem sumir atrás dos de outras categorias
+    result = memory_db.fuzzy_search_books("the", "poetry", 0, 100)
+    assert result["total"] > 0
+    assert all(book["category"] == "Poetry" for book in result["books"])
@@ -0,0 +1,46 @@
+"""Testes da carga do CSV (linhas malformadas)"""
+
+from api.storage.ingest import load_columns
+from api.storage.sqlite import SQLiteBackend, build_sqlite_database
+
+HEADER = "id,title,price,rating,availability,category,image_url,book_url\n"
+ROWS = [
+    "1,Good Book,£10.00,3,In Stock,Poetry,,http://x/1\n",
+    "2,Huge Rating,£10.00,1000,In Stock,Poetry,,http://x/2\n",
+    f"{2 ** 70},Huge Id,£10.00,2,In Stock,Poetry,,http://x/3\n",
+    "4,Bad Price,abc,2,In Stock,Poetry,,http://x/4\n",
+    "5,Too Few Columns,£1.00\n",
+    "6,Another Good One,£12.50,5,Out of Stock,Travel,,http://x/6\n",
+]
+
+
+# Latin-1 no meio de um arquivo UTF-8
+INVALID_UTF8_ROW = "7,Caf\xe9,\xa31.00,2,In Stock,Poetry,,http://x/7\n".encode("latin-1")
+
+
+def _write_csv(tmp_path):
+    path = tmp_path / "books.csv"
+    path.write_bytes((HEADER + "".join(ROWS)).encode("utf-8") + INVALID_UTF8_ROW)
+    return path
+
+
+def test_malformed_rows_are_rejected_not_fatal(tmp_path):
+    columns, stats = load_columns(_write_csv(tmp_path), workers=1)
+
+    assert [columns.ids[i] for i in range(columns.count)] == [1, 6]
+    assert columns.row(1)["rating"] == 5
+    assert stats["rows_loaded"] == 2 and stats["rows_rejected"] == 5
+    assert stats["rejected_by_reason"] == {
+        "rating fora do intervalo": 1,
+        "id fora do intervalo": 1,
+        "price inválido": 1,
+        "3 colunas (esperadas 8)": 1,
+        "invalid_utf8": 1,
+    }
+    assert [s["line"] for s in stats["rejected_samples"]] == [3, 4, 5, 6, 8]
+
+
+def test_sqlite_build_applies_the_same_rules(tmp_path):
+    path = _write_csv(tmp_path)
+    assert build_sqlite_database(path, tmp_path / "books.db") == 2
+    assert SQLiteBackend(tmp_path / "books.db").get_total_count() == 2
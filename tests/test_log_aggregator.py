@@ -0,0 +1,34 @@
+"""Testes do agregador incremental de logs"""
+
+import json
+
+from api.monitoring.log_aggregator import LogAggregator
+
+
+def _line(path, route, process_time, status_code=200):
+    entry = {"message": "Request processed", "path": path, "status_code": status_code,
+             "process_time": process_time}
+    if route is not None:
+        entry["route"] = route
+    return json.dumps(entry) + "\n"
+
+
+def test_requests_are_grouped_by_route_template(tmp_path):
+    log = tmp_path / "api.log"
+    log.write_text(
+        "".join(_line(f"/api/v1/books/{i}", "/api/v1/books/{book_id}", 0.0004) for i in range(1, 51))
+        + _line("/api/v1/categories", None, 0.002)
+        + "não é json\n"
+    )
+    aggregator = LogAggregator(log, tmp_path / "analytics.db")
+    try:
+        assert aggregator.update() == 51
+        summary = aggregator.summary()
+    finally:
+        aggregator.close()
+
+    rows = {row["path"]: row for row in summary["endpoints"]}
+    assert set(rows) == {"/api/v1/books/{book_id}", "/api/v1/categories"}
+    assert rows["/api/v1/books/{book_id}"]["count"] == 50
+    assert rows["/api/v1/books/{book_id}"]["avg_time"] == 0.0004
+    assert summary["invalid_lines"] == 1
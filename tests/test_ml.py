@@ -0,0 +1,30 @@
+"""Testes dos endpoints ML-Ready e das métricas do dataset (fachada assíncrona)"""
+
+from api.auth.jwt_handler import create_access_token
+from api.main import app
+
+
+def _headers():
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'user', 'role': 'user'})}"}
+
+
+def test_features_and_training_data(asgi, memory_db):
+    features = asgi(app, "GET", "/api/v1/ml/features", headers=_headers())
+    assert features.status_code == 200
+    stats = features.json()["feature_statistics"]
+    cols = memory_db.columns
+    ratings = [cols.ratings[i] for i in range(len(cols))]
+    assert (stats["rating"]["min"], stats["rating"]["max"]) == (min(ratings), max(ratings))
+    assert features.json()["total_samples"] == len(cols)
+
+    training = asgi(app, "GET", "/api/v1/ml/training-data", params={"limit": 3}, headers=_headers())
+    assert training.status_code == 200
+    assert training.json()["total"] == 3
+    assert set(training.json()["data"][0]) == {"title", "price", "rating", "category", "availability"}
+
+
+def test_metrics_describe_the_served_dataset(asgi):
+    from api.async_database import db
+    text = asgi(app, "GET", "/metrics").text
+    assert f"books_api_dataset_version {db.data_version()}" in text
+    assert f"books_api_dataset_books {db.get_total_count()}" in text
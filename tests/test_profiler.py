@@ -0,0 +1,22 @@
+"""Testes do profiler por requisição (consultas no pool e fase serialize)"""
+
+from api.auth.jwt_handler import create_access_token
+from api.main import app
+from api.monitoring.profiler import profiler
+
+
+def test_profile_includes_executor_frames_and_serialize_phase(monkeypatch, asgi):
+    # Sem o corte do resumo: o que importa é a presença dos frames do pool
+    monkeypatch.setattr(profiler, "top_functions", 100000)
+    token = create_access_token({"sub": "admin", "role": "admin"})
+    response = asgi(
+        app, "GET", "/api/v1/books/search", params={"title": "the", "profile": "1"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+
+    profile = profiler.get_profile(int(response.headers["X-Profile-Id"]))
+    functions = [f["function"] for f in profile["functions"]]
+    assert any("database.py" in f for f in functions), functions
+    assert "serialize" in profile["phases_ms"]
+    assert profile["phases_ms"]["serialize"] <= profile["total_ms"]
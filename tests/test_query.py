@@ -0,0 +1,85 @@
+"""Testes da consulta composta: planejador x filtro ingênuo, colunar x SQLite"""
+
+import pytest
+
+# Combinações de filtros cobrindo cada índice como ponto de partida do plano
+QUERIES = [
+    {},
+    {"title": "the"},
+    {"title": "LOVE"},
+    {"title": "zz-nada-casa-zz"},
+    {"category": "poetry"},
+    {"category": "fic"},
+    {"category": "sem-categoria"},
+    {"min_price": 20, "max_price": 30},
+    {"min_price": 55.5},
+    {"max_price": 11},
+    {"min_rating": 4},
+    {"min_rating": 2, "max_rating": 3},
+    {"in_stock": True},
+    {"in_stock": False},
+    {"title": "a", "category": "fiction", "min_rating": 3},
+    {"category": "history", "min_price": 15, "max_price": 45, "in_stock": True},
+    {"title": "the", "max_price": 25, "max_rating": 2},
+    {"min_price": 30, "sort": "price"},
+    {"min_rating": 4, "sort": "rating", "descending": True},
+    {"category": "mystery", "sort": "title"},
+    {"title": "of", "sort": "id", "descending": True},
+]
+
+
+def _matches(book, title=None, category=None, min_price=None, max_price=None,
+             min_rating=None, max_rating=None, in_stock=None, **_):
+    """O mesmo filtro, linha a linha, sem índices"""
+    return (
+        (not title or title.lower() in book["title"].lower())
+        and (not category or category.lower() in book["category"].lower())
+        and (min_price is None or book["price"] >= min_price)
+        and (max_price is None or book["price"] <= max_price)
+        and (min_rating is None or book["rating"] >= min_rating)
+        and (max_rating is None or book["rating"] <= max_rating)
+        and (in_stock is None or (book["availability"] == "In Stock") == in_stock)
+    )
+
+
+def _brute_force(books, query):
+    found = [b for b in books if _matches(b, **query)]
+    if query.get("sort"):
+        # sorted é estável: empates mantêm a ordem do catálogo
+        found.sort(key=lambda b: b[query["sort"]], reverse=query.get("descending", False))
+    return found
+
+
+@pytest.fixture(scope="module")
+def all_books(memory_db):
+    cols = memory_db.columns
+    return cols.rows(range(len(cols)))
+
+
+@pytest.mark.parametrize("query", QUERIES, ids=repr)
+def test_planner_matches_brute_force(memory_db, all_books, query):
+    expected = _brute_force(all_books, query)
+    for skip, limit in ((0, 20), (5, 7), (0, 2000)):
+        result = memory_db.query_books(**query, skip=skip, limit=limit)
+        assert result["total"] == len(expected)
+        assert result["books"] == expected[skip:skip + limit]
+
+
+@pytest.mark.parametrize("query", QUERIES, ids=repr)
+def test_sqlite_matches_columnar(memory_db, sqlite_db, query):
+    facets = ("category", "rating", "price", "availability")
+    for skip, limit in ((0, 20), (3, 11)):
+        columnar = memory_db.query_books(**query, skip=skip, limit=limit, facets=facets)
+        sqlite = sqlite_db.query_books(**query, skip=skip, limit=limit, facets=facets)
+        assert sqlite["total"] == columnar["total"]
+        assert sqlite["books"] == columnar["books"]
+        assert sqlite["facets"] == columnar["facets"]
+
+
+def test_sqlite_matches_columnar_with_projection(memory_db, sqlite_db):
+    fields = ["title", "price"]
+    assert sqlite_db.query_books(min_rating=5, fields=fields)["books"] == \
+        memory_db.query_books(min_rating=5, fields=fields)["books"]
+    assert sqlite_db.get_top_rated_books(10, fields) == memory_db.get_top_rated_books(10, fields)
+    assert sqlite_db.get_books_by_price_range(10, 20, 5, 10, fields) == \
+        memory_db.get_books_by_price_range(10, 20, 5, 10, fields)
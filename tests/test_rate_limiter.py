@@ -0,0 +1,76 @@
+"""Testes do rate limiting (baldes em memória e em SQLite)"""
+
+import sqlite3
+
+from api.monitoring.rate_limiter import MemoryBucketStore, SQLiteBucketStore
+
+
+def test_memory_store_limits_and_refills(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("api.monitoring.rate_limiter.time.monotonic", lambda: clock[0])
+    store = MemoryBucketStore()
+
+    assert store.consume("a", 3, rate=1, burst=5)[0]
+    allowed, remaining, retry_after = store.consume("a", 3, rate=1, burst=5)
+    assert not allowed and remaining == 2 and retry_after == 1
+
+    clock[0] += 1
+    assert store.consume("a", 3, rate=1, burst=5)[0]
+
+
+def test_memory_store_evicts_idle_buckets_from_the_front(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("api.monitoring.rate_limiter.time.monotonic", lambda: clock[0])
+    store = MemoryBucketStore()
+    for i in range(100):
+        store.consume(f"k{i}", 1, rate=1, burst=5)
+    clock[0] += 3
+    store.consume("k0", 1, rate=1, burst=5)  # k0 volta ao fim da fila
+    clock[0] += 3  # k1..k99 ociosos há 6s (> 5s para encher)
+
+    store.consume("new", 1, rate=1, burst=5)
+    assert len(store) == 2
+
+
+def test_sqlite_store_shares_state(tmp_path):
+    path = str(tmp_path / "buckets.db")
+    first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+    assert first.consume("a", 4, rate=0.001, burst=5)[0]
+    assert not second.consume("a", 4, rate=0.001, burst=5)[0]
+
+
+def test_sqlite_store_fails_open_when_locked(tmp_path):
+    path = str(tmp_path / "buckets.db")
+    store = SQLiteBucketStore(path)
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        assert store.consume("a", 1, rate=1, burst=5) is None
+        assert store.errors == 1
+    finally:
+        blocker.execute("ROLLBACK")
+    assert store.consume("a", 1, rate=1, burst=5)[0]
+
+
+def test_batch_costs_the_sum_of_its_sub_queries(monkeypatch, asgi):
+    from api.main import app
+    from api.models.schemas import BatchQuery
+    from api.monitoring.rate_limiter import rate_limiter
+    from api.routers.batch import batch_cost
+
+    searches = [BatchQuery(op="search", params={"title": "the"})] * 20
+    assert batch_cost(searches) == 20 * rate_limiter.route_costs["/api/v1/books/search"]
+    assert batch_cost([BatchQuery(op="categories")]) == 1
+    assert batch_cost([]) == 1
+
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "store", MemoryBucketStore())
+    monkeypatch.setattr(rate_limiter, "rate", 0.001)
+    monkeypatch.setattr(rate_limiter, "burst", 50)
+    body = {"queries": [q.model_dump() for q in searches]}
+    assert asgi(app, "POST", "/api/v1/batch", json=body).status_code == 429
+
+    small = {"queries": [q.model_dump() for q in searches[:4]]}
+    response = asgi(app, "POST", "/api/v1/batch", json=small)
+    assert response.status_code == 200
+    assert response.headers["X-RateLimit-Remaining"] == "29"
@@ -0,0 +1,64 @@
+"""Testes do autocomplete (consultas de várias palavras)"""
+
+import asyncio
+
+import pytest
+
+from api.storage import suggest
+from api.storage.fuzzy import normalize
+from api.storage.suggest import SuggestIndex
+
+QUERIES = ["harry po", "the a", "a the", "of t", "love s", "zz the", "t a b"]
+
+
+def _brute_force(titles, ratings, query, limit):
+    words = normalize(query).split()
+    found = [
+        i for i, title in enumerate(titles)
+        if all(any(tw.startswith(w) for tw in normalize(title).split()) for w in words)
+    ]
+    found.sort(key=lambda i: (-ratings[i], titles[i], i))
+    return found[:limit]
+
+
+@pytest.fixture(scope="module")
+def catalog(memory_db):
+    cols = memory_db.columns
+    titles = [cols.title[i] for i in range(len(cols))]
+    ratings = list(cols.ratings)
+    return titles, ratings, SuggestIndex.build(titles, ratings, cols.categories, [1] * len(cols.categories), 10)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_multi_word_lookup_matches_brute_force(catalog, query):
+    titles, ratings, index = catalog
+    assert list(index.lookup(query, 5)[1]) == _brute_force(titles, ratings, query, 5)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_multi_word_lookup_with_small_scan_limit(monkeypatch, catalog, query):
+    # Com o percurso pelo ranking limitado, as completions achadas são as
+    # melhores do resultado completo, na mesma ordem
+    monkeypatch.setattr(suggest, "SCAN_LIMIT", 50)
+    titles, ratings, index = catalog
+    expected = _brute_force(titles, ratings, query, 5)
+    found = list(index.lookup(query, 5)[1])
+    assert found == expected[:len(found)]
+
+
+def test_async_suggest_runs_in_the_pool(memory_db):
+    from api.async_database import AsyncDatabase
+
+    async def run():
+        return await AsyncDatabase(memory_db, max_workers=1).suggest("harry po", 3)
+
+    result = asyncio.run(run())
+    assert result["titles"] and all("Harry" in t["title"] for t in result["titles"])
+
+
+@pytest.mark.parametrize("scan_limit", [suggest.SCAN_LIMIT, 50])
+@pytest.mark.parametrize("query", QUERIES + ["h", "harry", "poe", "myst", "zzz", "!!"])
+def test_sqlite_matches_columnar(monkeypatch, memory_db, sqlite_db, query, scan_limit):
+    monkeypatch.setattr(suggest, "SCAN_LIMIT", scan_limit)
+    for limit in (3, 10):
+        assert sqlite_db.suggest(query, limit) == memory_db.suggest(query, limit)
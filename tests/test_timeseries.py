@@ -0,0 +1,61 @@
+"""Testes do histórico de preços"""
+
+import pytest
+
+from api.storage.timeseries import PriceHistory
+
+DAY = 86400
+
+
+def _books(price, in_stock=True):
+    return [
+        {"book_url": "a", "title": "A", "category": "Poetry", "price": price,
+         "availability": "In Stock" if in_stock else "Out of Stock"},
+        {"book_url": "b", "title": "B", "category": "Travel", "price": 7.5, "availability": "In Stock"},
+    ]
+
+
+def test_append_and_read(tmp_path):
+    history = PriceHistory(tmp_path)
+    history.append(_books(10.0), timestamp=DAY)
+    history.append(_books(12.0, in_stock=False), timestamp=DAY + 60)
+
+    raw = history.book_history("a")
+    assert [p["price"] for p in raw] == [10.0, 12.0]
+    assert raw[-1]["availability"] == "Out of Stock"
+    daily = history.book_history("a", "daily")
+    assert daily[0]["samples"] == 2 and daily[0]["min_price"] == 10.0 and daily[0]["last_price"] == 12.0
+    assert history.category_trend("Travel")[0]["avg_price"] == 7.5
+
+
+def test_block_without_commit_is_ignored_and_overwritten(tmp_path, monkeypatch):
+    history = PriceHistory(tmp_path)
+    history.append(_books(10.0), timestamp=DAY)
+    committed = history.points_path.stat().st_size
+
+    # Queda depois do fsync do bloco e antes do commit no SQLite
+    def crash(*args):
+        raise RuntimeError("queda")
+    monkeypatch.setattr(PriceHistory, "_update_rollups", staticmethod(crash))
+    with pytest.raises(RuntimeError):
+        history.append(_books(99.0), timestamp=DAY + 60)
+    monkeypatch.undo()
+    assert history.points_path.stat().st_size > committed
+
+    reopened = PriceHistory(tmp_path)
+    assert [p["price"] for p in reopened.book_history("a")] == [10.0]
+
+    reopened.append(_books(11.0), timestamp=DAY + 120)
+    assert [p["price"] for p in reopened.book_history("a")] == [10.0, 11.0]
+    assert reopened.points_path.stat().st_size == 2 * committed
+
+
+def test_growth_replaces_the_map(tmp_path):
+    history = PriceHistory(tmp_path)
+    history.append(_books(10.0), timestamp=DAY)
+    history.book_history("a")
+    old_map = history._map
+
+    history.append(_books(11.0), timestamp=DAY + 60)
+    assert len(history.book_history("a")) == 2
+    assert history._map is not old_map and old_map.closed
@@ -0,0 +1,40 @@
+"""Testes do aquecimento: tráfego interno fora dos middlewares e readiness degradado"""
+
+import asyncio
+
+from api.main import app
+from api.monitoring.metrics import metrics
+from api.monitoring.rate_limiter import rate_limiter
+from api.warmup import Warmup, _asgi_get, warmup
+
+
+def test_warmup_requests_skip_metrics_and_rate_limiting(monkeypatch):
+    async def reject(request):
+        raise AssertionError("o aquecimento não deve passar pelo rate limiting")
+
+    monkeypatch.setattr(rate_limiter, "check", reject)
+    before = dict(metrics.requests_total)
+    status = asyncio.run(_asgi_get(app, "/api/v1/categories", "gzip"))
+    assert status == 200
+    assert metrics.requests_total == before
+
+
+def test_failed_step_leaves_worker_degraded(monkeypatch, asgi):
+    async def broken():
+        raise RuntimeError("índice corrompido")
+
+    failing = Warmup(enabled=True)
+    monkeypatch.setattr("api.warmup.db.warm_up", broken)
+    monkeypatch.setattr("api.warmup.WARMUP_PATHS", ())
+    asyncio.run(failing.run(app))
+    assert failing.finished
+    assert failing.failed == ["indexes"]
+
+    monkeypatch.setattr("api.routers.health.warmup", failing)
+    response = asgi(app, "GET", "/api/v1/health/ready")
+    assert response.status_code == 503
+    body = response.json()
+    assert body["status"] == "degraded"
+    assert body["warmup"]["failed"] == ["indexes"]
+    assert body["warmup"]["steps"][0]["error"] == "índice corrompido"
+    assert warmup.failed == []